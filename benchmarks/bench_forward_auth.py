@@ -0,0 +1,114 @@
+"""Latency of authenticating one access token, repeated.
+
+Compares the per-request ``AuthService.authenticate_user`` path with
+``PrincipalService.resolve`` (auth middleware) and
+``PrincipalService.authorize`` (GET /auth/forward). Runs against its own
+in-memory SQLite database. Run with ``PYTHONPATH=src python
+benchmarks/bench_forward_auth.py [iterations]``; the usual app environment
+variables must be set.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import ulid
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.auth.enums import TokenType
+from app.auth.services import AuthService
+from app.auth.services.introspection_cache import IntrospectionCache
+from app.auth.services.jwt_service import JWTService
+from app.auth.services.principal_service import PrincipalService
+from app.core import Argon2Hasher
+import app.core.all_db_models  # noqa: F401 - registers the tables
+from app.core.token_digest import HMACTokenDigest
+from app.db import Base
+from app.users.enums import UserRole
+from app.users.models import User
+
+
+def _jwt_service() -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access="access-secret",
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+    )
+
+
+async def _latencies(func, iterations: int) -> list[float]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id = str(ulid.new())
+    async with session_factory() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id,
+                fullname="Bench User",
+                email="bench@example.com",
+                hashed_password="x",
+                role=UserRole.USER,
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+
+    jwt_service = _jwt_service()
+    hasher = Argon2Hasher()
+    token = await jwt_service.encode_token(user_id, TokenType.ACCESS_TOKEN)
+
+    async def authenticate_user() -> None:
+        async with session_factory() as db:
+            service = AuthService(db, jwt_service, hasher, HMACTokenDigest("pepper"))
+            await service.authenticate_user(token, TokenType.ACCESS_TOKEN)
+
+    principal_service = PrincipalService(
+        jwt_service,
+        hasher,
+        session_factory,
+        cache=IntrospectionCache(ttl_seconds=5, max_entries=10_000),
+        microcache=IntrospectionCache(ttl_seconds=0.5, max_entries=10_000),
+    )
+
+    async def resolve() -> None:
+        await principal_service.resolve(token)
+
+    async def authorize() -> None:
+        await principal_service.authorize(token)
+
+    for name, func in (
+        ("authenticate_user", authenticate_user),
+        ("principal resolve", resolve),
+        ("forward authorize", authorize),
+    ):
+        latencies = await _latencies(func, iterations)
+        p50 = statistics.median(latencies)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{name:<20}p50 {p50:>9.1f} us    p99 {p99:>9.1f} us")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000))
@@ -0,0 +1,52 @@
+"""Encode/decode throughput of the JWT codecs.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_jwt.py [iterations]``. The
+auth package loads the app config on import, so the usual environment
+variables (``DATABASE_URL`` etc.) must be set.
+"""
+
+import sys
+import time
+
+from app.auth.services.jwt_codec import JWTCodec, HMACJWTCodec, JoseJWTCodec
+
+KEY = "benchmark-secret-key-with-enough-entropy"
+
+
+def _claims() -> dict:
+    now = int(time.time())
+    return {
+        "sub": "01JXBENCHUSER00000000000000",
+        "jti": "01JXBENCHJTI000000000000000",
+        "exp": now + 900,
+        "iat": now,
+        "type": "access_token",
+    }
+
+
+def _per_second(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations: int) -> None:
+    print(f"{'codec':<16}{'encode/s':>12}{'decode/s':>12}")
+
+    for algorithm in ("HS256", "HS512"):
+        codecs: dict[str, JWTCodec] = {
+            f"jose {algorithm}": JoseJWTCodec(KEY, algorithm),
+            f"hmac {algorithm}": HMACJWTCodec(KEY, algorithm),
+        }
+
+        for name, codec in codecs.items():
+            claims = _claims()
+            token = codec.encode(claims)
+            encode = _per_second(lambda: codec.encode(claims), iterations)
+            decode = _per_second(lambda: codec.decode(token), iterations)
+            print(f"{name:<16}{encode:>12,.0f}{decode:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,81 @@
+"""Latency and memory of each password KDF backend.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_kdf.py [rounds]``. Each
+backend runs in a fresh process so the peak RSS reported is its own.
+"""
+
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+
+from app.core.kdf import KDFBackend, Argon2Backend, ScryptBackend, BcryptBackend
+
+PASSWORD = "Benchmark1234!"
+
+BACKENDS: dict[str, KDFBackend] = {
+    "argon2id t=3 m=64MiB p=2": Argon2Backend(),
+    "argon2id t=2 m=19MiB p=1": Argon2Backend(
+        time_cost=2, memory_cost=19 * 1024, parallelism=1
+    ),
+    "argon2id t=1 m=32MiB p=1": Argon2Backend(
+        time_cost=1, memory_cost=32 * 1024, parallelism=1
+    ),
+    "scrypt ln=17 r=8 p=1": ScryptBackend(log_n=17, r=8, p=1),
+    "scrypt ln=15 r=8 p=1": ScryptBackend(log_n=15, r=8, p=1),
+}
+
+try:
+    BACKENDS["bcrypt rounds=12"] = BcryptBackend(rounds=12)
+    BACKENDS["bcrypt rounds=10"] = BcryptBackend(rounds=10)
+except RuntimeError:
+    pass
+
+
+def _run(backend: KDFBackend, rounds: int, results) -> None:
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hash_ms, verify_ms = [], []
+    hashed = backend.hash(PASSWORD)
+
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hashed = backend.hash(PASSWORD)
+        hash_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        backend.verify(PASSWORD, hashed)
+        verify_ms.append((time.perf_counter() - started) * 1000)
+
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put(
+        (
+            statistics.median(hash_ms),
+            statistics.median(verify_ms),
+            backend.memory_cost_bytes() / 1024 / 1024,
+            (peak_kib - baseline_kib) / 1024,
+        )
+    )
+
+
+def main(rounds: int) -> None:
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'backend':<28}{'hash ms':>10}{'verify ms':>11}"
+        f"{'cost MiB':>10}{'rss MiB':>10}"
+    )
+
+    for name, backend in BACKENDS.items():
+        results = context.Queue()
+        process = context.Process(target=_run, args=(backend, rounds, results))
+        process.start()
+        hash_ms, verify_ms, cost_mib, rss_mib = results.get()
+        process.join()
+        print(
+            f"{name:<28}{hash_ms:>10.1f}{verify_ms:>11.1f}"
+            f"{cost_mib:>10.2f}{rss_mib:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,172 @@
+"""Database writes of POST /auth/refresh-token under each rotation policy.
+
+Every session refreshes round-robin through ``AuthService.refresh_access_token``
+with the policy's default settings (2-day window, 10% probability, 1-day idle
+gap) on tokens far from expiry. Rows written per refresh and per second are
+counted at the cursor. Runs against its own in-memory SQLite database. Run with
+``PYTHONPATH=src python benchmarks/bench_refresh_rotation.py [refreshes]
+[sessions]``; the usual app environment variables must be set.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import ulid
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# Before app.auth.dtos, whose import would otherwise run into a cycle
+from app.auth.services import AuthService
+from app.auth.dtos import RefreshAccessTokenInDTO
+from app.auth.helpers.login_utils import generate_and_save_new_tokens
+from app.auth.repositories import RefreshTokenRepository
+from app.auth.services.jwt_service import JWTService
+from app.auth.services.refresh_token_service import RefreshTokenService
+from app.auth.services.rotation_policy import (
+    AlwaysRotation,
+    IdleRotation,
+    ProbabilisticRotation,
+    WindowRotation,
+)
+from app.core import Argon2Hasher
+import app.core.all_db_models  # noqa: F401 - registers the tables
+from app.core.token_digest import HMACTokenDigest
+from app.db import Base
+from app.users.enums import UserRole
+from app.users.models import User
+
+IP_ADDRESS = "127.0.0.1"
+DEVICE = "bench"
+WINDOW = timedelta(days=2)
+
+POLICIES = (
+    ("always", AlwaysRotation()),
+    ("window", WindowRotation(WINDOW)),
+    ("probabilistic", ProbabilisticRotation(WINDOW, 0.1)),
+    ("idle", IdleRotation(WINDOW, timedelta(days=1))),
+)
+
+
+def _jwt_service() -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access="access-secret",
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+    )
+
+
+class _WriteCounter:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith(("INSERT", "UPDATE", "DELETE")):
+            self.rows += len(parameters) if executemany else 1
+
+    def on_commit(self, conn) -> None:
+        self.commits += 1
+
+
+async def _run_policy(
+    session_factory, jwt_service, user_id: str, policy, refreshes: int, sessions: int
+) -> tuple[int, int, float]:
+    digest = HMACTokenDigest("pepper")
+    hasher = Argon2Hasher()
+
+    tokens = []
+    async with session_factory() as db:
+        refresh_token_service = RefreshTokenService(RefreshTokenRepository(db), digest)
+        for _ in range(sessions):
+            tokens.append(
+                list(
+                    await generate_and_save_new_tokens(
+                        user_id, IP_ADDRESS, DEVICE, jwt_service, refresh_token_service
+                    )
+                )
+            )
+
+    counter = _WriteCounter()
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", counter.on_execute)
+    event.listen(engine, "commit", counter.on_commit)
+
+    started = time.perf_counter()
+    try:
+        for i in range(refreshes):
+            session = tokens[i % sessions]
+
+            async with session_factory() as db:
+                service = AuthService(
+                    db, jwt_service, hasher, digest, rotation_policy=policy
+                )
+                result = await service.refresh_access_token(
+                    RefreshAccessTokenInDTO(
+                        access_token=session[0],
+                        refresh_token=session[1],
+                        ip_address=IP_ADDRESS,
+                        device_info=DEVICE,
+                    )
+                )
+
+            session[0] = result.access_token
+            if result.refresh_token:
+                session[1] = result.refresh_token
+    finally:
+        event.remove(engine, "before_cursor_execute", counter.on_execute)
+        event.remove(engine, "commit", counter.on_commit)
+
+    return counter.rows, counter.commits, time.perf_counter() - started
+
+
+async def main(refreshes: int, sessions: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id = str(ulid.new())
+    async with session_factory() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id,
+                fullname="Bench User",
+                email="bench@example.com",
+                hashed_password="x",
+                role=UserRole.USER,
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+
+    jwt_service = _jwt_service()
+
+    for name, policy in POLICIES:
+        rows, commits, elapsed = await _run_policy(
+            session_factory, jwt_service, user_id, policy, refreshes, sessions
+        )
+        print(
+            f"{name:<15}{rows / refreshes:>6.2f} rows/refresh"
+            f"{rows / elapsed:>10.0f} rows/s"
+            f"{refreshes / elapsed:>10.0f} refreshes/s"
+            f"{commits:>8} commits"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+        )
+    )
@@ -0,0 +1,57 @@
+"""Cost of issuing a refresh token with its claims.
+
+Compares the old encode-then-decode path with ``JWTService.mint_token``.
+Run with ``PYTHONPATH=src python benchmarks/bench_token_minting.py
+[iterations]``; the usual app environment variables must be set.
+"""
+
+import asyncio
+import sys
+import time
+
+from app.auth.enums import TokenType
+from app.auth.services.jwt_service import JWTService
+
+
+def _service() -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access="access-secret",
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+    )
+
+
+async def _encode_then_decode(service: JWTService) -> None:
+    token = await service.encode_token(
+        "01JXBENCHUSER00000000000000", TokenType.REFRESH_TOKEN, ip="127.0.0.1"
+    )
+    await service.decode_token(token, TokenType.REFRESH_TOKEN)
+
+
+async def _mint(service: JWTService) -> None:
+    await service.mint_token(
+        "01JXBENCHUSER00000000000000", TokenType.REFRESH_TOKEN, ip="127.0.0.1"
+    )
+
+
+async def _per_second(func, service: JWTService, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await func(service)
+    return iterations / (time.perf_counter() - started)
+
+
+async def main(iterations: int) -> None:
+    service = _service()
+
+    for name, func in (("encode + decode", _encode_then_decode), ("mint", _mint)):
+        rate = await _per_second(func, service, iterations)
+        print(f"{name:<18}{rate:>12,.0f}/s{1_000_000 / rate:>10.1f} us/op")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
@@ -0,0 +1,31 @@
+"""Add refresh token last_used_at
+
+Revision ID: 2e5a9c7f1b83
+Revises: 6b8d1f4e2c07
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2e5a9c7f1b83"
+down_revision: Union[str, None] = "6b8d1f4e2c07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("refresh_tokens", "last_used_at")
@@ -0,0 +1,31 @@
+"""Add user tokens_valid_after
+
+Revision ID: 4f2c9a7e1b30
+Revises: d1b73d5d0b15
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2c9a7e1b30"
+down_revision: Union[str, None] = "d1b73d5d0b15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("tokens_valid_after", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "tokens_valid_after")
@@ -0,0 +1,32 @@
+"""Add refresh token (user_id, created_at) index
+
+Revision ID: 6b8d1f4e2c07
+Revises: 9c3e7b2a5d14
+Create Date: 2026-10-18 15:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6b8d1f4e2c07"
+down_revision: Union[str, None] = "9c3e7b2a5d14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_refresh_tokens_user_id_created_at",
+        "refresh_tokens",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refresh_tokens_user_id_created_at", table_name="refresh_tokens")
@@ -0,0 +1,48 @@
+"""Add refresh token family_id
+
+Revision ID: 9c3e7b2a5d14
+Revises: 4f2c9a7e1b30
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core import ULIDTypeDB
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3e7b2a5d14"
+down_revision: Union[str, None] = "4f2c9a7e1b30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("family_id", ULIDTypeDB(length=26), nullable=True),
+    )
+    # Every existing token starts a family of its own
+    op.execute("UPDATE refresh_tokens SET family_id = jti")
+
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.alter_column(
+            "family_id", existing_type=ULIDTypeDB(length=26), nullable=False
+        )
+
+    op.create_index(
+        op.f("ix_refresh_tokens_family_id"),
+        "refresh_tokens",
+        ["family_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_family_id"), table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "family_id")
@@ -0,0 +1,47 @@
+"""Add token expiry for purge
+
+Revision ID: d1b73d5d0b15
+Revises: 035585ae752a
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d1b73d5d0b15"
+down_revision: Union[str, None] = "035585ae752a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blacklisted_tokens",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_blacklisted_tokens_expires_at"),
+        "blacklisted_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_expires_at"),
+        "refresh_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_expires_at"), table_name="refresh_tokens")
+    op.drop_index(
+        op.f("ix_blacklisted_tokens_expires_at"), table_name="blacklisted_tokens"
+    )
+    op.drop_column("blacklisted_tokens", "expires_at")
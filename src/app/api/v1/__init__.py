@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 
 from app.auth.routes import router as auth_router
+from app.metrics.routes import router as metrics_router
 
 router = APIRouter()
 
 router.include_router(auth_router, prefix="/auth", tags=["Auth"])
+router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
@@ -11,6 +11,11 @@ ERR_USER_LOGOUT = "Token revoked: user logged out. Please login again."
 ERR_EMAIL_TOKEN_USED = "This verification link has already been used."
 ERR_INVALID_TOKEN = "Invalid token."
 ERR_TOKEN_REVOKED = "Token Revoked: {reason}"
+ERR_SESSION_NOT_FOUND = "Session not found."
+ERR_CLIENT_UNAUTHORIZED = "Client authentication failed."
+ERR_ADMIN_REQUIRED = "Administrator access required."
+# Reason reported for tokens issued before the user's tokens_valid_after
+REVOKED_ALL_SESSIONS = "all_sessions_revoked"
 ERR_TOKEN_UNAUTHORIZED = (
     "Unauthorized: Device or IP address does not match the original session."
 )
@@ -21,6 +26,8 @@ ERR_TOKEN_TYPE_INVALID = (
 # Success Messages
 SUC_EMAIL_VERIFIED = "Your email has been successfully verified."
 SUC_LOGOUT = "You have been logged out successfully."
+SUC_LOGOUT_ALL = "You have been logged out of all sessions."
+SUC_SESSION_REVOKED = "The session has been revoked."
 SUC_VERIFICATION_EMAIL_SENT = (
     "A verification email has been sent. Please check your inbox and spam folder."
 )
@@ -1 +1,8 @@
-from .auth_dependency import AuthServiceDep, AuthTokenDep, AuthCurrentUserDep
+from .auth_dependency import (
+    AuthServiceDep,
+    AuthTokenDep,
+    AuthCurrentUserDep,
+    PrincipalServiceDep,
+    AuthClientDep,
+    AuthAdminDep,
+)
@@ -1,43 +1,114 @@
+import hmac
 from typing import Annotated
 
-from fastapi import Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import (
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+    HTTPAuthorizationCredentials,
+)
 
 from app.auth.services import AuthService
-from app.core import Argon2Dep
-from app.users import UserServiceDep
-from app.users.dtos import UserOutDTO
-from .blacklisted_token_dependency import BlacklistedTokenServiceDep
-from .jwt_dependency import JWTServiceDep
-from .refresh_token_dependency import RefreshTokenServiceDep
-from ..enums import TokenType
+from app.auth.services.principal_service import PrincipalService
+from app.container import ContainerDep
+from app.core import config
+from app.db import SessionDep
+from app.users.enums import UserRole
+from ..constants import auth_constants
+from ..dtos import AuthPrincipalDTO
+from ..exceptions.auth_exceptions import AuthClientUnauthorizedError
+from ..middleware import PRINCIPAL_STATE_KEY, bearer_token
 
 security = HTTPBearer()
+client_security = HTTPBasic(auto_error=False)
 
 AuthTokenDep = Annotated[HTTPAuthorizationCredentials, Depends(security)]
 
 
-def _get_auth_service(
-    user_service: UserServiceDep,
-    jwt_service: JWTServiceDep,
-    refresh_token_service: RefreshTokenServiceDep,
-    blacklisted_token_service: BlacklistedTokenServiceDep,
-    hasher: Argon2Dep,
-) -> AuthService:
+async def _get_auth_service(db: SessionDep, container: ContainerDep) -> AuthService:
     return AuthService(
-        user_service=user_service,
-        jwt_service=jwt_service,
-        refresh_token_service=refresh_token_service,
-        blacklisted_token_service=blacklisted_token_service,
-        hasher=hasher,
+        db=db,
+        jwt_service=container.jwt_service,
+        hasher=container.password_hasher,
+        refresh_token_digest=container.refresh_token_digest,
+        introspection_cache=container.introspection_cache,
+        revocation_listeners=container.revocation_listeners,
+        revocation_cache=container.revocation_cache,
+        user_revocation_listeners=container.user_revocation_listeners,
+        revocation_bus=container.revocation_bus,
+        refresh_timings=container.refresh_timings,
+        refresh_coalescer=container.refresh_coalescer,
+        max_sessions_per_user=config.AUTH_MAX_SESSIONS_PER_USER,
+        rotation_policy=container.rotation_policy,
     )
 
 
 AuthServiceDep = Annotated[AuthService, Depends(_get_auth_service)]
 
 
-async def _get_current_user(token: AuthTokenDep, service: AuthServiceDep) -> UserOutDTO:
-    return await service.authenticate_user(token.credentials, TokenType.ACCESS_TOKEN)
+async def _get_principal_service(container: ContainerDep) -> PrincipalService:
+    return container.principal_service
 
 
-AuthCurrentUserDep = Annotated[UserOutDTO, Depends(_get_current_user)]
+PrincipalServiceDep = Annotated[PrincipalService, Depends(_get_principal_service)]
+
+
+# The token was already verified by AuthenticationMiddleware
+async def _get_current_user(request: Request) -> AuthPrincipalDTO:
+    principal = getattr(request.state, PRINCIPAL_STATE_KEY, None)
+
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated"
+        )
+
+    return principal
+
+
+AuthCurrentUserDep = Annotated[AuthPrincipalDTO, Depends(_get_current_user)]
+
+
+# Operator-only routes, e.g. /metrics
+async def _get_admin_user(current_user: AuthCurrentUserDep) -> AuthPrincipalDTO:
+    if current_user.role not in (UserRole.ADMIN, UserRole.SUPERADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=auth_constants.ERR_ADMIN_REQUIRED,
+        )
+
+    return current_user
+
+
+AuthAdminDep = Annotated[AuthPrincipalDTO, Depends(_get_admin_user)]
+
+
+def _secret_matches(given: str, expected: str) -> bool:
+    return bool(expected) and hmac.compare_digest(given.encode(), expected.encode())
+
+
+# /introspect (RFC 7662 §2.1) and /verify/batch: the caller authenticates as
+# one of the configured clients, with HTTP Basic or a client bearer token.
+# Returns the client id, or "bearer" for a bearer token
+async def _get_auth_client(
+    request: Request,
+    basic: Annotated[HTTPBasicCredentials | None, Depends(client_security)],
+) -> str:
+    if basic is not None:
+        secret = config.AUTH_INTROSPECTION_CLIENTS.get(basic.username, "")
+        if _secret_matches(basic.password, secret):
+            return basic.username
+
+        raise AuthClientUnauthorizedError()
+
+    token = bearer_token(request.scope)
+    if token is not None and any(
+        _secret_matches(token, expected)
+        for expected in config.AUTH_INTROSPECTION_BEARER_TOKENS
+    ):
+        return "bearer"
+
+    raise AuthClientUnauthorizedError()
+
+
+AuthClientDep = Annotated[str, Depends(_get_auth_client)]
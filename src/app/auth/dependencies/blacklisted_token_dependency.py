@@ -2,6 +2,7 @@ from typing import Annotated
 
 from fastapi import Depends
 
+from app.container import ContainerDep
 from app.db import SessionDep
 from ..repositories import BlacklistedTokenRepository
 from ..services.blacklisted_token_service import BlacklistedTokenService
@@ -17,9 +18,14 @@ _BlacklistedTokenRepoDep = Annotated[
 
 
 async def _get_blacklisted_token_service(
-    repo: _BlacklistedTokenRepoDep,
+    repo: _BlacklistedTokenRepoDep, container: ContainerDep
 ) -> BlacklistedTokenService:
-    return BlacklistedTokenService(repo)
+    return BlacklistedTokenService(
+        repo,
+        container.revocation_listeners,
+        container.revocation_cache,
+        container.revocation_bus,
+    )
 
 
 BlacklistedTokenServiceDep = Annotated[
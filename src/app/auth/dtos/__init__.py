@@ -1,3 +1,24 @@
-from .auth_dtos import AuthTokensOutDTO, AuthLoginInDTO, RefreshAccessTokenInDTO
-from .jwt_dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO, JWTEmailTokenDTO
-from .token_dtos import RefreshTokenDTO, BlacklistedTokenDTO
+from .auth_dtos import (
+    AuthTokensOutDTO,
+    AuthLoginInDTO,
+    RefreshAccessTokenInDTO,
+    TokenVerifyResultDTO,
+    TokenIntrospectionDTO,
+    AuthPrincipalDTO,
+)
+from .jwt_dtos import (
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    JWTEmailTokenDTO,
+    MintedTokenDTO,
+    JWKSDocumentDTO,
+    TokenCacheStatsDTO,
+)
+from .token_dtos import (
+    RefreshTokenDTO,
+    BlacklistedTokenDTO,
+    RefreshContextDTO,
+    RevocationCacheStatsDTO,
+    RevocationEventDTO,
+    SessionDTO,
+)
@@ -1,5 +1,9 @@
 from dataclasses import dataclass
 
+from app.users.enums import UserRole
+from .jwt_dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO
+from ..enums import BlacklistReason, TokenType
+
 
 @dataclass
 class AuthLoginInDTO:
@@ -24,3 +28,34 @@ class RefreshAccessTokenInDTO:
     refresh_token: str
     ip_address: str
     device_info: str
+
+
+@dataclass(frozen=True)
+class TokenVerifyResultDTO:
+    valid: bool
+    revoked: bool = False
+    revoked_reason: BlacklistReason | None = None
+    error: str | None = None
+    claims: JWTAccessTokenDTO | JWTRefreshTokenDTO | None = None
+    role: UserRole | None = None
+
+
+# RFC 7662 introspection response; inactive tokens only carry active=False
+@dataclass(frozen=True)
+class TokenIntrospectionDTO:
+    active: bool
+    sub: str | None = None
+    jti: str | None = None
+    exp: int | None = None
+    iat: int | None = None
+    token_type: TokenType | None = None
+    role: UserRole | None = None
+
+
+# What the auth middleware attaches to an authenticated request
+@dataclass(frozen=True)
+class AuthPrincipalDTO:
+    user_id: str
+    jti: str
+    role: UserRole
+    exp: int
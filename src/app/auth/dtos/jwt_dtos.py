@@ -30,3 +30,31 @@ class JWTRefreshTokenDTO(_TokenBase):
 @dataclass
 class JWTEmailTokenDTO(_TokenBase):
     pass
+
+
+# MINTED TOKEN
+@dataclass(frozen=True)
+class MintedTokenDTO:
+    token: str
+    claims: JWTAccessTokenDTO | JWTRefreshTokenDTO | JWTEmailTokenDTO
+
+
+# JWKS
+@dataclass(frozen=True)
+class JWKSDocumentDTO:
+    body: bytes
+    etag: str
+
+
+# VERIFIED TOKEN CACHE
+@dataclass(frozen=True)
+class TokenCacheStatsDTO:
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    negative_hits: int
+    negative_entries: int
+    evictions: int
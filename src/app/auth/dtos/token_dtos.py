@@ -2,7 +2,8 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from app.core import ULID
-from ..enums import BlacklistReason
+from app.users.dtos import UserOutDTO
+from ..enums import BlacklistReason, RevocationEventKind
 
 
 @dataclass
@@ -13,7 +14,9 @@ class RefreshTokenDTO:
     ip_address: str
     created_at: datetime
     expires_at: datetime
+    family_id: ULID
     device_info: str | None = None
+    last_used_at: datetime | None = None
 
 
 @dataclass(frozen=True)
@@ -21,3 +24,56 @@ class BlacklistedTokenDTO:
     jti: ULID
     reason: BlacklistReason
     blacklisted_at: datetime
+    expires_at: datetime | None = None
+
+
+# A login and the refresh tokens rotated from it, as seen by its owner
+@dataclass(frozen=True)
+class SessionDTO:
+    jti: ULID
+    ip_address: str
+    device_info: str | None
+    created_at: datetime
+    expires_at: datetime
+
+
+# What one refresh needs from the database, read in a single statement
+@dataclass(frozen=True)
+class RefreshContextDTO:
+    user: UserOutDTO
+    refresh_token: RefreshTokenDTO | None
+    access_revoked: BlacklistReason | None
+    refresh_revoked: BlacklistReason | None
+    refresh_revoked_at: datetime | None = None
+
+
+@dataclass(frozen=True)
+class RevocationCacheStatsDTO:
+    ready: bool
+    stale: bool
+    capacity: int
+    loaded_entries: int
+    recent_entries: int
+    bits: int
+    hash_count: int
+    memory_bytes: int
+    target_fp_rate: float
+    estimated_fp_rate: float
+    lookups: int
+    db_lookups_skipped: int
+    rebuilds: int
+    last_rebuild_at: datetime | None
+
+
+# What workers tell each other over the revocation bus. subject is a jti for
+# TOKEN events, a user id for USER events and empty for SYNC events;
+# expires_at and sent_at are Unix timestamps. sequence counts the events of
+# one origin, so receivers can tell when they missed some.
+@dataclass(frozen=True)
+class RevocationEventDTO:
+    kind: RevocationEventKind
+    subject: str
+    origin: str
+    sent_at: float
+    expires_at: int | None = None
+    sequence: int | None = None
@@ -16,3 +16,9 @@ class BlacklistReason(str, Enum):
     ACCOUNT_SUSPENDED = "account_suspended"
     ADMIN_REVOKED = "admin_revoked"
     COMPROMISED_TOKEN = "compromised_token"
+
+
+class RevocationEventKind(str, Enum):
+    TOKEN = "token"
+    USER = "user"
+    SYNC = "sync"
@@ -8,6 +8,9 @@ from .exceptions.auth_exceptions import (
     AuthAccountDeletedError,
     AuthAccountDeactivatedError,
     AuthInvalidCredentialsError,
+    AuthTokenInvalidError,
+    AuthSessionNotFoundError,
+    AuthClientUnauthorizedError,
 )
 from .exceptions.token_exceptions import (
     JWTTokenCredentialsInvalidError,
@@ -16,6 +19,28 @@ from .exceptions.token_exceptions import (
     JWTTokenInvalidError,
 )
 
+# Errors that reject a bearer token, for code running outside FastAPI's
+# exception handling (the auth middleware); mirrors the handlers below
+AUTH_ERROR_STATUS_CODES: dict[type[Exception], int] = {
+    JWTTokenCredentialsInvalidError: 401,
+    JWTTokenExpiredError: 401,
+    JWTTokenTypeInvalidError: 401,
+    JWTTokenInvalidError: 401,
+    AuthTokenRevokedError: 401,
+    AuthTokenInvalidError: 401,
+    UserNotFoundError: 401,
+    AuthAccountDeletedError: 403,
+    AuthAccountDeactivatedError: 403,
+}
+
+
+def auth_error_response(exc: Exception) -> JSONResponse:
+    return JSONResponse(
+        status_code=AUTH_ERROR_STATUS_CODES[type(exc)],
+        content={"detail": str(exc)},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 
 def auth_exception_handlers(app: FastAPI):
     @app.exception_handler(AuthInvalidCredentialsError)
@@ -43,6 +68,35 @@ def auth_exception_handlers(app: FastAPI):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    @app.exception_handler(AuthTokenInvalidError)
+    async def token_invalid_handler(
+        request: Request,
+        exc: AuthTokenInvalidError,
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": str(exc)},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    @app.exception_handler(AuthSessionNotFoundError)
+    async def session_not_found_handler(
+        request: Request,
+        exc: AuthSessionNotFoundError,
+    ) -> JSONResponse:
+        return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+    @app.exception_handler(AuthClientUnauthorizedError)
+    async def client_unauthorized_handler(
+        request: Request,
+        exc: AuthClientUnauthorizedError,
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": str(exc)},
+            headers={"WWW-Authenticate": "Basic"},
+        )
+
     @app.exception_handler(AuthAccountDeletedError)
     async def account_deleted_handler(
         request: Request,
@@ -35,3 +35,13 @@ class AuthTokenRevokedError(Exception):
         self.token_type = token_type
         self.revoked_reason = revoked_reason
         super().__init__(auth_constants.ERR_TOKEN_REVOKED.format(reason=revoked_reason))
+
+
+class AuthSessionNotFoundError(Exception):
+    def __init__(self, err: str = auth_constants.ERR_SESSION_NOT_FOUND):
+        super().__init__(err)
+
+
+class AuthClientUnauthorizedError(Exception):
+    def __init__(self, err: str = auth_constants.ERR_CLIENT_UNAUTHORIZED):
+        super().__init__(err)
@@ -1,6 +1,6 @@
 from app.core import ULID
 from app.users.dtos import UserOutDTO
-from app.users.exceptions import UserIDNotFoundError, UserNotFoundError
+from app.users.exceptions import UserNotFoundError
 from app.users.service import UserService
 from ..dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO, JWTEmailTokenDTO
 from ..enums import TokenType
@@ -20,16 +20,18 @@ async def decode_token(
 
 
 async def get_user_or_auth_error(user_service: UserService, user_id: str) -> UserOutDTO:
-    try:
-        user = await user_service.get_user_by_id(ULID(user_id))
+    user = await user_service.find_user_by_id(ULID(user_id))
 
-    except UserIDNotFoundError:
+    if user is None:
         raise UserNotFoundError()
 
+    check_user_status(user)
+    return user
+
+
+def check_user_status(user: UserOutDTO) -> None:
     if user.is_deleted:
         raise AuthAccountDeletedError()
 
     if not user.is_active:
         raise AuthAccountDeactivatedError()
-
-    return user
@@ -1,10 +1,17 @@
+from datetime import datetime, timedelta
+
+import ulid
+
+from app.common import as_utc
 from app.core import ULID
+from app.users.dtos import UserOutDTO
+from ..constants import auth_constants
+from ..dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO
 from ..enums import TokenType
 from ..exceptions.auth_exceptions import (
     AuthTokenTypeInvalidError,
     AuthTokenRevokedError,
 )
-from ..exceptions.token_exceptions import BlacklistedTokenNotFoundError
 from ..services.blacklisted_token_service import BlacklistedTokenService
 
 
@@ -19,14 +26,40 @@ def validate_token_type(token_type: TokenType) -> None:
 async def check_token_blacklist(
     token_service: BlacklistedTokenService, jti: str, token_type: TokenType
 ):
-    try:
-        blacklisted_token = await token_service.get_by_jti(ULID(jti))
+    blacklisted_token = await token_service.find_by_jti(ULID(jti))
+
+    if blacklisted_token:
+        raise AuthTokenRevokedError(
+            token_type.value,
+            blacklisted_token.reason.value,
+        )
+
 
-        if blacklisted_token:
-            raise AuthTokenRevokedError(
-                token_type.value,
-                blacklisted_token.reason.value,
-            )
+# iat only has second precision; within that second the jti, a ULID with a
+# millisecond timestamp, decides
+def issued_before(
+    token_dto: JWTAccessTokenDTO | JWTRefreshTokenDTO, moment: datetime
+) -> bool:
+    moment = as_utc(moment)
 
-    except BlacklistedTokenNotFoundError:
-        pass
+    if token_dto.iat + timedelta(seconds=1) <= moment:
+        return True
+
+    if token_dto.iat > moment:
+        return False
+
+    return ulid.parse(token_dto.jti).timestamp().datetime < moment
+
+
+# Bulk revocation: checked against the user row the caller already fetched
+def check_tokens_valid_after(
+    user: UserOutDTO,
+    token_dto: JWTAccessTokenDTO | JWTRefreshTokenDTO,
+    token_type: TokenType,
+) -> None:
+    if user.tokens_valid_after is not None and issued_before(
+        token_dto, user.tokens_valid_after
+    ):
+        raise AuthTokenRevokedError(
+            token_type.value, auth_constants.REVOKED_ALL_SESSIONS
+        )
@@ -0,0 +1,58 @@
+from app.users.dtos import UserOutDTO
+from app.users.exceptions import UserNotFoundError
+from ..dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO, TokenIntrospectionDTO
+from ..enums import TokenType
+from ..exceptions.auth_exceptions import (
+    AuthAccountDeactivatedError,
+    AuthAccountDeletedError,
+    AuthTokenRevokedError,
+)
+from ..exceptions.token_exceptions import (
+    JWTTokenCredentialsInvalidError,
+    JWTTokenExpiredError,
+    JWTTokenInvalidError,
+    JWTTokenTypeInvalidError,
+)
+
+# INTROSPECT helper functions
+
+# Anything that makes authenticate_user reject a token means "not active"
+INACTIVE_TOKEN_ERRORS = (
+    JWTTokenCredentialsInvalidError,
+    JWTTokenExpiredError,
+    JWTTokenInvalidError,
+    JWTTokenTypeInvalidError,
+    AuthTokenRevokedError,
+    AuthAccountDeactivatedError,
+    AuthAccountDeletedError,
+    UserNotFoundError,
+    ValueError,
+)
+
+INTROSPECTABLE_TOKEN_TYPES = (TokenType.ACCESS_TOKEN, TokenType.REFRESH_TOKEN)
+
+
+# The hint is only an optimisation (RFC 7662 2.1): it is tried first, the
+# other types are still searched, and unknown hints are ignored
+def introspection_token_types(token_type_hint: str | None) -> list[TokenType]:
+    types = list(INTROSPECTABLE_TOKEN_TYPES)
+
+    if token_type_hint in types:
+        types.remove(token_type_hint)
+        types.insert(0, TokenType(token_type_hint))
+
+    return types
+
+
+def build_introspection_result(
+    token_dto: JWTAccessTokenDTO | JWTRefreshTokenDTO, user: UserOutDTO
+) -> TokenIntrospectionDTO:
+    return TokenIntrospectionDTO(
+        active=True,
+        sub=token_dto.sub,
+        jti=token_dto.jti,
+        exp=int(token_dto.exp.timestamp()),
+        iat=int(token_dto.iat.timestamp()),
+        token_type=TokenType(token_dto.type),
+        role=user.role,
+    )
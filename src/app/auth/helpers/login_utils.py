@@ -1,9 +1,13 @@
 import asyncio
+import logging
 from datetime import timezone, datetime
 
-from app.core import Argon2Hasher, ULID
+from app.common import run_in_background
+from app.core import KDFHasher, HashPriority, ULID
+from app.db.database import AsyncSessionLocal
 from app.users.dtos import UserOutDTO
 from app.users.exceptions import UserEmailNotFoundError
+from app.users.repository import UserRepository
 from app.users.service import UserService
 from ..dtos import BlacklistedTokenDTO, RefreshTokenDTO
 from ..enums import TokenType, BlacklistReason
@@ -16,17 +20,45 @@ from ..services.blacklisted_token_service import BlacklistedTokenService
 from ..services.jwt_service import JWTService
 from ..services.refresh_token_service import RefreshTokenService
 
+logger = logging.getLogger(__name__)
+
+
+# Runs detached from the login request, so it opens its own session.
+# A failure only means the upgrade is retried on the next login.
+# Only replaces `verified_hash`: a password change or another rehash that
+# landed in the meantime wins.
+async def rehash_user_password(
+    user_id: ULID, password: str, verified_hash: str, hasher: KDFHasher
+) -> None:
+    try:
+        hashed_password = await hasher.hash(password, priority=HashPriority.REHASH)
+
+        async with AsyncSessionLocal() as db:
+            replaced = await UserRepository(db).replace_hashed_password(
+                user_id,
+                verified_hash,
+                hashed_password,
+                datetime.now(timezone.utc),
+            )
+
+        if not replaced:
+            logger.info(f"Password of user {user_id} changed during rehash, kept")
+    except Exception as e:
+        logger.warning(f"Password rehash failed for user {user_id}: {e!r}")
+
 
 async def validate_user_credentials(
     email: str,
     password: str,
     user_service: UserService,
-    hasher: Argon2Hasher,
+    hasher: KDFHasher,
 ) -> UserOutDTO:
     try:
         user = await user_service.get_user_by_email(email)
 
-        if not await hasher.verify(password, user.hashed_password):
+        if not await hasher.verify(
+            password, user.hashed_password, priority=HashPriority.LOGIN
+        ):
             raise AuthInvalidCredentialsError()
 
         if user.is_deleted:
@@ -35,6 +67,11 @@ async def validate_user_credentials(
         if not user.is_active:
             raise AuthAccountDeactivatedError()
 
+        if await hasher.needs_rehash(user.hashed_password):
+            run_in_background(
+                rehash_user_password(user.id, password, user.hashed_password, hasher)
+            )
+
         return user
 
     except UserEmailNotFoundError:
@@ -60,6 +97,7 @@ async def blacklist_previous_access_token(
                 jti=ULID(previous_access_token_dto.jti),
                 reason=BlacklistReason.LOGIN,
                 blacklisted_at=datetime.now(timezone.utc),
+                expires_at=previous_access_token_dto.exp,
             )
         )
 
@@ -118,32 +156,25 @@ async def generate_and_save_new_tokens(
     device_info: str,
     jwt_service: JWTService,
     refresh_token_service: RefreshTokenService,
+    max_sessions: int = 0,
 ) -> tuple[str, str]:
-    new_access_token, new_refresh_token = await asyncio.gather(
-        jwt_service.encode_token(str(user_id), TokenType.ACCESS_TOKEN.value),
-        jwt_service.encode_token(
-            str(user_id),
-            TokenType.REFRESH_TOKEN,
-            ip=ip,
-        ),
-        return_exceptions=True,
-    )
-
-    refresh_token_data = await jwt_service.decode_token(
-        new_refresh_token,
-        TokenType.REFRESH_TOKEN,
+    access, refresh = await asyncio.gather(
+        jwt_service.mint_token(str(user_id), TokenType.ACCESS_TOKEN),
+        jwt_service.mint_token(str(user_id), TokenType.REFRESH_TOKEN, ip=ip),
     )
 
     await refresh_token_service.save_refresh_token(
         RefreshTokenDTO(
-            jti=ULID(refresh_token_data.jti),
-            user_id=ULID(refresh_token_data.sub),
-            hashed_token=new_refresh_token,
-            created_at=refresh_token_data.iat,
-            expires_at=refresh_token_data.exp,
+            jti=ULID(refresh.claims.jti),
+            user_id=ULID(refresh.claims.sub),
+            hashed_token=refresh.token,
+            created_at=refresh.claims.iat,
+            expires_at=refresh.claims.exp,
+            family_id=ULID(refresh.claims.jti),
             ip_address=ip,
             device_info=device_info,
-        )
+        ),
+        max_sessions,
     )
 
-    return new_access_token, new_refresh_token
+    return access.token, refresh.token
@@ -34,12 +34,15 @@ async def decode_refresh_token(
         return None
 
 
-async def blacklist_token(jti: str, token_service: BlacklistedTokenService) -> None:
+async def blacklist_token(
+    jti: str, expires_at: datetime, token_service: BlacklistedTokenService
+) -> None:
     await token_service.add_token(
         BlacklistedTokenDTO(
             jti=ULID(jti),
             reason=BlacklistReason.LOGOUT,
             blacklisted_at=datetime.now(timezone.utc),
+            expires_at=expires_at,
         )
     )
 
@@ -52,6 +55,7 @@ async def delete_refresh_token(
 
 async def blacklist_delete_tokens_logout(
     access_token_jti: ULID,
+    access_token_exp: datetime,
     refresh_token: str,
     jwt_service: JWTService,
     blacklisted_token_service: BlacklistedTokenService,
@@ -65,10 +69,20 @@ async def blacklist_delete_tokens_logout(
     tasks = []
 
     if refresh_token_dto and refresh_token_dto.jti:
-        tasks.append(blacklist_token(refresh_token_dto.jti, blacklisted_token_service))
+        tasks.append(
+            blacklist_token(
+                refresh_token_dto.jti,
+                refresh_token_dto.exp,
+                blacklisted_token_service,
+            )
+        )
         tasks.append(delete_refresh_token(refresh_token_dto.jti, refresh_token_service))
 
     if access_token_jti:
-        tasks.append(blacklist_token(access_token_jti, blacklisted_token_service))
+        tasks.append(
+            blacklist_token(
+                access_token_jti, access_token_exp, blacklisted_token_service
+            )
+        )
 
     await asyncio.gather(*tasks)
@@ -1,23 +1,24 @@
 from datetime import datetime, timezone, timedelta
 
 from app.core import ULID
+from app.users.dtos import UserOutDTO
+from app.users.exceptions import UserNotFoundError
 from ..dtos import (
     JWTAccessTokenDTO,
     JWTRefreshTokenDTO,
     RefreshAccessTokenInDTO,
     BlacklistedTokenDTO,
+    RefreshContextDTO,
     RefreshTokenDTO,
 )
 from ..enums import TokenType, BlacklistReason
 from ..exceptions.auth_exceptions import AuthTokenRevokedError, AuthTokenInvalidError
-from ..exceptions.token_exceptions import (
-    BlacklistedTokenNotFoundError,
-    RefreshTokenNotFoundError,
-)
-from ..services.blacklisted_token_service import BlacklistedTokenService
 from ..services.jwt_service import JWTService
 from ..services.refresh_token_service import RefreshTokenService
-from ...common import gather_with_exception_check
+from ..services.rotation_policy import RefreshRotationPolicy
+from ...common import as_utc, gather_with_exception_check
+from . import check_user_status
+from .authenticate_user_utils import check_tokens_valid_after
 
 
 # REFRESH ACCESS TOKEN helper functions
@@ -47,54 +48,87 @@ async def get_token_dtos(
     return access_token_dto, refresh_token_dto
 
 
+# Check the user still exists, may log in and did not revoke all its tokens
+def check_refresh_user(
+    context: RefreshContextDTO | None,
+    refresh_dto: JWTRefreshTokenDTO,
+) -> UserOutDTO:
+    if context is None:
+        raise UserNotFoundError()
+
+    check_user_status(context.user)
+    check_tokens_valid_after(context.user, refresh_dto, TokenType.REFRESH_TOKEN)
+    return context.user
+
+
+# A refresh token rotated less than `grace` ago, e.g. by a concurrent
+# refresh on another worker, is still accepted for an access token
+def within_rotation_grace(context: RefreshContextDTO, grace: timedelta | None) -> bool:
+    if (
+        grace is None
+        or context.refresh_revoked != BlacklistReason.TOKEN_ROTATION
+        or context.refresh_revoked_at is None
+    ):
+        return False
+
+    return datetime.now(timezone.utc) - as_utc(context.refresh_revoked_at) <= grace
+
+
+# Revoke every refresh token of the presented token's family (one indexed
+# DELETE); nothing to do when its row is already gone
+async def revoke_refresh_family(
+    refresh_token_service: RefreshTokenService, context: RefreshContextDTO
+) -> None:
+    if context.refresh_token is not None:
+        await refresh_token_service.revoke_family(context.refresh_token.family_id)
+
+
 # Check if the refresh token is blacklisted (revoked for any reason)
-# Raises error if token is revoked
+# Raises error if token is revoked, unless it is within the rotation grace.
+# A token that was already rotated being used again means someone else holds
+# a copy, so its whole family is revoked as well.
 async def check_refresh_blacklist(
-    token_service: BlacklistedTokenService,
-    refresh_dto: JWTRefreshTokenDTO,
+    refresh_token_service: RefreshTokenService,
+    context: RefreshContextDTO,
+    grace: timedelta | None = None,
 ) -> None:
-    try:
-        token = await token_service.get_by_jti(ULID(refresh_dto.jti))
-        raise AuthTokenRevokedError(TokenType.REFRESH_TOKEN, token.reason)
-    except BlacklistedTokenNotFoundError:
-        pass
+    reason = context.refresh_revoked
+
+    if not reason or within_rotation_grace(context, grace):
+        return
+
+    if reason == BlacklistReason.TOKEN_ROTATION:
+        await revoke_refresh_family(refresh_token_service, context)
+
+    raise AuthTokenRevokedError(TokenType.REFRESH_TOKEN, reason)
 
 
 # Check if access token is blacklisted
-# If it’s not blacklisted for TOKEN_ROTATION, blacklist the refresh token too and raise an error
+# If it’s not blacklisted for TOKEN_ROTATION, revoke the refresh token's
+# family too and raise an error
 async def check_access_blacklist_or_rotation(
-    token_service: BlacklistedTokenService,
-    access_dto: JWTAccessTokenDTO,
-    refresh_dto: JWTRefreshTokenDTO,
+    refresh_token_service: RefreshTokenService,
+    context: RefreshContextDTO,
 ) -> None:
-    try:
-        token = await token_service.get_by_jti(ULID(access_dto.jti))
-        if token.reason != BlacklistReason.TOKEN_ROTATION:
-            await token_service.add_token(
-                BlacklistedTokenDTO(
-                    jti=ULID(refresh_dto.jti),
-                    reason=BlacklistReason.TOKEN_ROTATION,
-                    blacklisted_at=datetime.now(timezone.utc),
-                )
-            )
-            raise AuthTokenRevokedError(
-                TokenType.REFRESH_TOKEN, BlacklistReason.TOKEN_ROTATION
-            )
-    except BlacklistedTokenNotFoundError:
-        pass
+    reason = context.access_revoked
+
+    if reason and reason != BlacklistReason.TOKEN_ROTATION:
+        await revoke_refresh_family(refresh_token_service, context)
+        raise AuthTokenRevokedError(
+            TokenType.REFRESH_TOKEN, BlacklistReason.TOKEN_ROTATION
+        )
 
 
 # Verify the refresh token exists, is valid, and matches device/ip
-# If invalid or suspicious, blacklist it and raise an error
+# If suspicious, revoke its family and raise an error
 async def verify_refresh_token(
     refresh_token_service: RefreshTokenService,
-    blacklisted_token_service: BlacklistedTokenService,
     request_dto: RefreshAccessTokenInDTO,
-    refresh_dto: JWTRefreshTokenDTO,
+    context: RefreshContextDTO,
 ) -> RefreshTokenDTO:
-    try:
-        token_db = await refresh_token_service.get_by_jti(ULID(refresh_dto.jti))
-    except RefreshTokenNotFoundError:
+    token_db = context.refresh_token
+
+    if token_db is None:
         raise AuthTokenInvalidError()
 
     if not await refresh_token_service.verify_token(
@@ -106,13 +140,7 @@ async def verify_refresh_token(
         token_db.ip_address != request_dto.ip_address
         or token_db.device_info != request_dto.device_info
     ):
-        await blacklisted_token_service.add_token(
-            BlacklistedTokenDTO(
-                jti=token_db.jti,
-                reason=BlacklistReason.COMPROMISED_TOKEN,
-                blacklisted_at=datetime.now(timezone.utc),
-            )
-        )
+        await revoke_refresh_family(refresh_token_service, context)
         raise AuthTokenRevokedError(
             TokenType.REFRESH_TOKEN, BlacklistReason.COMPROMISED_TOKEN
         )
@@ -126,63 +154,58 @@ async def debug_add_token(dto, token_service):
     return result
 
 
-# Blacklist both access and refresh tokens due to rotation
-async def blacklist_for_rotation(
+# Blacklist entries due to rotation: the access token (unless an earlier
+# refresh already revoked it) and, when it was replaced, the refresh token
+def rotation_blacklist_entries(
+    context: RefreshContextDTO,
     access_dto: JWTAccessTokenDTO,
     refresh_dto: JWTRefreshTokenDTO,
-    token_service: BlacklistedTokenService,
-) -> None:
+    refresh_rotated: bool,
+) -> list[BlacklistedTokenDTO]:
     now = datetime.now(timezone.utc)
+    token_dtos = []
 
-    await token_service.add_token(
-        BlacklistedTokenDTO(
-            jti=ULID(access_dto.jti),
-            reason=BlacklistReason.TOKEN_ROTATION,
-            blacklisted_at=now,
-        )
-    )
+    if context.access_revoked is None:
+        token_dtos.append(access_dto)
+    if refresh_rotated:
+        token_dtos.append(refresh_dto)
 
-    await token_service.add_token(
+    return [
         BlacklistedTokenDTO(
-            jti=ULID(refresh_dto.jti),
+            jti=ULID(token_dto.jti),
             reason=BlacklistReason.TOKEN_ROTATION,
             blacklisted_at=now,
+            expires_at=token_dto.exp,
         )
-    )
+        for token_dto in token_dtos
+    ]
 
 
-# If the refresh token is about to expire (less than 2 days), issue a new one and save it
-# Returns the new token string, or None if not needed
-async def rotate_refresh_token_if_needed(
+# Issue a new refresh token in the same family when the policy says so
+# Returns the new token string and its row (not saved yet), or None if not needed
+async def mint_refresh_token_if_needed(
     jwt_service: JWTService,
     refresh_token_service: RefreshTokenService,
+    rotation_policy: RefreshRotationPolicy,
     token_db: RefreshTokenDTO,
     request_dto: RefreshAccessTokenInDTO,
-) -> str | None:
-    now = datetime.now(timezone.utc)
-    expires = token_db.expires_at.replace(tzinfo=timezone.utc)
-
-    if expires - now >= timedelta(days=2):
+) -> tuple[str, RefreshTokenDTO] | None:
+    if not rotation_policy.should_rotate(token_db, datetime.now(timezone.utc)):
         return None
 
-    new_refresh_token = await jwt_service.encode_token(
+    new_refresh = await jwt_service.mint_token(
         token_db.user_id,
         TokenType.REFRESH_TOKEN,
         ip=request_dto.ip_address,
     )
 
-    new_dto = await jwt_service.decode_token(new_refresh_token, TokenType.REFRESH_TOKEN)
-
-    await refresh_token_service.save_refresh_token(
-        RefreshTokenDTO(
-            user_id=ULID(new_dto.sub),
-            jti=ULID(new_dto.jti),
-            hashed_token=new_refresh_token,
-            created_at=new_dto.iat,
-            expires_at=new_dto.exp,
-            ip_address=request_dto.ip_address,
-            device_info=request_dto.device_info,
-        )
+    return new_refresh.token, RefreshTokenDTO(
+        user_id=ULID(new_refresh.claims.sub),
+        jti=ULID(new_refresh.claims.jti),
+        hashed_token=await refresh_token_service.digest_token(new_refresh.token),
+        created_at=new_refresh.claims.iat,
+        expires_at=new_refresh.claims.exp,
+        family_id=token_db.family_id,
+        ip_address=request_dto.ip_address,
+        device_info=request_dto.device_info,
     )
-
-    return new_refresh_token
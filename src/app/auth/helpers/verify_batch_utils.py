@@ -0,0 +1,117 @@
+from app.core import ULID
+from app.users.dtos import UserOutDTO
+from app.users.exceptions import UserNotFoundError
+from app.users.service import UserService
+from ..constants import auth_constants
+from ..dtos import (
+    BlacklistedTokenDTO,
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    TokenVerifyResultDTO,
+)
+from ..enums import TokenType
+from ..exceptions.token_exceptions import (
+    JWTTokenCredentialsInvalidError,
+    JWTTokenExpiredError,
+    JWTTokenInvalidError,
+    JWTTokenTypeInvalidError,
+)
+from ..services.blacklisted_token_service import BlacklistedTokenService
+from .authenticate_user_utils import issued_before
+from ..services.jwt_service import JWTService
+
+TokenDTO = JWTAccessTokenDTO | JWTRefreshTokenDTO
+
+
+# VERIFY BATCH helper functions
+
+
+# Decode every token in one pass; a failure only affects its own slot
+async def decode_tokens(
+    jwt_service: JWTService,
+    tokens: list[str],
+    token_type: TokenType,
+) -> list[TokenDTO | TokenVerifyResultDTO]:
+    decoded = []
+
+    for token in tokens:
+        try:
+            token_dto = await jwt_service.decode_token(token, token_type)
+
+            # Both are looked up as ULIDs below
+            ULID(token_dto.jti)
+            ULID(token_dto.sub)
+            decoded.append(token_dto)
+        except (
+            JWTTokenCredentialsInvalidError,
+            JWTTokenExpiredError,
+            JWTTokenInvalidError,
+            JWTTokenTypeInvalidError,
+        ) as exc:
+            decoded.append(TokenVerifyResultDTO(valid=False, error=str(exc)))
+        except ValueError:
+            decoded.append(
+                TokenVerifyResultDTO(
+                    valid=False, error=auth_constants.ERR_INVALID_TOKEN
+                )
+            )
+
+    return decoded
+
+
+# One IN query for the blacklist and one for the users, whatever the batch size
+async def fetch_revocations_and_users(
+    blacklisted_token_service: BlacklistedTokenService,
+    user_service: UserService,
+    token_dtos: list[TokenDTO],
+) -> tuple[dict[ULID, BlacklistedTokenDTO], dict[ULID, UserOutDTO]]:
+    jtis = list({ULID(token_dto.jti) for token_dto in token_dtos})
+    user_ids = list({ULID(token_dto.sub) for token_dto in token_dtos})
+
+    revoked = await blacklisted_token_service.get_by_jtis(jtis)
+    users = await user_service.get_users_by_ids(user_ids)
+
+    return revoked, users
+
+
+def build_verify_result(
+    token_dto: TokenDTO,
+    revoked: dict[ULID, BlacklistedTokenDTO],
+    users: dict[ULID, UserOutDTO],
+) -> TokenVerifyResultDTO:
+    blacklisted_token = revoked.get(ULID(token_dto.jti))
+
+    if blacklisted_token:
+        return TokenVerifyResultDTO(
+            valid=False,
+            revoked=True,
+            revoked_reason=blacklisted_token.reason,
+            error=auth_constants.ERR_TOKEN_REVOKED.format(
+                reason=blacklisted_token.reason.value
+            ),
+            claims=token_dto,
+        )
+
+    user = users.get(ULID(token_dto.sub))
+
+    if not user:
+        error = str(UserNotFoundError())
+    elif user.is_deleted:
+        error = auth_constants.ERR_ACCOUNT_DELETED
+    elif not user.is_active:
+        error = auth_constants.ERR_ACCOUNT_DEACTIVATED
+    elif user.tokens_valid_after is not None and issued_before(
+        token_dto, user.tokens_valid_after
+    ):
+        return TokenVerifyResultDTO(
+            valid=False,
+            revoked=True,
+            error=auth_constants.ERR_TOKEN_REVOKED.format(
+                reason=auth_constants.REVOKED_ALL_SESSIONS
+            ),
+            claims=token_dto,
+        )
+    else:
+        return TokenVerifyResultDTO(valid=True, claims=token_dto, role=user.role)
+
+    return TokenVerifyResultDTO(valid=False, error=error, claims=token_dto)
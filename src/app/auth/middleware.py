@@ -0,0 +1,63 @@
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.container import container_for
+from .exception_handlers import AUTH_ERROR_STATUS_CODES, auth_error_response
+from .exceptions.auth_exceptions import AuthTokenInvalidError
+
+# Scope state key holding the AuthPrincipalDTO, read by AuthCurrentUserDep
+PRINCIPAL_STATE_KEY = "principal"
+
+_AUTH_ERRORS = tuple(AUTH_ERROR_STATUS_CODES)
+
+
+def bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name != b"authorization":
+            continue
+
+        scheme, _, credentials = value.decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not credentials.strip():
+            return None
+
+        return credentials.strip()
+
+    return None
+
+
+# Pure ASGI, so it runs before routing, dependency resolution and session
+# creation. Requests with a bearer token are authenticated once here and get
+# the principal in scope["state"]; invalid tokens are rejected on the spot.
+# Requests without one pass through and protected routes answer 403 as before.
+# Exempt paths (e.g. /refresh-token, which takes an expired access token)
+# handle their Authorization header themselves.
+class AuthenticationMiddleware:
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] = ()) -> None:
+        self.__app = app
+        self.__exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.__exempt_paths:
+            await self.__app(scope, receive, send)
+            return
+
+        token = bearer_token(scope)
+        if token is None:
+            await self.__app(scope, receive, send)
+            return
+
+        principal_service = container_for(scope["app"]).principal_service
+
+        try:
+            principal = await principal_service.resolve(token)
+        except _AUTH_ERRORS as exc:
+            await auth_error_response(exc)(scope, receive, send)
+            return
+        except ValueError:
+            # sub or jti that is not a ULID
+            await auth_error_response(AuthTokenInvalidError())(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})[PRINCIPAL_STATE_KEY] = principal
+        await self.__app(scope, receive, send)
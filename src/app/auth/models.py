@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import String, TEXT, DateTime, Enum
+from sqlalchemy import String, TEXT, DateTime, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core import ULID, ULIDTypeDB
@@ -13,6 +13,8 @@ class RefreshToken(Base):
 
     jti: Mapped[ULID] = mapped_column(ULIDTypeDB, primary_key=True, index=True)
     user_id: Mapped[ULID] = mapped_column(ULIDTypeDB, nullable=False, index=True)
+    # The jti of the token issued at login; tokens rotated from it keep it
+    family_id: Mapped[ULID] = mapped_column(ULIDTypeDB, nullable=False, index=True)
     hashed_token: Mapped[str] = mapped_column(String(110), nullable=False)
     ip_address: Mapped[str] = mapped_column(String(45), nullable=False)
     device_info: Mapped[str] = mapped_column(TEXT, nullable=True)
@@ -24,6 +26,16 @@ class RefreshToken(Base):
     expires_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
+    )
+    # Last refresh that kept this token, for the "idle" rotation policy
+    last_used_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    # Listing a user's sessions and evicting the oldest ones
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id_created_at", "user_id", "created_at"),
     )
 
 
@@ -39,3 +51,8 @@ class BlacklistedToken(Base):
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
     )
+    # The token's own exp; once it has passed the row can be purged. NULL for
+    # rows written before the column existed.
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
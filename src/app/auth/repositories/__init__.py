@@ -1,2 +1,3 @@
 from .blacklisted_token_repository import BlacklistedTokenRepository
 from .refresh_token_repository import RefreshTokenRepository
+from .token_refresh_repository import TokenRefreshRepository
@@ -1,6 +1,8 @@
 from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Sequence
 
-from sqlalchemy import insert, delete, select
+from sqlalchemy import insert, delete, select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import ULID
@@ -35,3 +37,53 @@ class BlacklistedTokenRepository:
     async def get_by_jti(self, jti: ULID) -> BlacklistedToken | None:
         stmt = select(BlacklistedToken).where(BlacklistedToken.jti == jti)
         return await self.__db.scalar(stmt)
+
+    @handle_db_exceptions
+    async def get_by_jtis(self, jtis: list[ULID]) -> Sequence[BlacklistedToken]:
+        if not jtis:
+            return []
+
+        stmt = select(BlacklistedToken).where(BlacklistedToken.jti.in_(jtis))
+        tokens = await self.__db.scalars(stmt)
+        return tokens.all()
+
+    @handle_db_exceptions
+    async def count_tokens(self) -> int:
+        return await self.__db.scalar(
+            select(func.count()).select_from(BlacklistedToken)
+        )
+
+    # Streams every jti to the callback without materialising the whole table
+    @handle_db_exceptions
+    async def for_each_jti(
+        self, callback: Callable[[ULID], None], batch_size: int = 10_000
+    ) -> None:
+        stmt = select(BlacklistedToken.jti).execution_options(yield_per=batch_size)
+        jtis = await self.__db.stream_scalars(stmt)
+
+        async for jti in jtis:
+            callback(jti)
+
+    # Deletes at most batch_size rows whose token expired before `before`.
+    # Rows without expires_at are matched on blacklisted_at < legacy_before.
+    @handle_db_exceptions
+    async def delete_expired(
+        self, before: datetime, legacy_before: datetime, batch_size: int
+    ) -> int:
+        expired = (
+            select(BlacklistedToken.jti)
+            .where(
+                or_(
+                    BlacklistedToken.expires_at < before,
+                    and_(
+                        BlacklistedToken.expires_at.is_(None),
+                        BlacklistedToken.blacklisted_at < legacy_before,
+                    ),
+                )
+            )
+            .limit(batch_size)
+        )
+        stmt = delete(BlacklistedToken).where(BlacklistedToken.jti.in_(expired))
+        result = await self.__db.execute(stmt)
+        await self.__db.commit()
+        return result.rowcount
@@ -1,23 +1,52 @@
 from dataclasses import asdict
+from datetime import datetime
 from typing import Sequence
 
-from sqlalchemy import insert, delete, select
+from sqlalchemy import delete, exists, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import ULID
 from app.db import handle_db_exceptions
+from app.users.models import User
 from ..dtos import RefreshTokenDTO
-from ..models import RefreshToken
+from ..models import BlacklistedToken, RefreshToken
+
+
+# Keeps the max_sessions most recently renewed families of the user. created_at
+# has second precision; jtis (ULIDs) order tokens issued within one second.
+def _evict_sessions_stmt(user_id: ULID, max_sessions: int):
+    kept = (
+        select(RefreshToken.family_id)
+        .where(RefreshToken.user_id == user_id)
+        .group_by(RefreshToken.family_id)
+        .order_by(
+            func.max(RefreshToken.created_at).desc(), func.max(RefreshToken.jti).desc()
+        )
+        .limit(max_sessions)
+    )
+    return delete(RefreshToken).where(
+        RefreshToken.user_id == user_id, RefreshToken.family_id.not_in(kept)
+    )
 
 
 class RefreshTokenRepository:
     def __init__(self, db: AsyncSession) -> None:
         self.__db = db
 
+    # With max_sessions, the user's sessions over the cap are evicted oldest
+    # first in the same transaction
     @handle_db_exceptions
-    async def save_token(self, create_dto: RefreshTokenDTO) -> RefreshToken:
+    async def save_token(
+        self, create_dto: RefreshTokenDTO, max_sessions: int = 0
+    ) -> RefreshToken:
         stmt = insert(RefreshToken).values(**asdict(create_dto)).returning(RefreshToken)
         inserted_refresh_token = await self.__db.scalar(stmt)
+
+        if max_sessions > 0:
+            await self.__db.execute(
+                _evict_sessions_stmt(create_dto.user_id, max_sessions)
+            )
+
         await self.__db.commit()
         return inserted_refresh_token
 
@@ -27,9 +56,24 @@ class RefreshTokenRepository:
         refresh_token = await self.__db.scalar(stmt)
         return refresh_token
 
+    # Newest first; with valid_at, only tokens still usable at that moment
+    # (not expired, not blacklisted)
     @handle_db_exceptions
-    async def list_tokens_by_user_id(self, user_id: ULID) -> Sequence[RefreshToken]:
-        stmt = select(RefreshToken).where(RefreshToken.user_id == user_id)
+    async def list_tokens_by_user_id(
+        self, user_id: ULID, valid_at: datetime | None = None
+    ) -> Sequence[RefreshToken]:
+        stmt = (
+            select(RefreshToken)
+            .where(RefreshToken.user_id == user_id)
+            .order_by(RefreshToken.created_at.desc(), RefreshToken.jti.desc())
+        )
+
+        if valid_at is not None:
+            stmt = stmt.where(
+                RefreshToken.expires_at > valid_at,
+                ~exists().where(BlacklistedToken.jti == RefreshToken.jti),
+            )
+
         result = await self.__db.scalars(stmt)
         return result.all()
 
@@ -39,3 +83,55 @@ class RefreshTokenRepository:
         await self.__db.execute(stmt)
         await self.__db.commit()
         return
+
+    # One indexed DELETE for the token and everything rotated from or into it
+    @handle_db_exceptions
+    async def delete_family(self, family_id: ULID) -> int:
+        stmt = delete(RefreshToken).where(RefreshToken.family_id == family_id)
+        result = await self.__db.execute(stmt)
+        await self.__db.commit()
+        return result.rowcount
+
+    # The whole family of one of the user's tokens; 0 when the jti is not
+    # one of theirs
+    @handle_db_exceptions
+    async def delete_user_family(self, user_id: ULID, jti: ULID) -> int:
+        family = (
+            select(RefreshToken.family_id)
+            .where(RefreshToken.jti == jti, RefreshToken.user_id == user_id)
+            .scalar_subquery()
+        )
+        stmt = delete(RefreshToken).where(
+            RefreshToken.user_id == user_id, RefreshToken.family_id == family
+        )
+        result = await self.__db.execute(stmt)
+        await self.__db.commit()
+        return result.rowcount
+
+    # Bulk revocation in one transaction: one UPDATE moves the user's
+    # tokens_valid_after, one DELETE drops their refresh tokens so no session
+    # is listed past it. False when the user does not exist
+    @handle_db_exceptions
+    async def revoke_user_tokens(self, user_id: ULID, valid_after: datetime) -> bool:
+        result = await self.__db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(tokens_valid_after=valid_after)
+        )
+        await self.__db.execute(
+            delete(RefreshToken).where(RefreshToken.user_id == user_id)
+        )
+        await self.__db.commit()
+        return result.rowcount > 0
+
+    @handle_db_exceptions
+    async def delete_expired(self, before: datetime, batch_size: int) -> int:
+        expired = (
+            select(RefreshToken.jti)
+            .where(RefreshToken.expires_at < before)
+            .limit(batch_size)
+        )
+        stmt = delete(RefreshToken).where(RefreshToken.jti.in_(expired))
+        result = await self.__db.execute(stmt)
+        await self.__db.commit()
+        return result.rowcount
@@ -0,0 +1,88 @@
+from dataclasses import asdict
+from datetime import datetime
+
+from sqlalchemy import Row, and_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import ULID
+from app.db import handle_db_exceptions
+from app.users.models import User
+from ..dtos import BlacklistedTokenDTO, RefreshTokenDTO
+from ..models import BlacklistedToken, RefreshToken
+
+
+def _blacklist_column(column, jti: ULID):
+    return select(column).where(BlacklistedToken.jti == jti).scalar_subquery()
+
+
+# The statements of POST /auth/refresh-token: one read and one write batch
+class TokenRefreshRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.__db = db
+
+    # The user, the refresh token row (None when missing) and the blacklist
+    # reason of both jtis (None when not blacklisted), plus when the refresh
+    # token was blacklisted, in a single SELECT. None when the user does not
+    # exist.
+    @handle_db_exceptions
+    async def get_refresh_context(
+        self, user_id: ULID, refresh_jti: ULID, access_jti: ULID
+    ) -> Row | None:
+        stmt = (
+            select(
+                User,
+                RefreshToken,
+                _blacklist_column(BlacklistedToken.reason, access_jti).label(
+                    "access_revoked"
+                ),
+                _blacklist_column(BlacklistedToken.reason, refresh_jti).label(
+                    "refresh_revoked"
+                ),
+                _blacklist_column(BlacklistedToken.blacklisted_at, refresh_jti).label(
+                    "refresh_revoked_at"
+                ),
+            )
+            .outerjoin(
+                RefreshToken,
+                and_(RefreshToken.jti == refresh_jti, RefreshToken.user_id == User.id),
+            )
+            .where(User.id == user_id)
+        )
+        result = await self.__db.execute(stmt)
+        return result.one_or_none()
+
+    # Everything a successful refresh writes, committed once, whatever the
+    # rotation policy decided. Changes to the presented token's row (digest
+    # upgrade, last use) go out as a single UPDATE.
+    @handle_db_exceptions
+    async def save_rotation(
+        self,
+        blacklisted: list[BlacklistedTokenDTO],
+        new_refresh_token: RefreshTokenDTO | None = None,
+        upgraded_digest: tuple[ULID, str] | None = None,
+        last_used: tuple[ULID, datetime] | None = None,
+    ) -> None:
+        if blacklisted:
+            await self.__db.execute(
+                insert(BlacklistedToken), [asdict(dto) for dto in blacklisted]
+            )
+
+        row_updates: dict[ULID, dict] = {}
+        if upgraded_digest is not None:
+            jti, hashed_token = upgraded_digest
+            row_updates.setdefault(jti, {})["hashed_token"] = hashed_token
+        if last_used is not None:
+            jti, used_at = last_used
+            row_updates.setdefault(jti, {})["last_used_at"] = used_at
+
+        for jti, values in row_updates.items():
+            await self.__db.execute(
+                update(RefreshToken).where(RefreshToken.jti == jti).values(**values)
+            )
+
+        if new_refresh_token is not None:
+            await self.__db.execute(
+                insert(RefreshToken).values(**asdict(new_refresh_token))
+            )
+
+        await self.__db.commit()
@@ -1,14 +1,33 @@
-from fastapi import APIRouter, status, Request, Response, Cookie
+from typing import Annotated
+
+from fastapi import APIRouter, status, Request, Response, Cookie, Form
 
 from app.common.schemas import MessageOut
+from app.core import ULID
 from app.users.dtos import UserCreateInDTO
 from app.utils.dto_utils import pydantic_to_dto
 from app.utils.token_utils import get_refresh_token_max_age
-from .dependencies import AuthServiceDep, AuthTokenDep, AuthCurrentUserDep
+from .dependencies import (
+    AuthServiceDep,
+    AuthTokenDep,
+    AuthCurrentUserDep,
+    PrincipalServiceDep,
+    AuthClientDep,
+)
 from .dtos import AuthLoginInDTO
 from .dtos.auth_dtos import RefreshAccessTokenInDTO
 from .enums import TokenType
-from .schemas import AuthSignUpIn, UserPublicOut, AuthLoginIn, AuthTokenOut
+from .middleware import bearer_token
+from .schemas import (
+    AuthSignUpIn,
+    UserPublicOut,
+    AuthLoginIn,
+    AuthTokenOut,
+    TokenVerifyBatchIn,
+    TokenVerifyBatchOut,
+    TokenIntrospectionOut,
+    SessionOut,
+)
 
 router = APIRouter()
 
@@ -74,6 +93,37 @@ async def logout(
     )
 
 
+# Every token issued to the user so far, on every device
+@router.post("/logout-all", status_code=status.HTTP_200_OK)
+async def logout_all(
+    current_user: AuthCurrentUserDep, service: AuthServiceDep
+) -> MessageOut:
+    return await service.logout_all(ULID(current_user.user_id))
+
+
+# One entry per login still able to refresh, newest first
+@router.get("/sessions", status_code=status.HTTP_200_OK)
+async def list_sessions(
+    current_user: AuthCurrentUserDep, service: AuthServiceDep
+) -> list[SessionOut]:
+    return await service.list_sessions(ULID(current_user.user_id))
+
+
+@router.delete(
+    "/sessions/{jti}",
+    status_code=status.HTTP_200_OK,
+    description=(
+        "Revokes the session's refresh token, so it can no longer be renewed. "
+        "An access token already issued to that session stays valid until it "
+        "expires; use /logout-all to revoke access tokens immediately."
+    ),
+)
+async def revoke_session(
+    jti: str, current_user: AuthCurrentUserDep, service: AuthServiceDep
+) -> MessageOut:
+    return await service.revoke_session(ULID(current_user.user_id), jti)
+
+
 @router.post("/refresh-token", status_code=status.HTTP_200_OK)
 async def refresh_access_token(
     request: Request,
@@ -103,3 +153,51 @@ async def refresh_access_token(
         )
 
     return tokens
+
+
+# For gateways: many tokens per call, revocations and users resolved in bulk.
+# Same client authentication as /introspect
+@router.post("/verify/batch", status_code=status.HTTP_200_OK)
+async def verify_tokens_batch(
+    verify_request: TokenVerifyBatchIn,
+    client: AuthClientDep,
+    service: AuthServiceDep,
+) -> TokenVerifyBatchOut:
+    results = await service.verify_tokens(
+        verify_request.tokens, verify_request.token_type
+    )
+    return TokenVerifyBatchOut(results=results)
+
+
+# RFC 7662: inactive tokens are reported as {"active": false} and nothing else.
+# Only configured clients may call it
+@router.post(
+    "/introspect",
+    status_code=status.HTTP_200_OK,
+    response_model_exclude_none=True,
+)
+async def introspect_token(
+    token: Annotated[str, Form()],
+    client: AuthClientDep,
+    service: AuthServiceDep,
+    token_type_hint: Annotated[str | None, Form()] = None,
+) -> TokenIntrospectionOut:
+    return await service.introspect_token(token, token_type_hint)
+
+
+# nginx auth_request / Traefik ForwardAuth: status and headers only, no body
+@router.get("/forward", response_class=Response)
+async def forward_auth(request: Request, service: PrincipalServiceDep) -> Response:
+    token = bearer_token(request.scope)
+    principal = await service.authorize(token) if token else None
+
+    if principal is None:
+        return Response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={"X-User-Id": principal.user_id, "X-User-Role": principal.role.value},
+    )
@@ -1,2 +1,10 @@
-from .requests import AuthSignUpIn, AuthLoginIn
-from .responses import UserPublicOut, AuthTokenOut
+from .requests import AuthSignUpIn, AuthLoginIn, TokenVerifyBatchIn
+from .responses import (
+    UserPublicOut,
+    AuthTokenOut,
+    TokenClaimsOut,
+    TokenVerifyResultOut,
+    TokenVerifyBatchOut,
+    TokenIntrospectionOut,
+    SessionOut,
+)
@@ -3,6 +3,9 @@ from typing import Any, Self
 
 from pydantic import BaseModel, Field, EmailStr, field_validator
 
+from app.core import config
+from ..enums import TokenType
+
 
 class AuthLoginIn(BaseModel):
     email: EmailStr
@@ -40,3 +43,10 @@ class AuthSignUpIn(BaseModel):
         if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", value):
             raise ValueError("Password must contain at least one special character")
         return value
+
+
+class TokenVerifyBatchIn(BaseModel):
+    tokens: list[str] = Field(
+        min_length=1, max_length=config.AUTH_VERIFY_BATCH_MAX_TOKENS
+    )
+    token_type: TokenType = TokenType.ACCESS_TOKEN
@@ -15,3 +15,50 @@ class UserPublicOut(BaseModel):
 class AuthTokenOut(BaseModel):
     access_token: str
     token_type: str
+
+
+class TokenClaimsOut(BaseModel):
+    sub: str
+    jti: str
+    exp: datetime
+    iat: datetime
+    type: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TokenVerifyResultOut(BaseModel):
+    valid: bool
+    revoked: bool
+    revoked_reason: str | None = None
+    error: str | None = None
+    claims: TokenClaimsOut | None = None
+    role: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TokenVerifyBatchOut(BaseModel):
+    results: list[TokenVerifyResultOut]
+
+
+class TokenIntrospectionOut(BaseModel):
+    active: bool
+    sub: str | None = None
+    jti: str | None = None
+    exp: int | None = None
+    iat: int | None = None
+    token_type: str | None = None
+    role: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SessionOut(BaseModel):
+    jti: str
+    ip_address: str
+    device_info: str | None = None
+    created_at: datetime
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
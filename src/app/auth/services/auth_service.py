@@ -1,33 +1,64 @@
 # 🔐 Core utilities
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 📦 Shared schemas
 from app.common.schemas import MessageOutDTO
-from app.core import Argon2Hasher, ULID
+from app.core import KDFHasher, ULID
+from app.core.stage_timings import StageTimings
+from app.core.token_digest import TokenDigest
 
 # 👤 User domain
 from app.users.dtos import UserCreateInDTO, UserOutDTO
+from app.users.repository import UserRepository
 from app.users.service import UserService
 from app.utils.dto_utils import db_to_dto
 
 # 🛠️ Auth Services
 from .blacklisted_token_service import BlacklistedTokenService
+from .introspection_cache import IntrospectionCache
 from .jwt_service import JWTService
+from .refresh_coalescer import RefreshCoalescer
 from .refresh_token_service import RefreshTokenService
+from .revocation_bus import RevocationBus
+from .revocation_cache import RevocationCache
+from .rotation_policy import RefreshRotationPolicy, WindowRotation
+from .token_refresh_service import TokenRefreshService
 
 # 📄 Auth Constants, Enums & Auth DTOs
 from ..constants import auth_constants
 from ..dtos import (
     AuthTokensOutDTO,
     AuthLoginInDTO,
+    TokenVerifyResultDTO,
+    TokenIntrospectionDTO,
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    SessionDTO,
 )
 from ..dtos.auth_dtos import RefreshAccessTokenInDTO
 from ..enums import TokenType
+from ..exceptions.auth_exceptions import AuthSessionNotFoundError
+from ..repositories import (
+    BlacklistedTokenRepository,
+    RefreshTokenRepository,
+    TokenRefreshRepository,
+)
 
 # 🔄 Token Utility Functions
 from ..helpers import decode_token, get_user_or_auth_error
 from ..helpers.authenticate_user_utils import (
     validate_token_type,
     check_token_blacklist,
+    check_tokens_valid_after,
+)
+from ..helpers.introspect_utils import (
+    INACTIVE_TOKEN_ERRORS,
+    introspection_token_types,
+    build_introspection_result,
 )
 from ..helpers.login_utils import (
     validate_user_credentials,
@@ -39,11 +70,18 @@ from ..helpers.logout_utils import (
 )
 from ..helpers.refresh_token_util import (
     get_token_dtos,
+    check_refresh_user,
     check_refresh_blacklist,
+    within_rotation_grace,
     check_access_blacklist_or_rotation,
     verify_refresh_token,
-    blacklist_for_rotation,
-    rotate_refresh_token_if_needed,
+    rotation_blacklist_entries,
+    mint_refresh_token_if_needed,
+)
+from ..helpers.verify_batch_utils import (
+    decode_tokens,
+    fetch_revocations_and_users,
+    build_verify_result,
 )
 from ...common import gather_with_exception_check
 
@@ -51,19 +89,69 @@ from ...common import gather_with_exception_check
 class AuthService:
     def __init__(
         self,
-        user_service: UserService,
+        db: AsyncSession,
         jwt_service: JWTService,
-        refresh_token_service: RefreshTokenService,
-        blacklisted_token_service: BlacklistedTokenService,
-        hasher: Argon2Hasher,
+        hasher: KDFHasher,
+        refresh_token_digest: TokenDigest,
+        introspection_cache: IntrospectionCache | None = None,
+        revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        revocation_cache: RevocationCache | None = None,
+        user_revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        revocation_bus: RevocationBus | None = None,
+        refresh_timings: StageTimings | None = None,
+        refresh_coalescer: RefreshCoalescer | None = None,
+        max_sessions_per_user: int = 0,
+        rotation_policy: RefreshRotationPolicy | None = None,
     ) -> None:
-        self.__user_service = user_service
+        self.__db = db
         self.__jwt_service = jwt_service
-        self.__refresh_token_service = refresh_token_service
-        self.__blacklisted_token_service = blacklisted_token_service
         self.__hasher = hasher
+        self.__refresh_token_digest = refresh_token_digest
+        self.__introspection_cache = introspection_cache
+        self.__revocation_listeners = revocation_listeners
+        self.__revocation_cache = revocation_cache
+        self.__user_revocation_listeners = user_revocation_listeners
+        self.__revocation_bus = revocation_bus
+        # Per-stage durations of refresh_access_token
+        self.__refresh_timings = (
+            refresh_timings if refresh_timings is not None else StageTimings()
+        )
+        self.__refresh_coalescer = refresh_coalescer
+        # 0: no cap
+        self.__max_sessions_per_user = max_sessions_per_user
+        self.__rotation_policy = (
+            rotation_policy
+            if rotation_policy is not None
+            else WindowRotation(timedelta(days=2))
+        )
 
-    async def authenticate_user(self, token: str, token_type: TokenType) -> UserOutDTO:
+    # Session-bound services are only built when a flow actually uses them
+    @cached_property
+    def __user_service(self) -> UserService:
+        return UserService(UserRepository(self.__db), self.__hasher)
+
+    @cached_property
+    def __refresh_token_service(self) -> RefreshTokenService:
+        return RefreshTokenService(
+            RefreshTokenRepository(self.__db), self.__refresh_token_digest
+        )
+
+    @cached_property
+    def __token_refresh_service(self) -> TokenRefreshService:
+        return TokenRefreshService(TokenRefreshRepository(self.__db))
+
+    @cached_property
+    def __blacklisted_token_service(self) -> BlacklistedTokenService:
+        return BlacklistedTokenService(
+            BlacklistedTokenRepository(self.__db),
+            self.__revocation_listeners,
+            self.__revocation_cache,
+            self.__revocation_bus,
+        )
+
+    async def __authenticate(
+        self, token: str, token_type: TokenType
+    ) -> tuple[JWTAccessTokenDTO | JWTRefreshTokenDTO, UserOutDTO]:
         validate_token_type(token_type)
         token_dto = await decode_token(token, token_type, self.__jwt_service)
 
@@ -73,8 +161,40 @@ class AuthService:
             token_type,
         )
         user = await get_user_or_auth_error(self.__user_service, token_dto.sub)
+        check_tokens_valid_after(user, token_dto, token_type)
+        return token_dto, user
+
+    async def authenticate_user(self, token: str, token_type: TokenType) -> UserOutDTO:
+        _, user = await self.__authenticate(token, token_type)
         return await db_to_dto(user, UserOutDTO)
 
+    async def introspect_token(
+        self, token: str, token_type_hint: str | None = None
+    ) -> TokenIntrospectionDTO:
+        cache = self.__introspection_cache
+        key = cache.key(token) if cache is not None else None
+
+        if cache is not None and (cached := cache.get(key)) is not None:
+            return cached
+
+        # Revocations during the lookup keep its result out of the cache
+        generation = cache.generation if cache is not None else 0
+        result = TokenIntrospectionDTO(active=False)
+
+        for token_type in introspection_token_types(token_type_hint):
+            try:
+                token_dto, user = await self.__authenticate(token, token_type)
+            except INACTIVE_TOKEN_ERRORS:
+                continue
+
+            result = build_introspection_result(token_dto, user)
+            break
+
+        if cache is not None:
+            cache.put(key, result, generation)
+
+        return result
+
     async def signup(self, create_dto: UserCreateInDTO) -> UserOutDTO:
         return await self.__user_service.create_user(create_dto)
 
@@ -100,6 +220,7 @@ class AuthService:
             login_request.device_info,
             self.__jwt_service,
             self.__refresh_token_service,
+            self.__max_sessions_per_user,
         )
         await self.__user_service.update_last_login(user.id)
 
@@ -116,6 +237,7 @@ class AuthService:
 
         await blacklist_delete_tokens_logout(
             ULID(access_data.jti),
+            access_data.exp,
             refresh_token,
             self.__jwt_service,
             self.__blacklisted_token_service,
@@ -124,45 +246,159 @@ class AuthService:
 
         return MessageOutDTO(auth_constants.SUC_LOGOUT)
 
+    # Revokes every token of the user in one transaction, however many there
+    # are: access tokens through tokens_valid_after, sessions by deleting
+    # their refresh tokens
+    async def logout_all(self, user_id: ULID) -> MessageOutDTO:
+        await self.__refresh_token_service.revoke_all_sessions(user_id)
+
+        for listener in self.__user_revocation_listeners:
+            listener(user_id)
+
+        if self.__revocation_bus is not None:
+            self.__revocation_bus.publish_user(user_id)
+
+        return MessageOutDTO(auth_constants.SUC_LOGOUT_ALL)
+
+    async def list_sessions(self, user_id: ULID) -> list[SessionDTO]:
+        return await self.__refresh_token_service.list_sessions(user_id)
+
+    # Revokes the session's whole refresh token family
+    async def revoke_session(self, user_id: ULID, jti: str) -> MessageOutDTO:
+        try:
+            session_jti = ULID(jti)
+        except ValueError:
+            raise AuthSessionNotFoundError()
+
+        if not await self.__refresh_token_service.revoke_session(user_id, session_jti):
+            raise AuthSessionNotFoundError()
+
+        return MessageOutDTO(auth_constants.SUC_SESSION_REVOKED)
+
+    # Concurrent refreshes with the same refresh token share one result; see
+    # RefreshCoalescer
     async def refresh_access_token(
         self, request_dto: RefreshAccessTokenInDTO
     ) -> AuthTokensOutDTO:
-        access_token_dto, refresh_token_dto = await get_token_dtos(
-            self.__jwt_service, request_dto
-        )
-        await get_user_or_auth_error(self.__user_service, refresh_token_dto.sub)
-        await check_refresh_blacklist(
-            self.__blacklisted_token_service, refresh_token_dto
-        )
-        await check_access_blacklist_or_rotation(
-            self.__blacklisted_token_service, access_token_dto, refresh_token_dto
-        )
-        refresh_db = await verify_refresh_token(
-            self.__refresh_token_service,
-            self.__blacklisted_token_service,
-            request_dto,
-            refresh_token_dto,
+        if self.__refresh_coalescer is None:
+            return await self.__refresh_access_token(request_dto)
+
+        return await self.__refresh_coalescer.run(
+            RefreshCoalescer.key(request_dto),
+            lambda: self.__refresh_access_token(request_dto),
         )
-        await blacklist_for_rotation(
-            access_token_dto,
-            refresh_token_dto,
-            self.__blacklisted_token_service,
+
+    # One SELECT (user, refresh token row and blacklist state together) and,
+    # on success, one transaction for every write; see TokenRefreshRepository.
+    # A refresh token rotated within the grace window only gets a new access
+    # token, nothing is written.
+    async def __refresh_access_token(
+        self, request_dto: RefreshAccessTokenInDTO
+    ) -> AuthTokensOutDTO:
+        timings = self.__refresh_timings
+        grace = (
+            self.__refresh_coalescer.rotation_grace
+            if self.__refresh_coalescer is not None
+            else None
         )
 
-        new_access_token, new_refresh_token = await gather_with_exception_check(
-            [
-                self.__jwt_service.encode_token(refresh_db.jti, TokenType.ACCESS_TOKEN),
-                rotate_refresh_token_if_needed(
-                    self.__jwt_service,
-                    self.__refresh_token_service,
-                    refresh_db,
-                    request_dto,
-                ),
-            ]
+        with timings.measure("decode"):
+            access_token_dto, refresh_token_dto = await get_token_dtos(
+                self.__jwt_service, request_dto
+            )
+
+        with timings.measure("read"):
+            context = await self.__token_refresh_service.get_context(
+                access_token_dto, refresh_token_dto
+            )
+
+        with timings.measure("verify"):
+            check_refresh_user(context, refresh_token_dto)
+            await check_refresh_blacklist(self.__refresh_token_service, context, grace)
+            await check_access_blacklist_or_rotation(
+                self.__refresh_token_service, context
+            )
+            refresh_db = await verify_refresh_token(
+                self.__refresh_token_service, request_dto, context
+            )
+            in_grace = within_rotation_grace(context, grace)
+            upgraded_digest = (
+                None
+                if in_grace
+                else await self.__refresh_token_service.upgraded_digest(
+                    refresh_db, request_dto.refresh_token
+                )
+            )
+
+        if in_grace:
+            with timings.measure("mint"):
+                new_access_token = await self.__jwt_service.encode_token(
+                    refresh_db.user_id, TokenType.ACCESS_TOKEN
+                )
+
+            return AuthTokensOutDTO(
+                access_token=new_access_token, refresh_token=None, token_type="bearer"
+            )
+
+        with timings.measure("mint"):
+            new_access_token, new_refresh_token = await gather_with_exception_check(
+                [
+                    self.__jwt_service.encode_token(
+                        refresh_db.user_id, TokenType.ACCESS_TOKEN
+                    ),
+                    mint_refresh_token_if_needed(
+                        self.__jwt_service,
+                        self.__refresh_token_service,
+                        self.__rotation_policy,
+                        refresh_db,
+                        request_dto,
+                    ),
+                ]
+            )
+
+        blacklisted = rotation_blacklist_entries(
+            context, access_token_dto, refresh_token_dto, new_refresh_token is not None
         )
+        last_used = None
+        if new_refresh_token is None and self.__rotation_policy.tracks_last_use:
+            last_used = (refresh_db.jti, datetime.now(timezone.utc))
+
+        with timings.measure("write"):
+            await self.__token_refresh_service.save_rotation(
+                blacklisted,
+                new_refresh_token[1] if new_refresh_token else None,
+                (refresh_db.jti, upgraded_digest) if upgraded_digest else None,
+                last_used,
+            )
+
+        for entry in blacklisted:
+            self.__blacklisted_token_service.notify_revoked(entry)
 
         return AuthTokensOutDTO(
             access_token=new_access_token,
-            refresh_token=new_refresh_token if new_refresh_token else None,
+            refresh_token=new_refresh_token[0] if new_refresh_token else None,
             token_type="bearer",
         )
+
+    async def verify_tokens(
+        self, tokens: list[str], token_type: TokenType
+    ) -> list[TokenVerifyResultDTO]:
+        validate_token_type(token_type)
+        decoded = await decode_tokens(self.__jwt_service, tokens, token_type)
+
+        token_dtos = [
+            item for item in decoded if not isinstance(item, TokenVerifyResultDTO)
+        ]
+        revoked, users = await fetch_revocations_and_users(
+            self.__blacklisted_token_service, self.__user_service, token_dtos
+        )
+
+        # Results keep the order of the request
+        return [
+            (
+                item
+                if isinstance(item, TokenVerifyResultDTO)
+                else build_verify_result(item, revoked, users)
+            )
+            for item in decoded
+        ]
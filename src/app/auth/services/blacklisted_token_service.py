@@ -1,25 +1,74 @@
+from typing import Callable, Sequence
+
 from app.core import ULID
 from app.utils.dto_utils import db_to_dto
 from ..dtos import BlacklistedTokenDTO
 from ..exceptions.token_exceptions import BlacklistedTokenNotFoundError
 from ..repositories import BlacklistedTokenRepository
+from .revocation_bus import RevocationBus
+from .revocation_cache import RevocationCache
 
 
 class BlacklistedTokenService:
-    def __init__(self, repo: BlacklistedTokenRepository) -> None:
+    def __init__(
+        self,
+        repo: BlacklistedTokenRepository,
+        revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        revocation_cache: RevocationCache | None = None,
+        revocation_bus: RevocationBus | None = None,
+    ) -> None:
         self.__repo = repo
+        # Told the jti of every token blacklisted through this service
+        self.__revocation_listeners = revocation_listeners
+        # Rules out most jtis without a query
+        self.__revocation_cache = revocation_cache
+        # Relays each revocation to the other workers' listeners
+        self.__revocation_bus = revocation_bus
 
     async def add_token(self, create_dto: BlacklistedTokenDTO) -> BlacklistedTokenDTO:
         added_token = await self.__repo.add_token(create_dto)
+        self.notify_revoked(create_dto)
         return await db_to_dto(added_token, BlacklistedTokenDTO)
 
-    async def get_by_jti(self, jti: ULID) -> BlacklistedTokenDTO:
+    # For tokens blacklisted by another repository, once committed
+    def notify_revoked(self, token: BlacklistedTokenDTO) -> None:
+        for listener in self.__revocation_listeners:
+            listener(token.jti)
+
+        if self.__revocation_bus is not None:
+            self.__revocation_bus.publish_token(token.jti, token.expires_at)
+
+    def __might_be_revoked(self, jti: ULID) -> bool:
+        cache = self.__revocation_cache
+        return cache is None or cache.might_be_revoked(jti)
+
+    # None for the usual case of a token that is not blacklisted; the auth
+    # flows use this rather than paying for an exception on every request
+    async def find_by_jti(self, jti: ULID) -> BlacklistedTokenDTO | None:
+        if not self.__might_be_revoked(jti):
+            return None
+
         token = await self.__repo.get_by_jti(jti)
 
         if not token:
-            raise BlacklistedTokenNotFoundError(jti)
+            return None
 
         return await db_to_dto(token, BlacklistedTokenDTO)
 
+    async def get_by_jti(self, jti: ULID) -> BlacklistedTokenDTO:
+        token = await self.find_by_jti(jti)
+
+        if token is None:
+            raise BlacklistedTokenNotFoundError(jti)
+
+        return token
+
+    async def get_by_jtis(self, jtis: list[ULID]) -> dict[ULID, BlacklistedTokenDTO]:
+        jtis = [jti for jti in jtis if self.__might_be_revoked(jti)]
+        tokens = await self.__repo.get_by_jtis(jtis)
+        return {
+            token.jti: await db_to_dto(token, BlacklistedTokenDTO) for token in tokens
+        }
+
     async def delete_token(self, jti: ULID) -> None:
         return await self.__repo.delete_token(jti)
@@ -0,0 +1,140 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.core import ULID
+from ..dtos import TokenIntrospectionDTO
+
+
+# Introspection results keyed by a digest of the raw token. Entries live a few
+# seconds at most (never past the token's exp) and are dropped as soon as
+# their jti is blacklisted or their user's tokens are revoked, so polling
+# stays cheap without serving a revoked token as active. Each revocation also
+# leaves a tombstone, so a result looked up before it (but stored after it)
+# is not cached: callers take `generation` before the lookup and pass it to
+# put().
+class IntrospectionCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.__ttl = ttl_seconds
+        self.__max_entries = max_entries
+
+        # key -> (result, expires_at)
+        self.__entries: OrderedDict[bytes, tuple[TokenIntrospectionDTO, float]] = (
+            OrderedDict()
+        )
+        # jti -> keys of the active results for it
+        self.__by_jti: dict[str, set[bytes]] = {}
+        # sub -> keys of the active results for it
+        self.__by_sub: dict[str, set[bytes]] = {}
+
+        # Bumped by every invalidation
+        self.__generation = 0
+        # ("jti" | "sub", value) -> generation it was revoked at, oldest first
+        self.__tombstones: OrderedDict[tuple[str, str], int] = OrderedDict()
+        # Newest generation whose tombstone was dropped to bound memory
+        self.__forgotten = 0
+
+    @property
+    def generation(self) -> int:
+        return self.__generation
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(
+            token.encode(), digest_size=16, person=b"introspection"
+        ).digest()
+
+    def get(self, key: bytes) -> TokenIntrospectionDTO | None:
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            return None
+
+        result, expires_at = entry
+
+        if expires_at <= time.time():
+            self.__remove(key)
+            return None
+
+        return result
+
+    def put(self, key: bytes, result: TokenIntrospectionDTO, generation: int) -> None:
+        if self.__ttl <= 0 or self.__revoked_since(result, generation):
+            return
+
+        expires_at = time.time() + self.__ttl
+        if result.exp is not None:
+            expires_at = min(expires_at, result.exp)
+
+        if key in self.__entries:
+            self.__remove(key)
+
+        self.__entries[key] = (result, expires_at)
+        if result.jti is not None:
+            self.__by_jti.setdefault(result.jti, set()).add(key)
+        if result.sub is not None:
+            self.__by_sub.setdefault(result.sub, set()).add(key)
+
+        while len(self.__entries) > self.__max_entries:
+            self.__remove(next(iter(self.__entries)))
+
+    # Revocation listener, see BlacklistedTokenService.add_token
+    def invalidate(self, jti: ULID | str) -> None:
+        self.__tombstone("jti", str(jti))
+
+        for key in list(self.__by_jti.get(str(jti), ())):
+            self.__remove(key)
+
+    # User revocation listener, see AuthService.logout_all
+    def invalidate_user(self, user_id: ULID | str) -> None:
+        self.__tombstone("sub", str(user_id))
+
+        for key in list(self.__by_sub.get(str(user_id), ())):
+            self.__remove(key)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__by_jti.clear()
+        self.__by_sub.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __tombstone(self, kind: str, value: str) -> None:
+        self.__generation += 1
+        self.__tombstones[(kind, value)] = self.__generation
+        self.__tombstones.move_to_end((kind, value))
+
+        while len(self.__tombstones) > self.__max_entries:
+            _, self.__forgotten = self.__tombstones.popitem(last=False)
+
+    def __revoked_since(self, result: TokenIntrospectionDTO, generation: int) -> bool:
+        if not result.active or generation == self.__generation:
+            return False
+
+        # A tombstone newer than the lookup may have been dropped
+        if self.__forgotten > generation:
+            return True
+
+        return any(
+            self.__tombstones.get((kind, value), 0) > generation
+            for kind, value in (("jti", result.jti), ("sub", result.sub))
+            if value is not None
+        )
+
+    def __remove(self, key: bytes) -> None:
+        result, _ = self.__entries.pop(key)
+
+        _discard(self.__by_jti, result.jti, key)
+        _discard(self.__by_sub, result.sub, key)
+
+
+def _discard(index: dict[str, set[bytes]], value: str | None, key: bytes) -> None:
+    if value is None:
+        return
+
+    keys = index.get(value)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[value]
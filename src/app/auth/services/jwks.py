@@ -0,0 +1,11 @@
+import hashlib
+import json
+
+from ..dtos import JWKSDocumentDTO
+
+
+# Serialised once; the route only compares ETags and writes the bytes
+def build_jwks_document(keys: list[dict[str, str]]) -> JWKSDocumentDTO:
+    body = json.dumps({"keys": keys}, separators=(",", ":"), sort_keys=True).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return JWKSDocumentDTO(body=body, etag=etag)
@@ -0,0 +1,420 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from abc import ABC, abstractmethod
+from calendar import timegm
+from datetime import datetime, timezone
+from typing import Any
+
+from jose import jwt, ExpiredSignatureError
+from jose.exceptions import JWTError
+
+from app.core.enums import JWTCodecType
+from ..exceptions.token_exceptions import (
+    JWTTokenExpiredError,
+    JWTTokenCredentialsInvalidError,
+)
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json module
+    orjson = None
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from cryptography.hazmat.primitives.asymmetric.utils import (
+        decode_dss_signature,
+        encode_dss_signature,
+    )
+    from cryptography.hazmat.primitives.hashes import SHA256
+    from cryptography.hazmat.primitives.serialization import (
+        Encoding,
+        PublicFormat,
+        load_pem_private_key,
+        load_pem_public_key,
+    )
+
+    _HAS_CRYPTOGRAPHY = True
+except ImportError:  # optional, only needed for EdDSA / ES256
+    _HAS_CRYPTOGRAPHY = False
+
+
+def _json_dumps(value: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _json_loads(value: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(value)
+
+    return json.loads(value)
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Strict mode rejects characters outside the alphabet instead of skipping them
+def _b64url_decode(data: bytes, strict: bool = False) -> bytes:
+    padded = data + b"=" * (-len(data) % 4)
+
+    if strict:
+        if b"+" in data or b"/" in data:
+            raise ValueError("Not base64url")
+        return base64.b64decode(padded, altchars=b"-_", validate=True)
+
+    return base64.urlsafe_b64decode(padded)
+
+
+def _to_bytes(key: str | bytes) -> bytes:
+    return key.encode() if isinstance(key, str) else key
+
+
+# A codec is bound to one key and algorithm. Both implementations raise the
+# same exceptions, so JWTService does not care which one it talks to.
+class JWTCodec(ABC):
+    kid: str | None = None
+
+    # Encoded header of the tokens this codec issues, when it is fixed
+    header_segment: bytes | None = None
+
+    @abstractmethod
+    def encode(self, claims: dict[str, Any]) -> str: ...
+
+    @abstractmethod
+    def decode(self, token: str, verify_exp: bool = True) -> dict[str, Any]: ...
+
+    # Symmetric keys are never published
+    def public_jwk(self) -> dict[str, str] | None:
+        return None
+
+
+class JoseJWTCodec(JWTCodec):
+    def __init__(
+        self, key: str | bytes, algorithm: str, kid: str | None = None
+    ) -> None:
+        self.__key = key
+        self.__algorithm = algorithm
+        self.kid = kid
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return jwt.encode(
+            claims,
+            key=self.__key,
+            algorithm=self.__algorithm,
+            headers={"kid": self.kid} if self.kid else None,
+        )
+
+    def decode(self, token: str, verify_exp: bool = True) -> dict[str, Any]:
+        try:
+            return jwt.decode(
+                token,
+                key=self.__key,
+                algorithms=[self.__algorithm],
+                options={"verify_exp": verify_exp},
+            )
+        except ExpiredSignatureError:
+            raise JWTTokenExpiredError()
+        except JWTError:
+            raise JWTTokenCredentialsInvalidError()
+
+
+# Compact JWS parsing and the claim checks jose does for the claims we issue
+# (alg, exp, nbf, iat), without re-parsing the key or rebuilding the header on
+# every call. Subclasses only provide the signature primitive.
+class _CompactJWTCodec(JWTCodec):
+    def __init__(self, algorithm: str, kid: str | None = None) -> None:
+        header = {"alg": algorithm, "typ": "JWT"}
+        if kid:
+            header["kid"] = kid
+
+        self.algorithm = algorithm
+        self.kid = kid
+        self.header_segment = self.__header = _b64url_encode(_json_dumps(header))
+
+    @abstractmethod
+    def _sign(self, signing_input: bytes) -> bytes: ...
+
+    @abstractmethod
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool: ...
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        signing_input = self.__header + b"." + _b64url_encode(_json_dumps(claims))
+        signature = _b64url_encode(self._sign(signing_input))
+        return (signing_input + b"." + signature).decode()
+
+    def __check_header(self, segment: bytes) -> None:
+        # Tokens we issue carry exactly the cached header
+        if segment == self.__header:
+            return
+
+        try:
+            header = _json_loads(_b64url_decode(segment))
+        except (binascii.Error, ValueError):
+            raise JWTTokenCredentialsInvalidError()
+
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTTokenCredentialsInvalidError()
+
+    @staticmethod
+    def __check_claims(claims: dict[str, Any], verify_exp: bool) -> None:
+        now = timegm(datetime.now(timezone.utc).utctimetuple())
+
+        for name in ("exp", "nbf", "iat"):
+            if name in claims and (
+                isinstance(claims[name], bool)
+                or not isinstance(claims[name], (int, float))
+            ):
+                raise JWTTokenCredentialsInvalidError()
+
+        if "nbf" in claims and int(claims["nbf"]) > now:
+            raise JWTTokenCredentialsInvalidError()
+
+        # No audience is configured, so a token addressed to one is not for us
+        if "aud" in claims:
+            raise JWTTokenCredentialsInvalidError()
+
+        for name in ("sub", "jti"):
+            if name in claims and not isinstance(claims[name], str):
+                raise JWTTokenCredentialsInvalidError()
+
+        if verify_exp and "exp" in claims and int(claims["exp"]) < now:
+            raise JWTTokenExpiredError()
+
+    def decode(self, token: str, verify_exp: bool = True) -> dict[str, Any]:
+        try:
+            raw = token.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            raise JWTTokenCredentialsInvalidError()
+
+        if raw.count(b".") != 2:
+            raise JWTTokenCredentialsInvalidError()
+
+        signing_input, _, signature = raw.rpartition(b".")
+        header, _, payload = signing_input.partition(b".")
+
+        self.__check_header(header)
+
+        try:
+            signature = _b64url_decode(signature, strict=True)
+        except (binascii.Error, ValueError):
+            raise JWTTokenCredentialsInvalidError()
+
+        if not self._verify(signing_input, signature):
+            raise JWTTokenCredentialsInvalidError()
+
+        try:
+            claims = _json_loads(_b64url_decode(payload))
+        except (binascii.Error, ValueError):
+            raise JWTTokenCredentialsInvalidError()
+
+        if not isinstance(claims, dict):
+            raise JWTTokenCredentialsInvalidError()
+
+        self.__check_claims(claims, verify_exp)
+        return claims
+
+
+class HMACJWTCodec(_CompactJWTCodec):
+    _DIGESTS = {
+        "HS256": hashlib.sha256,
+        "HS384": hashlib.sha384,
+        "HS512": hashlib.sha512,
+    }
+
+    def __init__(
+        self, key: str | bytes, algorithm: str, kid: str | None = None
+    ) -> None:
+        if algorithm not in self._DIGESTS:
+            raise ValueError(f"Unsupported HMAC algorithm: {algorithm}")
+
+        super().__init__(algorithm, kid)
+        self.__mac = hmac.new(_to_bytes(key), digestmod=self._DIGESTS[algorithm])
+
+    @classmethod
+    def supports(cls, algorithm: str) -> bool:
+        return algorithm in cls._DIGESTS
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self.__mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self._sign(signing_input), signature)
+
+
+# RFC 7638 thumbprint over the required members, used as the default kid
+def _jwk_thumbprint(jwk: dict[str, str], members: tuple[str, ...]) -> str:
+    canonical = json.dumps(
+        {name: jwk[name] for name in sorted(members)}, separators=(",", ":")
+    )
+    return _b64url_encode(hashlib.sha256(canonical.encode()).digest()).decode()
+
+
+# Asymmetric codecs hold the public key for verification and, on the issuer,
+# the private key for signing. Without a private key they are verify-only.
+class AsymmetricJWTCodec(_CompactJWTCodec):
+    _THUMBPRINT_MEMBERS: tuple[str, ...]
+
+    def __init__(self, private_key, public_key, kid: str | None = None) -> None:
+        if not _HAS_CRYPTOGRAPHY:
+            raise RuntimeError(
+                "Asymmetric JWT signing requires the optional 'cryptography' package."
+            )
+
+        self._private_key = private_key
+        self._public_key = public_key
+        self.__jwk = self._build_jwk()
+        kid = kid or _jwk_thumbprint(self.__jwk, self._THUMBPRINT_MEMBERS)
+        super().__init__(self.__jwk["alg"], kid)
+        self.__jwk["kid"] = kid
+
+    @abstractmethod
+    def _build_jwk(self) -> dict[str, str]: ...
+
+    @property
+    def can_sign(self) -> bool:
+        return self._private_key is not None
+
+    def public_jwk(self) -> dict[str, str]:
+        return dict(self.__jwk)
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        if not self.can_sign:
+            raise RuntimeError(f"Key {self.kid} is verify-only.")
+
+        return super().encode(claims)
+
+
+class Ed25519JWTCodec(AsymmetricJWTCodec):
+    _THUMBPRINT_MEMBERS = ("crv", "kty", "x")
+
+    def _build_jwk(self) -> dict[str, str]:
+        raw = self._public_key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        return {
+            "kty": "OKP",
+            "crv": "Ed25519",
+            "x": _b64url_encode(raw).decode(),
+            "use": "sig",
+            "alg": "EdDSA",
+        }
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return self._private_key.sign(signing_input)
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, signing_input)
+            return True
+        except InvalidSignature:
+            return False
+
+
+class ES256JWTCodec(AsymmetricJWTCodec):
+    _THUMBPRINT_MEMBERS = ("crv", "kty", "x", "y")
+
+    # JWS uses the fixed-size r || s form, not DER (RFC 7518, section 3.4)
+    _COORDINATE_BYTES = 32
+
+    def _build_jwk(self) -> dict[str, str]:
+        numbers = self._public_key.public_numbers()
+        size = self._COORDINATE_BYTES
+        return {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64url_encode(numbers.x.to_bytes(size, "big")).decode(),
+            "y": _b64url_encode(numbers.y.to_bytes(size, "big")).decode(),
+            "use": "sig",
+            "alg": "ES256",
+        }
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        r, s = decode_dss_signature(
+            self._private_key.sign(signing_input, ec.ECDSA(SHA256()))
+        )
+        size = self._COORDINATE_BYTES
+        return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        size = self._COORDINATE_BYTES
+        if len(signature) != 2 * size:
+            return False
+
+        r = int.from_bytes(signature[:size], "big")
+        s = int.from_bytes(signature[size:], "big")
+
+        try:
+            self._public_key.verify(
+                encode_dss_signature(r, s), signing_input, ec.ECDSA(SHA256())
+            )
+            return True
+        except InvalidSignature:
+            return False
+
+
+# Accepts a PEM private key (signing) or public key (verify-only); the
+# algorithm follows from the key type.
+def load_asymmetric_codec(
+    pem: str | bytes, kid: str | None = None
+) -> AsymmetricJWTCodec:
+    if not _HAS_CRYPTOGRAPHY:
+        raise RuntimeError(
+            "Asymmetric JWT signing requires the optional 'cryptography' package."
+        )
+
+    pem = _to_bytes(pem)
+
+    if b"PRIVATE KEY" in pem:
+        private_key = load_pem_private_key(pem, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key = None
+        public_key = load_pem_public_key(pem)
+
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return Ed25519JWTCodec(private_key, public_key, kid)
+
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(
+        public_key.curve, ec.SECP256R1
+    ):
+        return ES256JWTCodec(private_key, public_key, kid)
+
+    raise ValueError("Only Ed25519 and P-256 keys are supported for JWT signing.")
+
+
+# Header of a token before its signature is checked, e.g. to pick the key
+def get_unverified_header(token: str) -> dict[str, Any]:
+    try:
+        header = _json_loads(_b64url_decode(token.partition(".")[0].encode("ascii")))
+    except (binascii.Error, ValueError):
+        raise JWTTokenCredentialsInvalidError()
+
+    if not isinstance(header, dict):
+        raise JWTTokenCredentialsInvalidError()
+
+    return header
+
+
+# Derived from the secret, so every instance sharing a secret agrees on it
+def hmac_key_id(key: str | bytes) -> str:
+    digest = hashlib.sha256(b"auth-dock-kid:" + _to_bytes(key)).digest()
+    return _b64url_encode(digest[:12]).decode()
+
+
+def build_jwt_codec(
+    key: str | bytes,
+    algorithm: str,
+    codec_type: JWTCodecType = JWTCodecType.HMAC,
+    kid: str | None = None,
+) -> JWTCodec:
+    if codec_type == JWTCodecType.HMAC and HMACJWTCodec.supports(algorithm):
+        return HMACJWTCodec(key, algorithm, kid)
+
+    return JoseJWTCodec(key, algorithm, kid)
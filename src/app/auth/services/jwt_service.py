@@ -1,16 +1,26 @@
-from dataclasses import asdict, is_dataclass
+import time
+from dataclasses import is_dataclass
 from datetime import datetime, timezone, timedelta
 
 import ulid
-from jose import jwt, ExpiredSignatureError
-from jose.exceptions import JWTError
 
-from ..dtos import JWTAccessTokenDTO, JWTRefreshTokenDTO, JWTEmailTokenDTO
+from app.core.enums import JWTCodecType
+from .jwks import build_jwks_document
+from .jwt_codec import build_jwt_codec, hmac_key_id
+from .keyring import JWTKeyRing, KeyRingSpec
+from .token_cache import VerifiedTokenCache
+from ..dtos import (
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    JWTEmailTokenDTO,
+    JWKSDocumentDTO,
+    MintedTokenDTO,
+    TokenCacheStatsDTO,
+)
 from ..enums import TokenType
 from ..exceptions.token_exceptions import (
     JWTTokenTypeInvalidError,
     JWTTokenInvalidError,
-    JWTTokenExpiredError,
     JWTTokenCredentialsInvalidError,
 )
 
@@ -25,14 +35,70 @@ class JWTService:
         access_expire: int,
         refresh_expire: int,
         email_verification_expire: int,
+        codec_type: JWTCodecType = JWTCodecType.HMAC,
+        cache: VerifiedTokenCache | None = None,
+        keyrings: dict[TokenType, JWTKeyRing] | None = None,
     ) -> None:
-        self.__secret_key = secret_key
-        self.__secret_key_access = secret_key_access
-        self.__secret_key_refresh = secret_key_refresh
-        self.__algorithm = algorithm
+        secrets = {
+            TokenType.ACCESS_TOKEN: secret_key_access,
+            TokenType.REFRESH_TOKEN: secret_key_refresh,
+            TokenType.EMAIL_TOKEN: secret_key,
+        }
+        keyrings = keyrings or {}
+
+        # One keyring per token type, its codecs built once instead of on
+        # every encode/decode. Without an explicit keyring the configured
+        # secret is the only key, and also verifies tokens without a kid.
+        self.__keyrings: dict[TokenType, JWTKeyRing] = {}
+        for token_type, secret in secrets.items():
+            keyring = keyrings.get(token_type)
+
+            if keyring is None:
+                codec = build_jwt_codec(
+                    secret, algorithm, codec_type, kid=hmac_key_id(secret)
+                )
+                keyring = JWTKeyRing(codec, legacy=codec)
+
+            keyring.on_change(self.__on_keys_changed)
+            self.__keyrings[token_type] = keyring
+
         self.__access_expire_minutes = access_expire
         self.__refresh_expire_days = refresh_expire
         self.__email_verification_expire_minutes = email_verification_expire
+        self.__cache = cache
+        self.__jwks: JWKSDocumentDTO | None = None
+
+    def keyring(self, token_type: TokenType) -> JWTKeyRing:
+        return self.__keyrings[token_type]
+
+    def reload_keyrings(self, specs: dict[TokenType, KeyRingSpec]) -> None:
+        for token_type, spec in specs.items():
+            self.__keyrings[token_type].replace(
+                spec.codecs, spec.active_kid, spec.legacy_kid
+            )
+
+    # Cached tokens may have been verified with a key that is gone now
+    def __on_keys_changed(self) -> None:
+        self.__jwks = None
+
+        if self.__cache is not None:
+            self.__cache.clear()
+
+    # Public keys of all keyrings, serialised once per key change
+    def jwks_document(self) -> JWKSDocumentDTO:
+        if self.__jwks is None:
+            self.__jwks = build_jwks_document(
+                [
+                    jwk
+                    for keyring in self.__keyrings.values()
+                    for jwk in keyring.public_jwks()
+                ]
+            )
+
+        return self.__jwks
+
+    def cache_stats(self) -> TokenCacheStatsDTO | None:
+        return self.__cache.stats() if self.__cache is not None else None
 
     async def encode_token(
         self,
@@ -40,35 +106,57 @@ class JWTService:
         token_type: TokenType,
         **extra_fields,
     ) -> str:
-        expires_at = datetime.now(timezone.utc)
+        minted = await self.mint_token(user_id, token_type, **extra_fields)
+        return minted.token
+
+    # Signs a token and returns it with its claims, so callers that need the
+    # jti/iat/exp do not have to decode what they just encoded
+    async def mint_token(
+        self,
+        user_id: str,
+        token_type: TokenType,
+        **extra_fields,
+    ) -> MintedTokenDTO:
+        # NumericDate has second precision; keep the claims identical to
+        # what decode_token would return for the same token
+        issued_at = datetime.fromtimestamp(int(time.time()), tz=timezone.utc)
 
         if token_type == TokenType.ACCESS_TOKEN:
-            secret_key = self.__secret_key_access
             dto_class = JWTAccessTokenDTO
-            expires_at += timedelta(minutes=self.__access_expire_minutes)
+            expires_at = issued_at + timedelta(minutes=self.__access_expire_minutes)
         elif token_type == TokenType.REFRESH_TOKEN:
-            secret_key = self.__secret_key_refresh
             dto_class = JWTRefreshTokenDTO
-            expires_at += timedelta(days=self.__refresh_expire_days)
+            expires_at = issued_at + timedelta(days=self.__refresh_expire_days)
         elif token_type == TokenType.EMAIL_TOKEN:
-            secret_key = self.__secret_key
             dto_class = JWTEmailTokenDTO
-            expires_at += timedelta(minutes=self.__email_verification_expire_minutes)
+            expires_at = issued_at + timedelta(
+                minutes=self.__email_verification_expire_minutes
+            )
         else:
             raise JWTTokenTypeInvalidError(token_type, [item for item in TokenType])
 
-        if not is_dataclass(dto_class):
-            raise TypeError(f"{dto_class} must be a dataclass")
-
-        payload = dto_class(
-            sub=user_id,
+        claims = dto_class(
+            sub=str(user_id),
             jti=str(ulid.new()),
-            iat=datetime.now(timezone.utc),
             exp=expires_at,
-            type=token_type,
+            iat=issued_at,
+            type=TokenType(token_type),
             **extra_fields,
         )
-        return jwt.encode(asdict(payload), key=secret_key, algorithm=self.__algorithm)
+
+        # Claims go straight to the codec as a plain dict with NumericDate
+        # timestamps, no asdict round trip
+        payload = {
+            "sub": claims.sub,
+            "jti": claims.jti,
+            "exp": int(expires_at.timestamp()),
+            "iat": int(issued_at.timestamp()),
+            "type": claims.type,
+            **extra_fields,
+        }
+        token = self.__keyrings[token_type].encode(payload)
+
+        return MintedTokenDTO(token=token, claims=claims)
 
     async def decode_token(
         self,
@@ -81,59 +169,90 @@ class JWTService:
         if not token:
             raise JWTTokenInvalidError()
 
-        try:
-            if token_type == TokenType.ACCESS_TOKEN:
-                secret_key = self.__secret_key_access
-                dto_class = JWTAccessTokenDTO
-            elif token_type == TokenType.REFRESH_TOKEN:
-                secret_key = self.__secret_key_refresh
-                dto_class = JWTRefreshTokenDTO
-            elif token_type == TokenType.EMAIL_TOKEN:
-                secret_key = self.__secret_key
-                dto_class = JWTEmailTokenDTO
-            else:
-                raise JWTTokenTypeInvalidError(token_type, [item for item in TokenType])
-
-            payload = jwt.decode(
-                token,
-                key=secret_key,
-                algorithms=[self.__algorithm],
-                options={"verify_exp": verify_exp},
-            )
+        if token_type == TokenType.ACCESS_TOKEN:
+            dto_class = JWTAccessTokenDTO
+        elif token_type == TokenType.REFRESH_TOKEN:
+            dto_class = JWTRefreshTokenDTO
+        elif token_type == TokenType.EMAIL_TOKEN:
+            dto_class = JWTEmailTokenDTO
+        else:
+            raise JWTTokenTypeInvalidError(token_type, [item for item in TokenType])
 
-            payload_token_type = payload.get("type")
+        if self.__cache is None:
+            token_obj = self.__decode(token, token_type, dto_class, verify_exp)
+        else:
+            token_obj = self.__decode_cached(token, token_type, dto_class, verify_exp)
 
-            if not payload_token_type or payload_token_type != token_type:
-                raise JWTTokenTypeInvalidError(payload_token_type, [token_type])
+        checks = {
+            "sub": verify_sub,
+            "jti": verify_jti,
+        }
 
-            if token_type == TokenType.REFRESH_TOKEN and not payload.get("ip"):
+        for attr, should_verify in checks.items():
+            if should_verify and not getattr(token_obj, attr, None):
                 raise JWTTokenInvalidError()
 
-            if not is_dataclass(dto_class):
-                raise TypeError(f"{dto_class} must be a dataclass")
+        return token_obj
 
-            token_obj = dto_class(**payload)
-            checks = {
-                "sub": verify_sub,
-                "jti": verify_jti,
-                "exp": verify_exp,
-                "iat": True,
-            }
+    def __decode_cached(
+        self,
+        token: str,
+        token_type: TokenType,
+        dto_class: type,
+        verify_exp: bool,
+    ) -> JWTAccessTokenDTO | JWTRefreshTokenDTO | JWTEmailTokenDTO:
+        key = self.__cache.key(token, token_type)
 
-            for attr, should_verify in checks.items():
-                if should_verify and not getattr(token_obj, attr, None):
-                    raise JWTTokenInvalidError()
+        # Garbage seen recently is rejected without touching the codec
+        if self.__cache.is_rejected(key):
+            raise JWTTokenCredentialsInvalidError()
 
-            expires_at = payload.get("exp")
-            issued_at = payload.get("iat")
+        # Entries are dropped at exp, so a hit is still valid
+        token_obj = self.__cache.get(key)
+        if token_obj:
+            return token_obj
 
-            token_obj.exp = datetime.fromtimestamp(expires_at, tz=timezone.utc)
-            token_obj.iat = datetime.fromtimestamp(issued_at, tz=timezone.utc)
+        try:
+            token_obj = self.__decode(token, token_type, dto_class, verify_exp)
+        except JWTTokenCredentialsInvalidError:
+            self.__cache.reject(key)
+            raise
 
-            return token_obj
+        self.__cache.put(key, token_obj)
+        return token_obj
 
-        except ExpiredSignatureError:
-            raise JWTTokenExpiredError()
+    def __decode(
+        self,
+        token: str,
+        token_type: TokenType,
+        dto_class: type,
+        verify_exp: bool,
+    ) -> JWTAccessTokenDTO | JWTRefreshTokenDTO | JWTEmailTokenDTO:
+        # Raises JWTTokenExpiredError / JWTTokenCredentialsInvalidError
+        payload = self.__keyrings[token_type].decode(token, verify_exp=verify_exp)
 
-        except JWTError:
-            raise JWTTokenCredentialsInvalidError()
+        payload_token_type = payload.get("type")
+
+        if not payload_token_type or payload_token_type != token_type:
+            raise JWTTokenTypeInvalidError(payload_token_type, [token_type])
+
+        if token_type == TokenType.REFRESH_TOKEN and not payload.get("ip"):
+            raise JWTTokenInvalidError()
+
+        if not is_dataclass(dto_class):
+            raise TypeError(f"{dto_class} must be a dataclass")
+
+        token_obj = dto_class(**payload)
+
+        # sub and jti depend on the caller and are checked after the cache
+        for attr in ("exp", "iat"):
+            if not getattr(token_obj, attr, None):
+                raise JWTTokenInvalidError()
+
+        expires_at = payload.get("exp")
+        issued_at = payload.get("iat")
+
+        token_obj.exp = datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        token_obj.iat = datetime.fromtimestamp(issued_at, tz=timezone.utc)
+
+        return token_obj
@@ -0,0 +1,293 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.enums import JWTCodecType
+from .jwt_codec import (
+    JWTCodec,
+    build_jwt_codec,
+    get_unverified_header,
+    load_asymmetric_codec,
+)
+from ..enums import TokenType
+from ..exceptions.token_exceptions import JWTTokenCredentialsInvalidError
+
+logger = logging.getLogger(__name__)
+
+
+# All keys for one token type: a single active key signs, every loaded key
+# verifies. Tokens name their key in the kid header, so verification is one
+# dict lookup. Rotation is load new key -> activate -> retire the old one once
+# the tokens it signed have expired, so no live session is cut off.
+class JWTKeyRing(JWTCodec):
+    def __init__(self, active: JWTCodec, legacy: JWTCodec | None = None) -> None:
+        self.__by_kid: dict[str, JWTCodec] = {}
+        self.__by_header: dict[bytes, JWTCodec] = {}
+        self.__active = active
+        # Verifies tokens issued before kid headers existed
+        self.__legacy = legacy
+        self.__listeners: list[Callable[[], None]] = []
+
+        self.load(active)
+        if legacy is not None:
+            self.load(legacy)
+
+    @classmethod
+    def from_spec(cls, spec: "KeyRingSpec") -> "JWTKeyRing":
+        keyring = cls(spec.codecs[0])
+        keyring.replace(spec.codecs, spec.active_kid, spec.legacy_kid)
+        return keyring
+
+    @property
+    def active(self) -> JWTCodec:
+        return self.__active
+
+    @property
+    def kid(self) -> str | None:
+        return self.__active.kid
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self.__by_kid)
+
+    def get(self, kid: str) -> JWTCodec | None:
+        return self.__by_kid.get(kid)
+
+    def on_change(self, listener: Callable[[], None]) -> None:
+        self.__listeners.append(listener)
+
+    def __notify(self) -> None:
+        for listener in self.__listeners:
+            listener()
+
+    def __index(self) -> None:
+        self.__by_header = {
+            codec.header_segment: codec
+            for codec in self.__by_kid.values()
+            if codec.header_segment is not None
+        }
+
+    def load(self, codec: JWTCodec, activate: bool = False) -> None:
+        if not codec.kid:
+            raise ValueError("Keys in a keyring need a kid.")
+
+        self.__by_kid[codec.kid] = codec
+        self.__index()
+
+        if activate:
+            self.__active = codec
+
+        self.__notify()
+
+    def activate(self, kid: str) -> None:
+        codec = self.__by_kid.get(kid)
+
+        if codec is None:
+            raise ValueError(f"Unknown key: {kid}")
+
+        self.__active = codec
+        self.__notify()
+
+    # Tokens signed with a retired key stop verifying immediately
+    def retire(self, kid: str) -> None:
+        if kid == self.__active.kid:
+            raise ValueError("The active signing key cannot be retired.")
+
+        if self.__by_kid.pop(kid, None) is None:
+            return
+
+        if self.__legacy is not None and self.__legacy.kid == kid:
+            self.__legacy = None
+
+        self.__index()
+        self.__notify()
+
+    # Swaps the whole key set at once, e.g. after the keyring file changed
+    def replace(
+        self,
+        codecs: list[JWTCodec],
+        active_kid: str,
+        legacy_kid: str | None = None,
+    ) -> None:
+        by_kid = {codec.kid: codec for codec in codecs}
+
+        if active_kid not in by_kid:
+            raise ValueError(f"Active key {active_kid} is not in the keyring.")
+
+        if None in by_kid:
+            raise ValueError("Keys in a keyring need a kid.")
+
+        self.__by_kid = by_kid
+        self.__active = by_kid[active_kid]
+        self.__legacy = by_kid.get(legacy_kid) if legacy_kid else None
+        self.__index()
+        self.__notify()
+
+    def public_jwks(self) -> list[dict[str, str]]:
+        return [
+            jwk
+            for codec in self.__by_kid.values()
+            if (jwk := codec.public_jwk()) is not None
+        ]
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return self.__active.encode(claims)
+
+    def __codec_for(self, token: str) -> JWTCodec:
+        segment = token.partition(".")[0].encode("ascii", "replace")
+
+        # Tokens we issue carry exactly one of the precomputed headers
+        codec = self.__by_header.get(segment)
+        if codec is not None:
+            return codec
+
+        kid = get_unverified_header(token).get("kid")
+
+        if kid is None and self.__legacy is not None:
+            return self.__legacy
+
+        codec = self.__by_kid.get(kid) if isinstance(kid, str) else None
+        if codec is None:
+            raise JWTTokenCredentialsInvalidError()
+
+        return codec
+
+    def decode(self, token: str, verify_exp: bool = True) -> dict[str, Any]:
+        if not isinstance(token, str):
+            raise JWTTokenCredentialsInvalidError()
+
+        return self.__codec_for(token).decode(token, verify_exp=verify_exp)
+
+
+@dataclass(frozen=True)
+class KeyRingSpec:
+    codecs: list[JWTCodec]
+    active_kid: str
+    legacy_kid: str | None = None
+
+
+def _read_pem(entry: dict[str, Any]) -> str | bytes:
+    for field in ("private_key", "public_key"):
+        if entry.get(field):
+            return entry[field]
+
+    for field in ("private_key_file", "public_key_file"):
+        if entry.get(field):
+            with open(entry[field], "rb") as key_file:
+                return key_file.read()
+
+    raise ValueError(f"Key {entry.get('kid')} has no secret or key material.")
+
+
+def build_key_codec(
+    entry: dict[str, Any], default_algorithm: str, codec_type: JWTCodecType
+) -> JWTCodec:
+    kid = entry.get("kid")
+
+    if not kid:
+        raise ValueError("Keys in a keyring need a kid.")
+
+    if entry.get("secret"):
+        return build_jwt_codec(
+            entry["secret"],
+            entry.get("algorithm", default_algorithm),
+            codec_type,
+            kid=kid,
+        )
+
+    return load_asymmetric_codec(_read_pem(entry), kid=kid)
+
+
+# {"access_token": {"active": "<kid>", "legacy": "<kid>", "keys": [
+#     {"kid": "...", "secret": "...", "algorithm": "HS256"},
+#     {"kid": "...", "private_key_file": "/keys/ed25519.pem"},
+#     {"kid": "...", "public_key": "-----BEGIN PUBLIC KEY-----..."}]}, ...}
+# Token types missing from the file keep their configured secret.
+def read_keyring_file(
+    path: str, default_algorithm: str, codec_type: JWTCodecType
+) -> dict[TokenType, KeyRingSpec]:
+    with open(path, "rb") as keyring_file:
+        document = json.load(keyring_file)
+
+    specs = {}
+
+    for token_type, section in document.items():
+        specs[TokenType(token_type)] = KeyRingSpec(
+            codecs=[
+                build_key_codec(entry, default_algorithm, codec_type)
+                for entry in section["keys"]
+            ],
+            active_kid=section["active"],
+            legacy_kid=section.get("legacy"),
+        )
+
+    return specs
+
+
+# Polls the keyring file and hands every successfully parsed version to
+# on_reload. A broken file is logged and the current keys stay in place.
+class KeyRingFileWatcher:
+    def __init__(
+        self,
+        path: str,
+        interval_seconds: float,
+        load: Callable[[], dict[TokenType, KeyRingSpec]],
+        on_reload: Callable[[dict[TokenType, KeyRingSpec]], None],
+    ) -> None:
+        self.__path = path
+        self.__interval = interval_seconds
+        self.__load = load
+        self.__on_reload = on_reload
+        self.__mtime: float | None = None
+        self.__task: asyncio.Task | None = None
+
+    def __modified(self) -> bool:
+        try:
+            mtime = os.stat(self.__path).st_mtime
+        except OSError:
+            return False
+
+        if mtime == self.__mtime:
+            return False
+
+        self.__mtime = mtime
+        return True
+
+    def check(self) -> bool:
+        if not self.__modified():
+            return False
+
+        try:
+            specs = self.__load()
+            self.__on_reload(specs)
+        except (OSError, ValueError, KeyError, TypeError, RuntimeError) as exc:
+            logger.error(f"Keyring reload from {self.__path} failed: {exc}")
+            return False
+
+        logger.info(f"Keyring reloaded from {self.__path}")
+        return True
+
+    async def __run(self) -> None:
+        while True:
+            await asyncio.sleep(self.__interval)
+            self.check()
+
+    def start(self) -> None:
+        # The file was just read to build the keyrings
+        self.__modified()
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.__task
+        self.__task = None
@@ -0,0 +1,118 @@
+from typing import Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import KDFHasher, ULID
+from app.users.repository import UserRepository
+from app.users.service import UserService
+from .blacklisted_token_service import BlacklistedTokenService
+from .introspection_cache import IntrospectionCache
+from .jwt_service import JWTService
+from .revocation_cache import RevocationCache
+from ..dtos import AuthPrincipalDTO, TokenIntrospectionDTO
+from ..enums import TokenType
+from ..helpers import get_user_or_auth_error
+from ..helpers.authenticate_user_utils import (
+    check_token_blacklist,
+    check_tokens_valid_after,
+)
+from ..helpers.introspect_utils import (
+    INACTIVE_TOKEN_ERRORS,
+    build_introspection_result,
+)
+from ..repositories import BlacklistedTokenRepository
+
+
+def _to_principal(result: TokenIntrospectionDTO) -> AuthPrincipalDTO:
+    return AuthPrincipalDTO(
+        user_id=result.sub, jti=result.jti, role=result.role, exp=result.exp
+    )
+
+
+_REJECTED = TokenIntrospectionDTO(active=False)
+
+
+# Same checks as AuthService.authenticate_user for access tokens, without the
+# per-request object graph. The signature is verified before any session is
+# opened, and while the token's introspection result is cached (it is dropped
+# as soon as the jti is blacklisted) no session is opened at all.
+class PrincipalService:
+    def __init__(
+        self,
+        jwt_service: JWTService,
+        hasher: KDFHasher,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache: IntrospectionCache | None = None,
+        microcache: IntrospectionCache | None = None,
+        revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        revocation_cache: RevocationCache | None = None,
+    ) -> None:
+        self.__jwt_service = jwt_service
+        self.__hasher = hasher
+        self.__session_factory = session_factory
+        self.__cache = cache
+        # Sub-second, also remembers rejections; only used by authorize()
+        self.__microcache = microcache
+        self.__revocation_listeners = revocation_listeners
+        self.__revocation_cache = revocation_cache
+
+    async def resolve(self, token: str) -> AuthPrincipalDTO:
+        return _to_principal(await self.__resolve(token))
+
+    # Forward auth: None instead of an error for any rejected token. Both
+    # outcomes go into the microcache, so a burst of requests from one client
+    # costs one digest and one dict lookup each.
+    async def authorize(self, token: str) -> AuthPrincipalDTO | None:
+        microcache = self.__microcache
+        key = microcache.key(token) if microcache is not None else None
+
+        if key is not None and (cached := microcache.get(key)) is not None:
+            return _to_principal(cached) if cached.active else None
+
+        generation = microcache.generation if microcache is not None else 0
+        try:
+            result = await self.__resolve(token)
+        except INACTIVE_TOKEN_ERRORS:
+            result = _REJECTED
+
+        if key is not None:
+            microcache.put(key, result, generation)
+
+        return _to_principal(result) if result.active else None
+
+    async def __resolve(self, token: str) -> TokenIntrospectionDTO:
+        token_dto = await self.__jwt_service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+        key = self.__cache.key(token) if self.__cache is not None else None
+        if key is not None:
+            cached = self.__cache.get(key)
+
+            if (
+                cached is not None
+                and cached.active
+                and cached.token_type == TokenType.ACCESS_TOKEN
+            ):
+                return cached
+
+        # A logout during the lookup keeps its result out of the cache
+        generation = self.__cache.generation if key is not None else 0
+        async with self.__session_factory() as db:
+            await check_token_blacklist(
+                BlacklistedTokenService(
+                    BlacklistedTokenRepository(db),
+                    self.__revocation_listeners,
+                    self.__revocation_cache,
+                ),
+                token_dto.jti,
+                TokenType.ACCESS_TOKEN,
+            )
+            user = await get_user_or_auth_error(
+                UserService(UserRepository(db), self.__hasher), token_dto.sub
+            )
+        check_tokens_valid_after(user, token_dto, TokenType.ACCESS_TOKEN)
+
+        result = build_introspection_result(token_dto, user)
+        if key is not None:
+            self.__cache.put(key, result, generation)
+
+        return result
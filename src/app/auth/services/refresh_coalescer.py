@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from ..dtos import AuthTokensOutDTO
+from ..dtos.auth_dtos import RefreshAccessTokenInDTO
+
+
+# Singleflight for POST /auth/refresh-token. Tabs and mobile clients often
+# send several refreshes with the same cookie at once; only the first one
+# runs, the others wait for its result instead of failing on the refresh
+# token it just blacklisted. For grace_seconds afterwards the same pair is
+# handed out again. Requests only share a result when they present the same
+# refresh token from the same IP address and device.
+#
+# Other workers never see that result. With cross_worker they instead accept
+# a refresh token rotated less than grace_seconds ago and issue a fresh
+# access token for it, see AuthService.refresh_access_token.
+class RefreshCoalescer:
+    def __init__(
+        self, grace_seconds: float, max_entries: int, cross_worker: bool = False
+    ) -> None:
+        self.__grace = grace_seconds
+        self.__max_entries = max_entries
+        self.__cross_worker = cross_worker
+
+        self.__in_flight: dict[bytes, asyncio.Future] = {}
+        # key -> (result, expires_at)
+        self.__recent: OrderedDict[bytes, tuple[AuthTokensOutDTO, float]] = (
+            OrderedDict()
+        )
+
+        self.__coalesced = 0
+        self.__replayed = 0
+
+    # How long after rotation a refresh token is still accepted, if at all
+    @property
+    def rotation_grace(self) -> timedelta | None:
+        if not self.__cross_worker or self.__grace <= 0:
+            return None
+
+        return timedelta(seconds=self.__grace)
+
+    # Requests that waited for one already running
+    @property
+    def coalesced(self) -> int:
+        return self.__coalesced
+
+    # Requests answered from the grace window
+    @property
+    def replayed(self) -> int:
+        return self.__replayed
+
+    @staticmethod
+    def key(request_dto: RefreshAccessTokenInDTO) -> bytes:
+        digest = hashlib.blake2b(digest_size=16, person=b"refresh")
+
+        for part in (
+            request_dto.refresh_token,
+            request_dto.ip_address,
+            request_dto.device_info or "",
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+
+        return digest.digest()
+
+    def __recent_result(self, key: bytes) -> AuthTokensOutDTO | None:
+        entry = self.__recent.get(key)
+
+        if entry is None:
+            return None
+
+        result, expires_at = entry
+
+        if expires_at <= time.monotonic():
+            del self.__recent[key]
+            return None
+
+        return result
+
+    def __remember(self, key: bytes, result: AuthTokensOutDTO) -> None:
+        if self.__grace <= 0:
+            return
+
+        self.__recent[key] = (result, time.monotonic() + self.__grace)
+        self.__recent.move_to_end(key)
+
+        while len(self.__recent) > self.__max_entries:
+            self.__recent.popitem(last=False)
+
+    async def run(
+        self, key: bytes, refresh: Callable[[], Awaitable[AuthTokensOutDTO]]
+    ) -> AuthTokensOutDTO:
+        while True:
+            result = self.__recent_result(key)
+            if result is not None:
+                self.__replayed += 1
+                return result
+
+            future = self.__in_flight.get(key)
+            if future is None:
+                break
+
+            self.__coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The request doing the refresh went away; take over
+                if future.cancelled():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self.__in_flight[key] = future
+
+        try:
+            result = await refresh()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; nobody waiting is fine too
+            future.exception()
+            raise
+        finally:
+            del self.__in_flight[key]
+
+        future.set_result(result)
+        self.__remember(key, result)
+        return result
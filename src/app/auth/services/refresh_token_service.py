@@ -1,6 +1,10 @@
-from app.core import Argon2Hasher, ULID
+from datetime import datetime, timezone
+
+from app.core import ULID
+from app.core.token_digest import TokenDigest
+from app.users.exceptions import UserNotFoundError
 from app.utils.dto_utils import db_to_dto
-from ..dtos import RefreshTokenDTO
+from ..dtos import RefreshTokenDTO, SessionDTO
 from ..exceptions.token_exceptions import (
     RefreshTokenSaveFailedError,
     RefreshTokenNotFoundError,
@@ -9,29 +13,90 @@ from ..repositories.refresh_token_repository import RefreshTokenRepository
 
 
 class RefreshTokenService:
-    def __init__(self, repo: RefreshTokenRepository, hasher: Argon2Hasher) -> None:
+    def __init__(self, repo: RefreshTokenRepository, digest: TokenDigest) -> None:
         self.__repo = repo
-        self.__hasher = hasher
+        self.__digest = digest
 
-    async def save_refresh_token(self, create_dto: RefreshTokenDTO) -> RefreshTokenDTO:
-        create_dto.hashed_token = await self.__hasher.hash(create_dto.hashed_token)
-        saved_refresh_token = await self.__repo.save_token(create_dto)
+    async def save_refresh_token(
+        self, create_dto: RefreshTokenDTO, max_sessions: int = 0
+    ) -> RefreshTokenDTO:
+        create_dto.hashed_token = await self.__digest.digest(create_dto.hashed_token)
+        saved_refresh_token = await self.__repo.save_token(create_dto, max_sessions)
 
         if not saved_refresh_token:
             raise RefreshTokenSaveFailedError()
 
         return await db_to_dto(saved_refresh_token, RefreshTokenDTO)
 
-    async def get_by_jti(self, jti: ULID) -> RefreshTokenDTO:
+    async def find_by_jti(self, jti: ULID) -> RefreshTokenDTO | None:
         token = await self.__repo.get_by_jti(jti)
 
         if not token:
-            raise RefreshTokenNotFoundError(jti)
+            return None
 
         return await db_to_dto(token, RefreshTokenDTO)
 
+    async def get_by_jti(self, jti: ULID) -> RefreshTokenDTO:
+        token = await self.find_by_jti(jti)
+
+        if token is None:
+            raise RefreshTokenNotFoundError(jti)
+
+        return token
+
+    async def digest_token(self, token: str) -> str:
+        return await self.__digest.digest(token)
+
     async def verify_token(self, token: str, hashed_token: str) -> bool:
-        return await self.__hasher.verify(token, hashed_token)
+        return await self.__digest.verify(token, hashed_token)
+
+    # The new digest for rows still stored with a previous digest scheme,
+    # None when the row is current. Nothing is written here; the refresh
+    # flow stores it with the rest of its writes (TokenRefreshRepository)
+    async def upgraded_digest(
+        self, token_db: RefreshTokenDTO, token: str
+    ) -> str | None:
+        if not self.__digest.needs_update(token_db.hashed_token):
+            return None
+
+        return await self.__digest.digest(token)
 
     async def delete_token(self, jti: ULID) -> None:
         return await self.__repo.delete_token(jti)
+
+    # Returns how many tokens were revoked
+    async def revoke_family(self, family_id: ULID) -> int:
+        return await self.__repo.delete_family(family_id)
+
+    # One entry per family still holding a usable token, newest first
+    async def list_sessions(self, user_id: ULID) -> list[SessionDTO]:
+        tokens = await self.__repo.list_tokens_by_user_id(
+            user_id, valid_at=datetime.now(timezone.utc)
+        )
+        sessions = {}
+
+        for token in tokens:
+            sessions.setdefault(
+                token.family_id,
+                SessionDTO(
+                    jti=token.jti,
+                    ip_address=token.ip_address,
+                    device_info=token.device_info,
+                    created_at=token.created_at,
+                    expires_at=token.expires_at,
+                ),
+            )
+
+        return list(sessions.values())
+
+    # False when the jti is not one of the user's tokens
+    async def revoke_session(self, user_id: ULID, jti: ULID) -> bool:
+        return await self.__repo.delete_user_family(user_id, jti) > 0
+
+    # Every token issued to the user so far, and all of their sessions
+    async def revoke_all_sessions(self, user_id: ULID) -> None:
+        revoked = await self.__repo.revoke_user_tokens(
+            user_id, datetime.now(timezone.utc)
+        )
+        if not revoked:
+            raise UserNotFoundError()
@@ -0,0 +1,300 @@
+import asyncio
+import contextlib
+import json
+import logging
+import secrets
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Sequence
+
+from app.core import ULID
+from ..dtos import RevocationEventDTO
+from ..enums import RevocationEventKind
+
+logger = logging.getLogger(__name__)
+
+# How long a sender that lost events waits for quiet before sending a SYNC
+_SYNC_DELAY_SECONDS = 1.0
+# Origins whose last sequence number is remembered
+_MAX_ORIGINS = 1024
+
+
+# Raised by a transport that could not deliver an event to every worker
+class RevocationEventDroppedError(Exception):
+    pass
+
+
+class RevocationTransport(ABC):
+    # on_message is called on the event loop with every payload received,
+    # possibly including the transport's own
+    @abstractmethod
+    async def start(self, on_message: Callable[[bytes], None]) -> None: ...
+
+    @abstractmethod
+    async def send(self, message: bytes) -> None: ...
+
+    @abstractmethod
+    async def stop(self) -> None: ...
+
+
+# Buses in one process sharing a hub see each other's events; for tests
+class InMemoryRevocationHub:
+    def __init__(self) -> None:
+        self.__subscribers: list[Callable[[bytes], None]] = []
+
+    def subscribe(self, on_message: Callable[[bytes], None]) -> None:
+        self.__subscribers.append(on_message)
+
+    def unsubscribe(self, on_message: Callable[[bytes], None]) -> None:
+        with contextlib.suppress(ValueError):
+            self.__subscribers.remove(on_message)
+
+    def broadcast(self, message: bytes) -> None:
+        loop = asyncio.get_running_loop()
+
+        for on_message in list(self.__subscribers):
+            loop.call_soon(on_message, message)
+
+
+class InMemoryRevocationTransport(RevocationTransport):
+    def __init__(self, hub: InMemoryRevocationHub) -> None:
+        self.__hub = hub
+        self.__on_message: Callable[[bytes], None] | None = None
+
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        self.__on_message = on_message
+        self.__hub.subscribe(on_message)
+
+    async def send(self, message: bytes) -> None:
+        self.__hub.broadcast(message)
+
+    async def stop(self) -> None:
+        if self.__on_message is not None:
+            self.__hub.unsubscribe(self.__on_message)
+            self.__on_message = None
+
+
+def encode_event(event: RevocationEventDTO) -> bytes:
+    return json.dumps(asdict(event), separators=(",", ":")).encode()
+
+
+def decode_event(message: bytes) -> RevocationEventDTO:
+    data = json.loads(message)
+    data["kind"] = RevocationEventKind(data["kind"])
+    return RevocationEventDTO(**data)
+
+
+# Tells the other workers about revocations so their in-process caches (the
+# introspection and forward-auth caches, the revocation filter) drop a token
+# as soon as it is revoked anywhere, instead of after a TTL or a rebuild.
+#
+# A lost event is not harmless: the revocation filter answers "not revoked"
+# without the database, so a worker that missed one would accept the revoked
+# token until its next rebuild. Events are numbered per origin, and a receiver
+# that sees a gap calls its loss listeners (the filter then marks itself
+# stale). A sender that dropped or failed to send an event sends a numbered
+# SYNC once its queue is quiet, so the gap shows even when no other
+# revocation follows. The TTL caches just wait out their TTL.
+#
+# Publishing never blocks a request; events are queued and sent by one
+# background task. Received events are applied with the same listeners the
+# publishing worker ran locally, so a worker skips its own events.
+class RevocationBus:
+    def __init__(
+        self,
+        transport: RevocationTransport,
+        revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        user_revocation_listeners: Sequence[Callable[[ULID], None]] = (),
+        loss_listeners: Sequence[Callable[[], None]] = (),
+        queue_size: int = 10_000,
+    ) -> None:
+        self.__transport = transport
+        self.__revocation_listeners = revocation_listeners
+        self.__user_revocation_listeners = user_revocation_listeners
+        self.__loss_listeners = loss_listeners
+        self.__queue_size = queue_size
+        self.__origin = secrets.token_hex(8)
+        self.__sequence = 0
+        # Last sequence number received from each origin
+        self.__sequences: dict[str, int] = {}
+        # Events were lost since the last successful send
+        self.__behind = False
+
+        self.__queue: asyncio.Queue[bytes] | None = None
+        self.__task: asyncio.Task | None = None
+
+        self.__published = 0
+        self.__received = 0
+        self.__dropped = 0
+        self.__missed = 0
+        self.__max_delay = 0.0
+
+    @property
+    def published(self) -> int:
+        return self.__published
+
+    @property
+    def received(self) -> int:
+        return self.__received
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    # Events other workers sent that never arrived here
+    @property
+    def missed(self) -> int:
+        return self.__missed
+
+    # Largest sent-to-applied delay seen so far, in seconds
+    @property
+    def max_delay(self) -> float:
+        return self.__max_delay
+
+    def publish_token(self, jti: ULID | str, expires_at: datetime | None) -> None:
+        self.__publish(
+            RevocationEventKind.TOKEN,
+            str(jti),
+            int(expires_at.timestamp()) if expires_at is not None else None,
+        )
+
+    def publish_user(self, user_id: ULID | str) -> None:
+        self.__publish(RevocationEventKind.USER, str(user_id), None)
+
+    def __publish(
+        self, kind: RevocationEventKind, subject: str, expires_at: int | None
+    ) -> None:
+        # Not started (no lifespan): this worker has no one to tell
+        if self.__queue is None:
+            return
+
+        self.__sequence += 1
+
+        try:
+            self.__queue.put_nowait(self.__encode(kind, subject, expires_at))
+        except asyncio.QueueFull:
+            self.__drop(f"Revocation bus queue full, dropped {kind.value} event")
+
+    def __encode(
+        self, kind: RevocationEventKind, subject: str, expires_at: int | None
+    ) -> bytes:
+        return encode_event(
+            RevocationEventDTO(
+                kind=kind,
+                subject=subject,
+                origin=self.__origin,
+                sent_at=time.time(),
+                expires_at=expires_at,
+                sequence=self.__sequence,
+            )
+        )
+
+    def __drop(self, reason: str) -> None:
+        self.__dropped += 1
+        self.__behind = True
+        logger.warning(reason)
+
+    # Whether events from the sender were lost between its previous event
+    # and this one; the first event seen from an origin is taken as is
+    def __missed_events(self, event: RevocationEventDTO) -> int:
+        if event.sequence is None:
+            return 0
+
+        last = self.__sequences.pop(event.origin, None)
+        self.__sequences[event.origin] = max(event.sequence, last or 0)
+        if len(self.__sequences) > _MAX_ORIGINS:
+            del self.__sequences[next(iter(self.__sequences))]
+
+        if last is None:
+            return 0
+
+        return max(event.sequence - last - 1, 0)
+
+    def __on_message(self, message: bytes) -> None:
+        try:
+            event = decode_event(message)
+            subject = (
+                ULID(event.subject) if event.kind != RevocationEventKind.SYNC else None
+            )
+        except (ValueError, TypeError, KeyError) as exc:
+            logger.warning(f"Ignoring malformed revocation event: {exc}")
+            return
+
+        if event.origin == self.__origin:
+            return
+
+        missed = self.__missed_events(event)
+        if missed:
+            self.__missed += missed
+            logger.warning(f"Missed {missed} revocation events from {event.origin}")
+
+            for listener in self.__loss_listeners:
+                listener()
+
+        if event.kind == RevocationEventKind.SYNC:
+            return
+
+        if event.kind == RevocationEventKind.TOKEN:
+            listeners = self.__revocation_listeners
+        else:
+            listeners = self.__user_revocation_listeners
+
+        for listener in listeners:
+            listener(subject)
+
+        self.__received += 1
+        self.__max_delay = max(self.__max_delay, time.time() - event.sent_at)
+
+    async def __next_message(self) -> tuple[bytes, bool]:
+        if not self.__behind:
+            return await self.__queue.get(), False
+
+        try:
+            return (
+                await asyncio.wait_for(self.__queue.get(), _SYNC_DELAY_SECONDS),
+                False,
+            )
+        except asyncio.TimeoutError:
+            # Numbered like any event, so it shows a gap where the lost ones were
+            self.__behind = False
+            self.__sequence += 1
+            return self.__encode(RevocationEventKind.SYNC, "", None), True
+
+    async def __run(self) -> None:
+        while True:
+            message, sync = await self.__next_message()
+
+            try:
+                await self.__transport.send(message)
+            except Exception as exc:
+                if sync:
+                    self.__behind = True
+                    logger.warning(f"Revocation bus sync failed: {exc!r}")
+                else:
+                    self.__drop(f"Revocation bus send failed: {exc!r}")
+                continue
+
+            if not sync:
+                self.__published += 1
+
+    async def start(self) -> None:
+        if self.__task is not None:
+            return
+
+        await self.__transport.start(self.__on_message)
+        self.__queue = asyncio.Queue(maxsize=self.__queue_size)
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.__task
+        self.__task = None
+        self.__queue = None
+
+        await self.__transport.stop()
@@ -0,0 +1,258 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import ULID
+from ..dtos import RevocationCacheStatsDTO
+from ..repositories import BlacklistedTokenRepository
+
+logger = logging.getLogger(__name__)
+
+_LN2 = math.log(2)
+_MIN_REBUILD_GAP_SECONDS = 5.0
+
+
+class BloomFilter:
+    def __init__(
+        self, capacity: int, fp_rate: float, max_bytes: int | None = None
+    ) -> None:
+        self.__capacity = max(capacity, 1)
+
+        bits = math.ceil(-self.__capacity * math.log(fp_rate) / _LN2**2)
+        if max_bytes:
+            bits = min(bits, max_bytes * 8)
+        self.__bits = max(bits, 64)
+
+        # Optimal for the bits we actually got, which matters once capped
+        self.__hash_count = max(1, round(self.__bits / self.__capacity * _LN2))
+        self.__array = bytearray((self.__bits + 7) // 8)
+        self.__count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def bits(self) -> int:
+        return self.__bits
+
+    @property
+    def hash_count(self) -> int:
+        return self.__hash_count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.__array)
+
+    # Double hashing: k positions from one 128-bit digest
+    def __positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.__bits for i in range(self.__hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self.__positions(item):
+            self.__array[position >> 3] |= 1 << (position & 7)
+        self.__count += 1
+
+    def __contains__(self, item: str) -> bool:
+        array = self.__array
+        return all(
+            array[position >> 3] & (1 << (position & 7))
+            for position in self.__positions(item)
+        )
+
+    def estimated_fp_rate(self) -> float:
+        return (
+            1 - math.exp(-self.__hash_count * self.__count / self.__bits)
+        ) ** self.__hash_count
+
+
+# Answers "is this jti possibly revoked?" without the database. The Bloom
+# filter is built from the whole blacklist table and never changes until the
+# next rebuild, so it keeps the false-positive rate it was sized for; jtis
+# revoked since then live in an exact set that is folded into the next
+# filter. A "no" is definitive, a "maybe" still goes to the database. Until
+# the first build, and while the cache is stale because revocations may have
+# been missed, the answer is always "maybe".
+class RevocationCache:
+    def __init__(
+        self,
+        fp_rate: float,
+        min_capacity: int,
+        headroom: float,
+        max_bytes: int | None = None,
+        recent_max_entries: int = 50_000,
+    ) -> None:
+        self.__fp_rate = fp_rate
+        self.__min_capacity = min_capacity
+        self.__headroom = headroom
+        self.__max_bytes = max_bytes
+        self.__recent_max_entries = recent_max_entries
+
+        self.__filter: BloomFilter | None = None
+        self.__recent: set[str] = set()
+        # Recent jtis being folded into a filter that is still loading
+        self.__pending: set[str] = set()
+        self.__stale = False
+        # Marked stale after the running rebuild read the table
+        self.__stale_since_begin = False
+
+        self.__lookups = 0
+        self.__skipped = 0
+        self.__rebuilds = 0
+        self.__last_rebuild_at: datetime | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.__filter is not None
+
+    @property
+    def needs_rebuild(self) -> bool:
+        if self.__filter is None or self.__stale:
+            return True
+
+        return (
+            len(self.__recent) > self.__recent_max_entries
+            or self.__filter.count + len(self.__recent) > self.__filter.capacity
+        )
+
+    def might_be_revoked(self, jti: ULID | str) -> bool:
+        self.__lookups += 1
+
+        if self.__filter is None or self.__stale:
+            return True
+
+        key = str(jti)
+        if key in self.__recent or key in self.__pending or key in self.__filter:
+            return True
+
+        self.__skipped += 1
+        return False
+
+    # Revocation listener, see BlacklistedTokenService.add_token
+    def add(self, jti: ULID | str) -> None:
+        self.__recent.add(str(jti))
+
+    # Revocations were lost on their way here (see RevocationBus); only the
+    # next rebuild from the database can tell which
+    def mark_stale(self) -> None:
+        self.__stale = True
+        self.__stale_since_begin = True
+
+    # Sized from the table cardinality plus headroom for what gets revoked
+    # before the next rebuild
+    def begin_rebuild(self, count: int) -> BloomFilter:
+        self.__pending |= self.__recent
+        self.__recent = set()
+        self.__stale_since_begin = False
+
+        capacity = max(self.__min_capacity, math.ceil(count * self.__headroom))
+        return BloomFilter(capacity, self.__fp_rate, self.__max_bytes)
+
+    def finish_rebuild(self, bloom: BloomFilter) -> None:
+        self.__filter = bloom
+        self.__pending = set()
+        self.__stale = self.__stale_since_begin
+        self.__rebuilds += 1
+        self.__last_rebuild_at = datetime.now(timezone.utc)
+
+    def abort_rebuild(self) -> None:
+        self.__recent |= self.__pending
+        self.__pending = set()
+
+    def stats(self) -> RevocationCacheStatsDTO:
+        bloom = self.__filter
+
+        return RevocationCacheStatsDTO(
+            ready=bloom is not None,
+            stale=self.__stale,
+            capacity=bloom.capacity if bloom else 0,
+            loaded_entries=bloom.count if bloom else 0,
+            recent_entries=len(self.__recent) + len(self.__pending),
+            bits=bloom.bits if bloom else 0,
+            hash_count=bloom.hash_count if bloom else 0,
+            memory_bytes=bloom.memory_bytes if bloom else 0,
+            target_fp_rate=self.__fp_rate,
+            estimated_fp_rate=bloom.estimated_fp_rate() if bloom else 1.0,
+            lookups=self.__lookups,
+            db_lookups_skipped=self.__skipped,
+            rebuilds=self.__rebuilds,
+            last_rebuild_at=self.__last_rebuild_at,
+        )
+
+
+# Loads the cache at startup and rebuilds it every interval, or sooner once
+# the exact set outgrows its limit or the filter its capacity.
+class RevocationCacheSyncer:
+    def __init__(
+        self,
+        cache: RevocationCache,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval_seconds: float,
+    ) -> None:
+        self.__cache = cache
+        self.__session_factory = session_factory
+        self.__interval = interval_seconds
+        self.__last_attempt = 0.0
+        self.__task: asyncio.Task | None = None
+
+    async def rebuild(self) -> None:
+        async with self.__session_factory() as db:
+            repo = BlacklistedTokenRepository(db)
+            bloom = self.__cache.begin_rebuild(await repo.count_tokens())
+
+            try:
+                await repo.for_each_jti(lambda jti: bloom.add(str(jti)))
+            except BaseException:
+                self.__cache.abort_rebuild()
+                raise
+
+        self.__cache.finish_rebuild(bloom)
+
+    async def __rebuild_logged(self) -> None:
+        self.__last_attempt = time.monotonic()
+
+        try:
+            await self.rebuild()
+        except Exception as exc:
+            logger.error(f"Revocation cache rebuild failed: {exc}")
+
+    async def __run(self) -> None:
+        # Early rebuilds (and retries after a failure) are rate limited too
+        min_gap = min(self.__interval, _MIN_REBUILD_GAP_SECONDS)
+
+        while True:
+            await asyncio.sleep(min(self.__interval, 1.0))
+
+            elapsed = time.monotonic() - self.__last_attempt
+            if elapsed >= self.__interval or (
+                elapsed >= min_gap and self.__cache.needs_rebuild
+            ):
+                await self.__rebuild_logged()
+
+    async def start(self) -> None:
+        await self.__rebuild_logged()
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.__task
+        self.__task = None
@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import logging
+import os
+import secrets
+import socket
+from typing import Callable
+from urllib.parse import urlparse
+
+from .revocation_bus import RevocationEventDroppedError, RevocationTransport
+
+logger = logging.getLogger(__name__)
+
+_DATAGRAM_MAX_BYTES = 64 * 1024
+
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+# Workers on one host: every worker binds a datagram socket in a shared
+# directory and sends each event to all the other sockets found there.
+# Sockets left behind by dead workers are removed on the first failed send.
+class UnixSocketRevocationTransport(RevocationTransport):
+    def __init__(self, directory: str) -> None:
+        self.__directory = directory
+        self.__path: str | None = None
+        self.__sock: socket.socket | None = None
+        self.__on_message: Callable[[bytes], None] | None = None
+
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        os.makedirs(self.__directory, exist_ok=True)
+
+        self.__path = os.path.join(
+            self.__directory, f"{os.getpid()}-{secrets.token_hex(4)}.sock"
+        )
+        self.__sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.__sock.setblocking(False)
+        self.__sock.bind(self.__path)
+
+        self.__on_message = on_message
+        asyncio.get_running_loop().add_reader(self.__sock.fileno(), self.__read)
+
+    def __read(self) -> None:
+        while True:
+            try:
+                message = self.__sock.recv(_DATAGRAM_MAX_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+
+            self.__on_message(message)
+
+    def __peers(self) -> list[str]:
+        return [
+            os.path.join(self.__directory, name)
+            for name in os.listdir(self.__directory)
+            if name.endswith(".sock")
+            and os.path.join(self.__directory, name) != self.__path
+        ]
+
+    async def send(self, message: bytes) -> None:
+        not_reading = []
+
+        for peer in self.__peers():
+            try:
+                self.__sock.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(peer)
+            except BlockingIOError:
+                not_reading.append(peer)
+
+        # The other peers got it; the bus follows up with a SYNC for these
+        if not_reading:
+            raise RevocationEventDroppedError(f"{', '.join(not_reading)} not reading")
+
+    async def stop(self) -> None:
+        if self.__sock is None:
+            return
+
+        asyncio.get_running_loop().remove_reader(self.__sock.fileno())
+        self.__sock.close()
+        self.__sock = None
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.__path)
+
+
+# RESP (REdis Serialization Protocol) helpers, just enough for AUTH,
+# SUBSCRIBE and PUBLISH
+
+
+def encode_command(*parts: str | bytes) -> bytes:
+    encoded = [part.encode() if isinstance(part, str) else part for part in parts]
+    return b"*%d\r\n" % len(encoded) + b"".join(
+        b"$%d\r\n%s\r\n" % (len(part), part) for part in encoded
+    )
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readuntil(b"\r\n")
+    prefix, body = line[:1], line[1:-2]
+
+    if prefix == b"+":
+        return body
+    if prefix == b"-":
+        raise ConnectionError(f"Redis error: {body.decode()}")
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+
+# Any server speaking the Redis protocol (Redis, Valkey, KeyDB...) relays the
+# events between hosts with PUBLISH / SUBSCRIBE on one channel. The
+# subscription reconnects on its own after any error; a failed or timed out
+# publish drops its connection and reconnects on the next send. Only the bus's
+# sender task publishes, so one connection is enough.
+class RedisRevocationTransport(RevocationTransport):
+    def __init__(
+        self,
+        url: str,
+        channel: str,
+        reconnect_seconds: float = 1.0,
+        connect_timeout_seconds: float = 5.0,
+    ) -> None:
+        parsed = urlparse(url)
+        self.__host = parsed.hostname or "localhost"
+        self.__port = parsed.port or 6379
+        self.__username = parsed.username
+        self.__password = parsed.password
+        self.__channel = channel
+        self.__reconnect = reconnect_seconds
+        self.__connect_timeout = connect_timeout_seconds
+
+        self.__publisher: _Connection | None = None
+        self.__subscribed = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    async def __connect(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.__host, self.__port),
+            self.__connect_timeout,
+        )
+
+        if self.__password:
+            credentials = [self.__password]
+            if self.__username:
+                credentials.insert(0, self.__username)
+
+            try:
+                await asyncio.wait_for(
+                    self.__command(reader, writer, "AUTH", *credentials),
+                    self.__connect_timeout,
+                )
+            except BaseException:
+                writer.close()
+                raise
+
+        return reader, writer
+
+    @staticmethod
+    async def __command(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *args: str | bytes
+    ):
+        writer.write(encode_command(*args))
+        await writer.drain()
+        return await read_reply(reader)
+
+    async def __subscribe(self, on_message: Callable[[bytes], None]) -> None:
+        reader, writer = await self.__connect()
+
+        try:
+            writer.write(encode_command("SUBSCRIBE", self.__channel))
+            await writer.drain()
+
+            while True:
+                reply = await read_reply(reader)
+
+                if not isinstance(reply, list) or not reply:
+                    continue
+
+                if reply[0] == b"subscribe":
+                    self.__subscribed.set()
+                elif reply[0] == b"message":
+                    on_message(reply[2])
+        finally:
+            self.__subscribed.clear()
+            writer.close()
+
+    async def __run(self, on_message: Callable[[bytes], None]) -> None:
+        while True:
+            try:
+                await self.__subscribe(on_message)
+            except Exception as exc:
+                # Includes malformed replies; anything but cancellation retries
+                logger.error(f"Revocation bus subscription lost: {exc!r}")
+
+            await asyncio.sleep(self.__reconnect)
+
+    # Waits (up to the connect timeout) for the subscription, so events
+    # published right after startup are not missed
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        if self.__task is not None:
+            return
+
+        self.__task = asyncio.create_task(self.__run(on_message))
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.__subscribed.wait(), self.__connect_timeout)
+
+    async def send(self, message: bytes) -> None:
+        if self.__publisher is None:
+            self.__publisher = await self.__connect()
+
+        reader, writer = self.__publisher
+
+        # A stalled server must not hold up the bus's only sender task
+        try:
+            await asyncio.wait_for(
+                self.__command(reader, writer, "PUBLISH", self.__channel, message),
+                self.__connect_timeout,
+            )
+        except BaseException:
+            # The reply stream is out of step now; start over on the next send
+            self.__publisher = None
+            writer.close()
+            raise
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.__task
+            self.__task = None
+
+        if self.__publisher is not None:
+            self.__publisher[1].close()
+            self.__publisher = None
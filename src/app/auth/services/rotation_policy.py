@@ -0,0 +1,87 @@
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable
+
+from app.common import as_utc
+from app.core.enums import RefreshRotationPolicyType
+from ..dtos import RefreshTokenDTO
+
+
+# Decides on every refresh whether the refresh token is replaced. A token
+# that is not rotated stays valid; a rotated one is blacklisted and its
+# replacement joins the same family. Rotating more often narrows the reuse
+# window of a stolen token at the cost of two extra rows per refresh.
+class RefreshRotationPolicy(ABC):
+    # Whether refreshes that do not rotate record the token's last use
+    tracks_last_use: bool = False
+
+    @abstractmethod
+    def should_rotate(self, token_db: RefreshTokenDTO, now: datetime) -> bool: ...
+
+
+class AlwaysRotation(RefreshRotationPolicy):
+    def should_rotate(self, token_db: RefreshTokenDTO, now: datetime) -> bool:
+        return True
+
+
+# Rotates once the token expires within `window`, so active sessions slide
+# forward while long-lived tokens are written at most once per window
+class WindowRotation(RefreshRotationPolicy):
+    def __init__(self, window: timedelta) -> None:
+        self.__window = window
+
+    def should_rotate(self, token_db: RefreshTokenDTO, now: datetime) -> bool:
+        return as_utc(token_db.expires_at) - now < self.__window
+
+
+# Like WindowRotation, plus a `probability` chance on any other refresh, which
+# spreads rotations out instead of bunching them at the window edge
+class ProbabilisticRotation(WindowRotation):
+    def __init__(
+        self,
+        window: timedelta,
+        probability: float,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        super().__init__(window)
+        self.__probability = probability
+        self.__rng = rng
+
+    def should_rotate(self, token_db: RefreshTokenDTO, now: datetime) -> bool:
+        return super().should_rotate(token_db, now) or self.__rng() < self.__probability
+
+
+# Like WindowRotation, plus a rotation when the token comes back after being
+# unused for `idle` or longer (since its last refresh, or since it was issued)
+class IdleRotation(WindowRotation):
+    tracks_last_use = True
+
+    def __init__(self, window: timedelta, idle: timedelta) -> None:
+        super().__init__(window)
+        self.__idle = idle
+
+    def should_rotate(self, token_db: RefreshTokenDTO, now: datetime) -> bool:
+        last_use = token_db.last_used_at or token_db.created_at
+        return (
+            super().should_rotate(token_db, now)
+            or now - as_utc(last_use) >= self.__idle
+        )
+
+
+def build_rotation_policy(
+    policy_type: RefreshRotationPolicyType,
+    window_seconds: float,
+    probability: float,
+    idle_seconds: float,
+) -> RefreshRotationPolicy:
+    window = timedelta(seconds=window_seconds)
+
+    if policy_type == RefreshRotationPolicyType.ALWAYS:
+        return AlwaysRotation()
+    if policy_type == RefreshRotationPolicyType.PROBABILISTIC:
+        return ProbabilisticRotation(window, probability)
+    if policy_type == RefreshRotationPolicyType.IDLE:
+        return IdleRotation(window, timedelta(seconds=idle_seconds))
+
+    return WindowRotation(window)
@@ -0,0 +1,146 @@
+import copy
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+
+from ..dtos import (
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    JWTEmailTokenDTO,
+    TokenCacheStatsDTO,
+)
+from ..enums import TokenType
+
+TokenDTO = JWTAccessTokenDTO | JWTRefreshTokenDTO | JWTEmailTokenDTO
+
+# Rough per-entry cost of the key, the OrderedDict node and the DTO object
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def _estimate_size(token_dto: TokenDTO) -> int:
+    return _ENTRY_OVERHEAD_BYTES + sum(
+        sys.getsizeof(value) for value in vars(token_dto).values()
+    )
+
+
+# Decoded tokens keyed by a digest of the raw token, so the cache never holds
+# a usable credential. Entries never outlive the token's exp. Everything runs
+# on the event loop without awaiting, so no locking is needed.
+class VerifiedTokenCache:
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        negative_max_entries: int,
+        negative_ttl_seconds: float,
+    ) -> None:
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__negative_max_entries = negative_max_entries
+        self.__negative_ttl = negative_ttl_seconds
+
+        # key -> (dto, expires_at, size)
+        self.__entries: OrderedDict[bytes, tuple[TokenDTO, float, int]] = OrderedDict()
+        self.__negative: OrderedDict[bytes, float] = OrderedDict()
+        self.__bytes = 0
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__negative_hits = 0
+        self.__evictions = 0
+
+    @staticmethod
+    def key(token: str, token_type: TokenType) -> bytes:
+        return hashlib.blake2b(
+            token.encode(), digest_size=16, person=token_type.encode()[:16]
+        ).digest()
+
+    def get(self, key: bytes) -> TokenDTO | None:
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            self.__misses += 1
+            return None
+
+        token_dto, expires_at, _ = entry
+
+        if expires_at <= time.time():
+            self.__remove(key)
+            self.__misses += 1
+            return None
+
+        self.__entries.move_to_end(key)
+        self.__hits += 1
+
+        # Callers may mutate what they get back
+        return copy.copy(token_dto)
+
+    def put(self, key: bytes, token_dto: TokenDTO) -> None:
+        expires_at = token_dto.exp.timestamp()
+
+        if expires_at <= time.time():
+            return
+
+        size = _estimate_size(token_dto)
+
+        if size > self.__max_bytes:
+            return
+
+        if key in self.__entries:
+            self.__remove(key)
+
+        self.__entries[key] = (copy.copy(token_dto), expires_at, size)
+        self.__bytes += size
+
+        while (
+            len(self.__entries) > self.__max_entries or self.__bytes > self.__max_bytes
+        ):
+            self.__remove(next(iter(self.__entries)))
+            self.__evictions += 1
+
+    def is_rejected(self, key: bytes) -> bool:
+        expires_at = self.__negative.get(key)
+
+        if expires_at is None:
+            return False
+
+        if expires_at <= time.monotonic():
+            del self.__negative[key]
+            return False
+
+        self.__negative_hits += 1
+        return True
+
+    def reject(self, key: bytes) -> None:
+        self.__negative[key] = time.monotonic() + self.__negative_ttl
+        self.__negative.move_to_end(key)
+
+        while len(self.__negative) > self.__negative_max_entries:
+            self.__negative.popitem(last=False)
+
+    def invalidate(self, key: bytes) -> None:
+        if key in self.__entries:
+            self.__remove(key)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__negative.clear()
+        self.__bytes = 0
+
+    def __remove(self, key: bytes) -> None:
+        _, _, size = self.__entries.pop(key)
+        self.__bytes -= size
+
+    def stats(self) -> TokenCacheStatsDTO:
+        return TokenCacheStatsDTO(
+            entries=len(self.__entries),
+            bytes=self.__bytes,
+            max_entries=self.__max_entries,
+            max_bytes=self.__max_bytes,
+            hits=self.__hits,
+            misses=self.__misses,
+            negative_hits=self.__negative_hits,
+            negative_entries=len(self.__negative),
+            evictions=self.__evictions,
+        )
@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..repositories import BlacklistedTokenRepository, RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+# Deletes blacklist and refresh-token rows whose token has expired. Work is
+# done in short transactions of at most batch_size rows with a pause between
+# them, so a large backlog never holds locks or saturates the database.
+class ExpiredTokenPurger:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval_seconds: float,
+        batch_size: int,
+        batch_pause_seconds: float,
+        grace: timedelta,
+        legacy_max_age: timedelta,
+    ) -> None:
+        self.__session_factory = session_factory
+        self.__interval = interval_seconds
+        self.__batch_size = batch_size
+        self.__batch_pause = batch_pause_seconds
+        # Slack for clock skew between the app servers that check exp
+        self.__grace = grace
+        # Blacklist rows without expires_at outlive any token after this long
+        self.__legacy_max_age = legacy_max_age
+        self.__task: asyncio.Task | None = None
+
+    async def __purge_blacklist_batch(self, before: datetime) -> int:
+        async with self.__session_factory() as db:
+            return await BlacklistedTokenRepository(db).delete_expired(
+                before, before - self.__legacy_max_age, self.__batch_size
+            )
+
+    async def __purge_refresh_batch(self, before: datetime) -> int:
+        async with self.__session_factory() as db:
+            return await RefreshTokenRepository(db).delete_expired(
+                before, self.__batch_size
+            )
+
+    async def __drain(self, purge_batch, before: datetime) -> int:
+        total = 0
+
+        while True:
+            deleted = await purge_batch(before)
+            total += deleted
+
+            if deleted < self.__batch_size:
+                return total
+
+            await asyncio.sleep(self.__batch_pause)
+
+    # Returns the number of (blacklist, refresh token) rows deleted
+    async def purge(self) -> tuple[int, int]:
+        before = datetime.now(timezone.utc) - self.__grace
+
+        blacklisted = await self.__drain(self.__purge_blacklist_batch, before)
+        refresh = await self.__drain(self.__purge_refresh_batch, before)
+
+        if blacklisted or refresh:
+            logger.info(
+                f"Purged {blacklisted} blacklisted and {refresh} refresh tokens"
+            )
+
+        return blacklisted, refresh
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception as exc:
+                logger.error(f"Expired token purge failed: {exc}")
+
+            await asyncio.sleep(self.__interval)
+
+    def start(self) -> None:
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.__task
+        self.__task = None
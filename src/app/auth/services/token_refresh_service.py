@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from app.core import ULID
+from app.users.dtos import UserOutDTO
+from app.utils.dto_utils import db_to_dto
+from ..dtos import (
+    BlacklistedTokenDTO,
+    JWTAccessTokenDTO,
+    JWTRefreshTokenDTO,
+    RefreshContextDTO,
+    RefreshTokenDTO,
+)
+from ..repositories import TokenRefreshRepository
+
+
+class TokenRefreshService:
+    def __init__(self, repo: TokenRefreshRepository) -> None:
+        self.__repo = repo
+
+    # None when the token's user does not exist
+    async def get_context(
+        self, access_dto: JWTAccessTokenDTO, refresh_dto: JWTRefreshTokenDTO
+    ) -> RefreshContextDTO | None:
+        row = await self.__repo.get_refresh_context(
+            ULID(refresh_dto.sub), ULID(refresh_dto.jti), ULID(access_dto.jti)
+        )
+
+        if row is None:
+            return None
+
+        user, refresh_token, access_revoked, refresh_revoked, refresh_revoked_at = row
+
+        return RefreshContextDTO(
+            user=await db_to_dto(user, UserOutDTO),
+            refresh_token=(
+                await db_to_dto(refresh_token, RefreshTokenDTO)
+                if refresh_token is not None
+                else None
+            ),
+            access_revoked=access_revoked,
+            refresh_revoked=refresh_revoked,
+            refresh_revoked_at=refresh_revoked_at,
+        )
+
+    async def save_rotation(
+        self,
+        blacklisted: list[BlacklistedTokenDTO],
+        new_refresh_token: RefreshTokenDTO | None = None,
+        upgraded_digest: tuple[ULID, str] | None = None,
+        last_used: tuple[ULID, datetime] | None = None,
+    ) -> None:
+        await self.__repo.save_rotation(
+            blacklisted, new_refresh_token, upgraded_digest, last_used
+        )
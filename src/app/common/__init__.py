@@ -1 +1 @@
-from .utils import gather_with_exception_check
+from .utils import as_utc, gather_with_exception_check, run_in_background
@@ -1,5 +1,9 @@
 import asyncio
-from typing import Awaitable, Any
+from datetime import datetime, timezone
+from typing import Awaitable, Any, Coroutine
+
+# Strong references so pending fire-and-forget tasks aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
 
 
 async def gather_with_exception_check(tasks: list[Awaitable[Any]]) -> list[Any]:
@@ -10,3 +14,17 @@ async def gather_with_exception_check(tasks: list[Awaitable[Any]]) -> list[Any]:
             raise result
 
     return results
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+# Rows read back from SQLite are naive UTC; aware values are converted
+def as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
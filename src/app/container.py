@@ -0,0 +1,321 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Annotated, Callable
+
+from argon2 import Type
+from fastapi import Depends, FastAPI, Request
+
+from app.auth.enums import TokenType
+from app.auth.services.jwt_codec import (
+    JWTCodec,
+    build_jwt_codec,
+    hmac_key_id,
+    load_asymmetric_codec,
+)
+from app.auth.services.introspection_cache import IntrospectionCache
+from app.auth.services.jwt_service import JWTService
+from app.auth.services.principal_service import PrincipalService
+from app.auth.services.refresh_coalescer import RefreshCoalescer
+from app.auth.services.rotation_policy import (
+    RefreshRotationPolicy,
+    WindowRotation,
+    build_rotation_policy,
+)
+from app.auth.services.revocation_bus import (
+    InMemoryRevocationHub,
+    InMemoryRevocationTransport,
+    RevocationBus,
+    RevocationTransport,
+)
+from app.auth.services.revocation_cache import (
+    RevocationCache,
+    RevocationCacheSyncer,
+)
+from app.auth.services.revocation_transports import (
+    RedisRevocationTransport,
+    UnixSocketRevocationTransport,
+)
+from app.auth.services.keyring import (
+    JWTKeyRing,
+    KeyRingFileWatcher,
+    KeyRingSpec,
+    read_keyring_file,
+)
+from app.auth.services.token_cache import VerifiedTokenCache
+from app.auth.services.token_purger import ExpiredTokenPurger
+from app.core import Argon2Hasher, KDFHasher, ULID, config
+from app.core.enums import RevocationBusTransportType, TokenDigestType
+from app.core.hashing import build_password_kdf_registry
+from app.core.stage_timings import StageTimings
+from app.core.token_digest import TokenDigest, Argon2TokenDigest, HMACTokenDigest
+from app.db.database import AsyncSessionLocal
+
+
+# Stateless, application-scoped services. Built once in the lifespan; only
+# session-bound repositories (and the services wrapping them) are created
+# per request.
+@dataclass(frozen=True)
+class ServiceContainer:
+    jwt_service: JWTService
+    password_hasher: KDFHasher
+    refresh_token_digest: TokenDigest
+    # Shared by /auth/introspect and the auth middleware
+    introspection_cache: IntrospectionCache
+    principal_service: PrincipalService
+    # Called with the jti of every newly blacklisted token
+    revocation_listeners: tuple[Callable[[ULID], None], ...] = ()
+    # Called with the id of every user whose tokens were all revoked
+    user_revocation_listeners: tuple[Callable[[ULID], None], ...] = ()
+    revocation_cache: RevocationCache | None = None
+    revocation_cache_syncer: RevocationCacheSyncer | None = None
+    revocation_bus: RevocationBus | None = None
+    # Per-stage durations of POST /auth/refresh-token
+    refresh_timings: StageTimings = field(default_factory=StageTimings)
+    refresh_coalescer: RefreshCoalescer | None = None
+    # When refreshes replace the refresh token
+    rotation_policy: RefreshRotationPolicy = field(
+        default_factory=lambda: WindowRotation(timedelta(days=2))
+    )
+    token_purger: ExpiredTokenPurger | None = None
+    keyring_watcher: KeyRingFileWatcher | None = None
+
+
+def _build_refresh_token_digest() -> TokenDigest:
+    legacy = Argon2TokenDigest(
+        Argon2Hasher(
+            time_cost=1,
+            memory_cost=32 * 1024,
+            parallelism=1,
+            hash_len=32,
+            salt_len=16,
+            type_=Type.ID,
+        )
+    )
+
+    if config.REFRESH_TOKEN_DIGEST == TokenDigestType.ARGON2:
+        return legacy
+
+    # Argon2 stays around only to verify rows written before the switch
+    return HMACTokenDigest(
+        config.REFRESH_TOKEN_PEPPER or config.SECRET_REFRESH_TOKEN,
+        legacy=legacy,
+    )
+
+
+def _build_token_cache() -> VerifiedTokenCache | None:
+    if not config.JWT_CACHE_ENABLED:
+        return None
+
+    return VerifiedTokenCache(
+        max_entries=config.JWT_CACHE_MAX_ENTRIES,
+        max_bytes=config.JWT_CACHE_MAX_BYTES,
+        negative_max_entries=config.JWT_CACHE_NEGATIVE_MAX_ENTRIES,
+        negative_ttl_seconds=config.JWT_CACHE_NEGATIVE_TTL_SECONDS,
+    )
+
+
+def _build_access_token_codec() -> JWTCodec | None:
+    pem = config.ACCESS_TOKEN_PRIVATE_KEY
+
+    if not pem and config.ACCESS_TOKEN_PRIVATE_KEY_FILE:
+        with open(config.ACCESS_TOKEN_PRIVATE_KEY_FILE, "rb") as key_file:
+            pem = key_file.read()
+
+    # Without a key pair access tokens stay on SECRET_ACCESS_TOKEN
+    return load_asymmetric_codec(pem) if pem else None
+
+
+def _build_revocation_cache() -> RevocationCache | None:
+    # Without the bus, revocations made by other workers would read as "not
+    # revoked" until the next rebuild
+    if (
+        not config.REVOCATION_FILTER_ENABLED
+        or config.REVOCATION_BUS_TRANSPORT == RevocationBusTransportType.NONE
+    ):
+        return None
+
+    return RevocationCache(
+        fp_rate=config.REVOCATION_FILTER_FP_RATE,
+        min_capacity=config.REVOCATION_FILTER_MIN_CAPACITY,
+        headroom=config.REVOCATION_FILTER_HEADROOM,
+        max_bytes=config.REVOCATION_FILTER_MAX_BYTES,
+        recent_max_entries=config.REVOCATION_FILTER_RECENT_MAX_ENTRIES,
+    )
+
+
+def _build_token_purger() -> ExpiredTokenPurger | None:
+    if not config.TOKEN_PURGE_ENABLED:
+        return None
+
+    return ExpiredTokenPurger(
+        AsyncSessionLocal,
+        interval_seconds=config.TOKEN_PURGE_INTERVAL_SECONDS,
+        batch_size=config.TOKEN_PURGE_BATCH_SIZE,
+        batch_pause_seconds=config.TOKEN_PURGE_BATCH_PAUSE_SECONDS,
+        grace=timedelta(seconds=config.TOKEN_PURGE_GRACE_SECONDS),
+        # Refresh tokens are the longest-lived tokens we blacklist
+        legacy_max_age=timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def _build_revocation_transport() -> RevocationTransport | None:
+    transport = config.REVOCATION_BUS_TRANSPORT
+
+    if transport == RevocationBusTransportType.MEMORY:
+        return InMemoryRevocationTransport(InMemoryRevocationHub())
+    if transport == RevocationBusTransportType.UNIX:
+        return UnixSocketRevocationTransport(config.REVOCATION_BUS_SOCKET_DIR)
+    if transport == RevocationBusTransportType.REDIS:
+        return RedisRevocationTransport(
+            config.REVOCATION_BUS_REDIS_URL, config.REVOCATION_BUS_CHANNEL
+        )
+
+    return None
+
+
+def _read_keyring_file() -> dict[TokenType, KeyRingSpec]:
+    return read_keyring_file(
+        config.JWT_KEYRING_FILE, config.ALGORITHM, config.JWT_CODEC
+    )
+
+
+# Token types without an entry here get a keyring holding just their secret
+def _build_keyrings() -> dict[TokenType, JWTKeyRing]:
+    keyrings = {}
+
+    access_codec = _build_access_token_codec()
+    if access_codec is not None:
+        secret_codec = None
+        # Only during the switch-over, see ACCESS_TOKEN_ACCEPT_SECRET_SIGNED
+        if config.ACCESS_TOKEN_ACCEPT_SECRET_SIGNED:
+            secret = config.SECRET_ACCESS_TOKEN
+            secret_codec = build_jwt_codec(
+                secret, config.ALGORITHM, config.JWT_CODEC, kid=hmac_key_id(secret)
+            )
+        keyrings[TokenType.ACCESS_TOKEN] = JWTKeyRing(access_codec, secret_codec)
+
+    if config.JWT_KEYRING_FILE:
+        for token_type, spec in _read_keyring_file().items():
+            keyrings[token_type] = JWTKeyRing.from_spec(spec)
+
+    return keyrings
+
+
+def build_container() -> ServiceContainer:
+    jwt_service = JWTService(
+        secret_key=config.SECRET_KEY,
+        secret_key_access=config.SECRET_ACCESS_TOKEN,
+        secret_key_refresh=config.SECRET_REFRESH_TOKEN,
+        algorithm=config.ALGORITHM,
+        access_expire=config.ACCESS_TOKEN_EXPIRE_MINUTES,
+        refresh_expire=config.REFRESH_TOKEN_EXPIRE_DAYS,
+        email_verification_expire=config.EMAIL_VERIFICATION_TOKEN_EXPIRE_MINUTES,
+        codec_type=config.JWT_CODEC,
+        cache=_build_token_cache(),
+        keyrings=_build_keyrings(),
+    )
+
+    keyring_watcher = None
+    if config.JWT_KEYRING_FILE:
+        keyring_watcher = KeyRingFileWatcher(
+            config.JWT_KEYRING_FILE,
+            config.JWT_KEYRING_RELOAD_SECONDS,
+            load=_read_keyring_file,
+            on_reload=jwt_service.reload_keyrings,
+        )
+
+    introspection_cache = IntrospectionCache(
+        ttl_seconds=config.AUTH_INTROSPECTION_CACHE_TTL_SECONDS,
+        max_entries=config.AUTH_INTROSPECTION_CACHE_MAX_ENTRIES,
+    )
+
+    forward_auth_cache = IntrospectionCache(
+        ttl_seconds=config.AUTH_FORWARD_CACHE_TTL_SECONDS,
+        max_entries=config.AUTH_FORWARD_CACHE_MAX_ENTRIES,
+    )
+    password_hasher = KDFHasher(build_password_kdf_registry())
+    revocation_cache = _build_revocation_cache()
+    revocation_listeners = (
+        introspection_cache.invalidate,
+        forward_auth_cache.invalidate,
+    )
+
+    user_revocation_listeners = (
+        introspection_cache.invalidate_user,
+        forward_auth_cache.invalidate_user,
+    )
+
+    revocation_cache_syncer = None
+    loss_listeners = ()
+    if revocation_cache is not None:
+        revocation_listeners += (revocation_cache.add,)
+        loss_listeners = (revocation_cache.mark_stale,)
+        revocation_cache_syncer = RevocationCacheSyncer(
+            revocation_cache,
+            AsyncSessionLocal,
+            config.REVOCATION_FILTER_REBUILD_SECONDS,
+        )
+
+    revocation_bus = None
+    revocation_transport = _build_revocation_transport()
+    if revocation_transport is not None:
+        revocation_bus = RevocationBus(
+            revocation_transport,
+            revocation_listeners,
+            user_revocation_listeners,
+            loss_listeners,
+            queue_size=config.REVOCATION_BUS_QUEUE_SIZE,
+        )
+
+    return ServiceContainer(
+        jwt_service=jwt_service,
+        password_hasher=password_hasher,
+        refresh_token_digest=_build_refresh_token_digest(),
+        introspection_cache=introspection_cache,
+        principal_service=PrincipalService(
+            jwt_service,
+            password_hasher,
+            AsyncSessionLocal,
+            cache=introspection_cache,
+            microcache=forward_auth_cache,
+            revocation_listeners=revocation_listeners,
+            revocation_cache=revocation_cache,
+        ),
+        revocation_listeners=revocation_listeners,
+        user_revocation_listeners=user_revocation_listeners,
+        revocation_cache=revocation_cache,
+        revocation_cache_syncer=revocation_cache_syncer,
+        revocation_bus=revocation_bus,
+        refresh_coalescer=RefreshCoalescer(
+            grace_seconds=config.AUTH_REFRESH_GRACE_SECONDS,
+            max_entries=config.AUTH_REFRESH_GRACE_MAX_ENTRIES,
+            cross_worker=config.AUTH_REFRESH_GRACE_CROSS_WORKER,
+        ),
+        rotation_policy=build_rotation_policy(
+            config.AUTH_REFRESH_ROTATION_POLICY,
+            window_seconds=config.AUTH_REFRESH_ROTATION_WINDOW_SECONDS,
+            probability=config.AUTH_REFRESH_ROTATION_PROBABILITY,
+            idle_seconds=config.AUTH_REFRESH_ROTATION_IDLE_SECONDS,
+        ),
+        token_purger=_build_token_purger(),
+        keyring_watcher=keyring_watcher,
+    )
+
+
+def container_for(app: FastAPI) -> ServiceContainer:
+    container = getattr(app.state, "container", None)
+
+    # The lifespan normally builds it; ASGI transports that skip the lifespan
+    # (e.g. tests) get one built on first use.
+    if container is None:
+        container = build_container()
+        app.state.container = container
+
+    return container
+
+
+async def get_container(request: Request) -> ServiceContainer:
+    return container_for(request.app)
+
+
+ContainerDep = Annotated[ServiceContainer, Depends(get_container)]
@@ -1,3 +1,4 @@
 from .configs import config
-from .hashing import Argon2Hasher, Argon2Dep
+from .enums import HashPriority
+from .hashing import Argon2Hasher, KDFHasher
 from .ulid_types import ULID, ULIDType, ULIDTypeDB
@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from .configs import config
+from .enums import HashPriority
+from .exceptions import HashingOverloadedError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HashingAdmissionStatsDTO:
+    memory_budget_bytes: int
+    in_flight_bytes: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    admitted: int
+    rejected: int
+    wait_time_total_ms: float
+    wait_time_max_ms: float
+    wait_time_avg_ms: float
+
+
+class HashingAdmissionController:
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        max_queue: int,
+        max_wait_seconds: float,
+        retry_after_seconds: int,
+    ) -> None:
+        self.__memory_budget = memory_budget_bytes
+        self.__max_queue = max_queue
+        self.__max_wait = max_wait_seconds
+        self.__retry_after = retry_after_seconds
+
+        self.__in_flight_bytes = 0
+        self.__in_flight = 0
+        # (priority, seq, cost, future) - seq keeps FIFO order within a priority
+        self.__waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self.__sequence = itertools.count()
+
+        self.__max_queue_depth = 0
+        self.__admitted = 0
+        self.__rejected = 0
+        self.__wait_total = 0.0
+        self.__wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self.__waiters if not future.done())
+
+    def stats(self) -> HashingAdmissionStatsDTO:
+        return HashingAdmissionStatsDTO(
+            memory_budget_bytes=self.__memory_budget,
+            in_flight_bytes=self.__in_flight_bytes,
+            in_flight=self.__in_flight,
+            queue_depth=self.queue_depth,
+            max_queue_depth=self.__max_queue_depth,
+            admitted=self.__admitted,
+            rejected=self.__rejected,
+            wait_time_total_ms=self.__wait_total * 1000,
+            wait_time_max_ms=self.__wait_max * 1000,
+            wait_time_avg_ms=(
+                self.__wait_total * 1000 / self.__admitted if self.__admitted else 0.0
+            ),
+        )
+
+    @asynccontextmanager
+    async def admit(
+        self, cost_bytes: int, priority: HashPriority
+    ) -> AsyncIterator[None]:
+        await self.__acquire(cost_bytes, priority)
+        try:
+            yield
+        finally:
+            self.__release(cost_bytes)
+
+    def __fits(self, cost_bytes: int) -> bool:
+        # A single job larger than the whole budget may still run on its own
+        return (
+            self.__in_flight == 0
+            or self.__in_flight_bytes + cost_bytes <= self.__memory_budget
+        )
+
+    def __grant(self, cost_bytes: int) -> None:
+        self.__in_flight_bytes += cost_bytes
+        self.__in_flight += 1
+        self.__admitted += 1
+
+    def __record_wait(self, waited: float) -> None:
+        self.__wait_total += waited
+        self.__wait_max = max(self.__wait_max, waited)
+
+    def __reject(self, reason: str) -> HashingOverloadedError:
+        self.__rejected += 1
+        logger.warning(f"Hashing admission rejected: {reason}")
+        return HashingOverloadedError(self.__retry_after)
+
+    async def __acquire(self, cost_bytes: int, priority: HashPriority) -> None:
+        if self.queue_depth == 0 and self.__fits(cost_bytes):
+            self.__grant(cost_bytes)
+            return
+
+        queue_depth = self.queue_depth
+        if queue_depth >= self.__max_queue:
+            raise self.__reject(f"queue full ({queue_depth})")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self.__waiters,
+            (int(priority), next(self.__sequence), cost_bytes, future),
+        )
+        self.__max_queue_depth = max(self.__max_queue_depth, queue_depth + 1)
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.__max_wait)
+        except asyncio.TimeoutError:
+            # The slot may have been granted just as the timeout fired
+            if not future.done() or future.cancelled():
+                # Drop our entry so smaller jobs queued behind it can proceed
+                self.__wake_waiters()
+                raise self.__reject(f"waited longer than {self.__max_wait}s")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.__release(cost_bytes)
+            else:
+                self.__wake_waiters()
+            raise
+
+        self.__record_wait(time.perf_counter() - started)
+
+    def __release(self, cost_bytes: int) -> None:
+        self.__in_flight_bytes -= cost_bytes
+        self.__in_flight -= 1
+        self.__wake_waiters()
+
+    def __wake_waiters(self) -> None:
+        while self.__waiters:
+            *_, cost_bytes, future = self.__waiters[0]
+
+            if future.done():
+                heapq.heappop(self.__waiters)
+                continue
+
+            if not self.__fits(cost_bytes):
+                return
+
+            heapq.heappop(self.__waiters)
+            self.__grant(cost_bytes)
+            future.set_result(None)
+
+
+hashing_admission = HashingAdmissionController(
+    memory_budget_bytes=config.HASHING_MEMORY_BUDGET_MB * 1024 * 1024,
+    max_queue=config.HASHING_MAX_QUEUE,
+    max_wait_seconds=config.HASHING_MAX_WAIT_SECONDS,
+    retry_after_seconds=config.HASHING_RETRY_AFTER_SECONDS,
+)
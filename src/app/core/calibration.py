@@ -0,0 +1,80 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from argon2 import Type, PasswordHasher
+
+logger = logging.getLogger(__name__)
+
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True)
+class Argon2Parameters:
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+
+
+def _measure_ms(parameters: Argon2Parameters, rounds: int = 2) -> float:
+    hasher = PasswordHasher(
+        time_cost=parameters.time_cost,
+        memory_cost=parameters.memory_cost,
+        parallelism=parameters.parallelism,
+        type=Type.ID,
+    )
+    best = float("inf")
+
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash(_CALIBRATION_PASSWORD)
+        best = min(best, (time.perf_counter() - started) * 1000)
+
+    return best
+
+
+# Runs in the hashing executor at startup. Starts at the security floor, grows
+# memory first (the costlier dimension for attackers), then time, and keeps
+# the last step that stayed within the latency target.
+def calibrate_argon2_parameters(
+    target_latency_ms: float,
+    min_time_cost: int,
+    max_time_cost: int,
+    min_memory_cost: int,
+    max_memory_cost: int,
+    parallelism: int,
+) -> Argon2Parameters:
+    parameters = Argon2Parameters(min_time_cost, min_memory_cost, parallelism)
+    latency = _measure_ms(parameters)
+
+    if latency > target_latency_ms:
+        logger.warning(
+            f"Argon2 security floor takes {latency:.0f}ms, "
+            f"above the {target_latency_ms}ms target; using the floor"
+        )
+        return parameters
+
+    while parameters.memory_cost * 2 <= max_memory_cost:
+        candidate = Argon2Parameters(
+            parameters.time_cost, parameters.memory_cost * 2, parallelism
+        )
+        candidate_latency = _measure_ms(candidate)
+        if candidate_latency > target_latency_ms:
+            break
+        parameters, latency = candidate, candidate_latency
+
+    while parameters.time_cost < max_time_cost:
+        candidate = Argon2Parameters(
+            parameters.time_cost + 1, parameters.memory_cost, parallelism
+        )
+        candidate_latency = _measure_ms(candidate)
+        if candidate_latency > target_latency_ms:
+            break
+        parameters, latency = candidate, candidate_latency
+
+    logger.info(
+        f"Argon2 calibrated to t={parameters.time_cost}, "
+        f"m={parameters.memory_cost}KiB, p={parameters.parallelism} "
+        f"({latency:.0f}ms)"
+    )
+    return parameters
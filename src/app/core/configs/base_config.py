@@ -1,5 +1,14 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from ..enums import (
+    HashingExecutorType,
+    TokenDigestType,
+    KDFType,
+    JWTCodecType,
+    RevocationBusTransportType,
+    RefreshRotationPolicyType,
+)
+
 
 class BaseConfig(BaseSettings):
     APP_NAME: str | None = None
@@ -8,4 +17,147 @@ class BaseConfig(BaseSettings):
     APP_ENV: str | None = None
     APP_DEBUG: bool = True
 
+    # Hashing
+    HASHING_EXECUTOR_TYPE: HashingExecutorType = HashingExecutorType.THREAD
+    HASHING_EXECUTOR_MAX_WORKERS: int | None = None
+    HASHING_MEMORY_BUDGET_MB: int = 512
+    HASHING_MAX_QUEUE: int = 256
+    HASHING_MAX_WAIT_SECONDS: float = 2.0
+    HASHING_RETRY_AFTER_SECONDS: int = 1
+
+    # Argon2 password hashing; memory costs are in KiB
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 2
+    ARGON2_CALIBRATE: bool = False
+    ARGON2_TARGET_LATENCY_MS: int = 250
+    ARGON2_MIN_TIME_COST: int = 2
+    ARGON2_MAX_TIME_COST: int = 10
+    ARGON2_MIN_MEMORY_COST: int = 19 * 1024
+    ARGON2_MAX_MEMORY_COST: int = 256 * 1024
+
+    # KDF used for new password hashes; all known KDFs can still verify
+    PASSWORD_KDF: KDFType = KDFType.ARGON2ID
+    SCRYPT_LOG_N: int = 17
+    SCRYPT_R: int = 8
+    SCRYPT_P: int = 1
+    BCRYPT_ROUNDS: int = 12
+
+    # Refresh token storage; the pepper falls back to SECRET_REFRESH_TOKEN
+    REFRESH_TOKEN_DIGEST: TokenDigestType = TokenDigestType.HMAC_SHA256
+    REFRESH_TOKEN_PEPPER: str | None = None
+
+    # JWT codec; algorithms the HMAC codec cannot handle fall back to jose
+    JWT_CODEC: JWTCodecType = JWTCodecType.HMAC
+
+    # Asymmetric access tokens: a PEM Ed25519 or P-256 private key (inline or
+    # from a file) switches them to EdDSA / ES256 and publishes the JWKS.
+    # Access tokens signed with SECRET_ACCESS_TOKEN are then rejected unless
+    # ACCEPT_SECRET_SIGNED is on; only turn it on for the switch-over, for at
+    # most ACCESS_TOKEN_EXPIRE_MINUTES, since anyone holding the secret can
+    # mint such tokens
+    ACCESS_TOKEN_PRIVATE_KEY: str | None = None
+    ACCESS_TOKEN_PRIVATE_KEY_FILE: str | None = None
+    ACCESS_TOKEN_ACCEPT_SECRET_SIGNED: bool = False
+    JWKS_MAX_AGE_SECONDS: int = 300
+
+    # Optional JSON keyring with several keys per token type, polled for
+    # changes; see app.auth.services.keyring for the format
+    JWT_KEYRING_FILE: str | None = None
+    JWT_KEYRING_RELOAD_SECONDS: float = 30.0
+
+    # Largest batch accepted by POST /auth/verify/batch
+    AUTH_VERIFY_BATCH_MAX_TOKENS: int = 100
+
+    # Clients allowed to call POST /auth/introspect (RFC 7662 §2.1) and POST
+    # /auth/verify/batch: client id -> secret for HTTP Basic, and bearer tokens
+    # for callers without an id. With neither configured every call is rejected
+    AUTH_INTROSPECTION_CLIENTS: dict[str, str] = {}
+    AUTH_INTROSPECTION_BEARER_TOKENS: list[str] = []
+
+    # POST /auth/introspect results are reused for this long; 0 disables it
+    AUTH_INTROSPECTION_CACHE_TTL_SECONDS: float = 5.0
+    AUTH_INTROSPECTION_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Concurrent POST /auth/refresh-token calls with the same cookie share one
+    # refresh, and the pair it minted is returned again for GRACE_SECONDS.
+    # With CROSS_WORKER a refresh token rotated less than GRACE_SECONDS ago
+    # (e.g. by another worker) still gets an access token; 0 disables both
+    AUTH_REFRESH_GRACE_SECONDS: float = 10.0
+    AUTH_REFRESH_GRACE_MAX_ENTRIES: int = 10_000
+    AUTH_REFRESH_GRACE_CROSS_WORKER: bool = False
+
+    # Sessions (logins, with the refresh tokens rotated from them) kept per
+    # user; each login evicts the least recently renewed ones over the cap.
+    # 0 disables the cap
+    AUTH_MAX_SESSIONS_PER_USER: int = 20
+
+    # When POST /auth/refresh-token replaces the refresh token: "always",
+    # "window" (expires within WINDOW_SECONDS), "probabilistic" (window, or
+    # with PROBABILITY on any refresh) or "idle" (window, or unused for
+    # IDLE_SECONDS). A token that is not replaced stays valid
+    AUTH_REFRESH_ROTATION_POLICY: RefreshRotationPolicyType = (
+        RefreshRotationPolicyType.WINDOW
+    )
+    AUTH_REFRESH_ROTATION_WINDOW_SECONDS: float = 2 * 24 * 60 * 60
+    AUTH_REFRESH_ROTATION_PROBABILITY: float = 0.1
+    AUTH_REFRESH_ROTATION_IDLE_SECONDS: float = 24 * 60 * 60
+
+    # Paths whose Authorization header the auth middleware leaves alone
+    AUTH_MIDDLEWARE_EXEMPT_PATHS: list[str] = [
+        "/api/v1/auth/login",
+        "/api/v1/auth/signup",
+        "/api/v1/auth/refresh-token",
+        "/api/v1/auth/forward",
+        # Authenticated as a client, see AUTH_INTROSPECTION_CLIENTS
+        "/api/v1/auth/introspect",
+        "/api/v1/auth/verify/batch",
+    ]
+
+    # GET /auth/forward microcache; absorbs bursts from the same client
+    AUTH_FORWARD_CACHE_TTL_SECONDS: float = 0.5
+    AUTH_FORWARD_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Bloom filter over the blacklist so most "not revoked" answers skip the
+    # database. Sized from the table count times the headroom, capped at
+    # MAX_BYTES, and rebuilt every REBUILD_SECONDS or sooner once the exact set
+    # of recent revocations grows past its limit. Only used with a revocation
+    # bus transport below: revocations made by other workers reach the filter
+    # over the bus, and would otherwise be missed until the next rebuild. A
+    # single process can use the "memory" transport.
+    REVOCATION_FILTER_ENABLED: bool = True
+    REVOCATION_FILTER_FP_RATE: float = 0.01
+    REVOCATION_FILTER_MIN_CAPACITY: int = 100_000
+    REVOCATION_FILTER_HEADROOM: float = 1.5
+    REVOCATION_FILTER_MAX_BYTES: int = 16 * 1024 * 1024
+    REVOCATION_FILTER_RECENT_MAX_ENTRIES: int = 50_000
+    REVOCATION_FILTER_REBUILD_SECONDS: float = 60.0
+
+    # Revocation events broadcast between workers, so their in-process caches
+    # drop a revoked token right away: "unix" for the workers of one host
+    # (datagram sockets in SOCKET_DIR), "redis" for several hosts (pub/sub on
+    # any Redis-protocol server), "memory" only within one process
+    REVOCATION_BUS_TRANSPORT: RevocationBusTransportType = (
+        RevocationBusTransportType.NONE
+    )
+    REVOCATION_BUS_SOCKET_DIR: str = "/tmp/auth-revocation-bus"
+    REVOCATION_BUS_REDIS_URL: str = "redis://localhost:6379/0"
+    REVOCATION_BUS_CHANNEL: str = "auth:revocations"
+    REVOCATION_BUS_QUEUE_SIZE: int = 10_000
+
+    # Background deletion of blacklist and refresh-token rows whose token has
+    # expired, in batches with a pause in between
+    TOKEN_PURGE_ENABLED: bool = True
+    TOKEN_PURGE_INTERVAL_SECONDS: float = 600.0
+    TOKEN_PURGE_BATCH_SIZE: int = 1000
+    TOKEN_PURGE_BATCH_PAUSE_SECONDS: float = 0.1
+    TOKEN_PURGE_GRACE_SECONDS: int = 300
+
+    # Cache of verified tokens; rejected tokens are remembered separately
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_MAX_ENTRIES: int = 10_000
+    JWT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    JWT_CACHE_NEGATIVE_MAX_ENTRIES: int = 1024
+    JWT_CACHE_NEGATIVE_TTL_SECONDS: float = 60.0
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,43 @@
+from enum import Enum, IntEnum
+
+
+class HashingExecutorType(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class HashPriority(IntEnum):
+    # Lower value is admitted first
+    LOGIN = 0
+    SIGNUP = 1
+    REHASH = 2
+
+
+class TokenDigestType(str, Enum):
+    HMAC_SHA256 = "hmac-sha256"
+    ARGON2 = "argon2"
+
+
+class KDFType(str, Enum):
+    ARGON2ID = "argon2id"
+    SCRYPT = "scrypt"
+    BCRYPT = "bcrypt"
+
+
+class JWTCodecType(str, Enum):
+    HMAC = "hmac"
+    JOSE = "jose"
+
+
+class RevocationBusTransportType(str, Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    UNIX = "unix"
+    REDIS = "redis"
+
+
+class RefreshRotationPolicyType(str, Enum):
+    ALWAYS = "always"
+    WINDOW = "window"
+    PROBABILISTIC = "probabilistic"
+    IDLE = "idle"
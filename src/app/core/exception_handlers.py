@@ -4,6 +4,8 @@ from fastapi import HTTPException, Request, status, FastAPI
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 
+from .exceptions import HashingOverloadedError
+
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -26,6 +28,14 @@ def add_exception_handlers(app: FastAPI):
             content={"detail": exc.errors()},
         )
 
+    @app.exception_handler(HashingOverloadedError)
+    async def hashing_overloaded_handler(request: Request, exc: HashingOverloadedError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
         logger.error(f"Unhandled error: {request.url} | {repr(exc)}", exc_info=True)
@@ -0,0 +1,4 @@
+class HashingOverloadedError(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__("Service is busy. Please try again shortly.")
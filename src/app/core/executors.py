@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Any
+
+from .configs import config
+from .enums import HashingExecutorType
+
+logger = logging.getLogger(__name__)
+
+
+class HashingExecutor:
+    def __init__(
+        self,
+        executor_type: HashingExecutorType = HashingExecutorType.THREAD,
+        max_workers: int | None = None,
+    ) -> None:
+        self.__executor_type = HashingExecutorType(executor_type)
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__executor: Executor | None = None
+
+    @property
+    def executor_type(self) -> HashingExecutorType:
+        return self.__executor_type
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @property
+    def is_running(self) -> bool:
+        return self.__executor is not None
+
+    def start(self) -> None:
+        if self.__executor is not None:
+            return
+
+        if self.__executor_type == HashingExecutorType.PROCESS:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__max_workers)
+        else:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.__max_workers,
+                thread_name_prefix="hashing",
+            )
+
+        logger.info(
+            f"Hashing executor started: {self.__executor_type.value} pool, "
+            f"{self.__max_workers} workers"
+        )
+
+    def shutdown(self) -> None:
+        if self.__executor is None:
+            return
+
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+        self.__executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Until the lifespan starts the pool (e.g. ASGITransport in tests) the
+        # loop's default executor is used, so the work still leaves the loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, partial(func, *args))
+
+
+hashing_executor = HashingExecutor(
+    executor_type=config.HASHING_EXECUTOR_TYPE,
+    max_workers=config.HASHING_EXECUTOR_MAX_WORKERS,
+)
@@ -1,11 +1,67 @@
-from typing import Annotated
+from argon2 import Type
 
-from argon2 import Type, PasswordHasher
-from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHash
-from fastapi import Depends
+from .admission import HashingAdmissionController, hashing_admission
+from .calibration import Argon2Parameters
+from .configs import config
+from .enums import HashPriority, KDFType
+from .executors import HashingExecutor, hashing_executor
+from .kdf import KDFBackend, KDFRegistry, Argon2Backend, ScryptBackend, BcryptBackend
 
 
-class Argon2Hasher:
+# Module-level so they can be pickled into a process pool worker
+def _hash(backend: KDFBackend, value: str) -> str:
+    return backend.hash(value)
+
+
+def _verify(backend: KDFBackend, plain: str, hashed: str) -> bool:
+    return backend.verify(plain, hashed)
+
+
+class KDFHasher:
+    def __init__(
+        self,
+        registry: KDFRegistry,
+        executor: HashingExecutor = hashing_executor,
+        admission: HashingAdmissionController = hashing_admission,
+    ) -> None:
+        self._registry = registry
+        self._executor = executor
+        self._admission = admission
+
+    async def hash(
+        self, value: str, priority: HashPriority = HashPriority.SIGNUP
+    ) -> str:
+        if not value or not isinstance(value, str):
+            raise ValueError("Password must be a non-empty string.")
+
+        backend = self._registry.default
+        async with self._admission.admit(backend.memory_cost_bytes(), priority):
+            return await self._executor.run(_hash, backend, value)
+
+    async def verify(
+        self, plain: str, hashed: str, priority: HashPriority = HashPriority.LOGIN
+    ) -> bool:
+        backend = self._registry.backend_for(hashed)
+        if backend is None:
+            return False
+
+        async with self._admission.admit(backend.memory_cost_bytes(hashed), priority):
+            return await self._executor.run(_verify, backend, plain, hashed)
+
+    # Only parses the encoded parameters, cheap enough to stay on the loop.
+    # Hashes from a non-default KDF are always migrated to the default one.
+    async def needs_rehash(self, hashed: str) -> bool:
+        backend = self._registry.backend_for(hashed)
+        if backend is None:
+            return False
+
+        if backend is not self._registry.default:
+            return True
+
+        return backend.needs_rehash(hashed)
+
+
+class Argon2Hasher(KDFHasher):
     def __init__(
         self,
         time_cost: int = 3,
@@ -14,34 +70,60 @@ class Argon2Hasher:
         hash_len: int = 32,
         salt_len: int = 16,
         type_: Type = Type.ID,
+        executor: HashingExecutor = hashing_executor,
+        admission: HashingAdmissionController = hashing_admission,
     ) -> None:
-        self._hasher = PasswordHasher(
+        backend = Argon2Backend(
             time_cost=time_cost,
             memory_cost=memory_cost,
             parallelism=parallelism,
             hash_len=hash_len,
             salt_len=salt_len,
-            type=type_,
+            type_=type_,
         )
+        super().__init__(KDFRegistry(backend), executor, admission)
 
-    async def hash(self, value: str) -> str:
-        if not value or not isinstance(value, str):
-            raise ValueError("Password must be a non-empty string.")
 
-        return self._hasher.hash(value)
+_password_parameters = Argon2Parameters(
+    time_cost=config.ARGON2_TIME_COST,
+    memory_cost=config.ARGON2_MEMORY_COST,
+    parallelism=config.ARGON2_PARALLELISM,
+)
 
-    async def verify(self, plain: str, hashed: str) -> bool:
-        try:
-            return self._hasher.verify(hashed, plain)
-        except (VerifyMismatchError, VerificationError, InvalidHash):
-            return False
 
-    async def needs_rehash(self, hashed: str) -> bool:
-        return self._hasher.check_needs_rehash(hashed)
+def get_password_parameters() -> Argon2Parameters:
+    return _password_parameters
+
+
+def set_password_parameters(parameters: Argon2Parameters) -> None:
+    global _password_parameters
+    _password_parameters = parameters
+
 
+# Every known KDF can verify, only PASSWORD_KDF is used to hash
+def build_password_kdf_registry(
+    parameters: Argon2Parameters | None = None,
+) -> KDFRegistry:
+    parameters = parameters or _password_parameters
+    backends: dict[KDFType, KDFBackend] = {
+        KDFType.ARGON2ID: Argon2Backend(
+            time_cost=parameters.time_cost,
+            memory_cost=parameters.memory_cost,
+            parallelism=parameters.parallelism,
+        ),
+        KDFType.SCRYPT: ScryptBackend(
+            log_n=config.SCRYPT_LOG_N, r=config.SCRYPT_R, p=config.SCRYPT_P
+        ),
+    }
 
-async def __get_argon2_hasher() -> Argon2Hasher:
-    return Argon2Hasher()
+    try:
+        backends[KDFType.BCRYPT] = BcryptBackend(rounds=config.BCRYPT_ROUNDS)
+    except RuntimeError:
+        if config.PASSWORD_KDF == KDFType.BCRYPT:
+            raise
 
+    registry = KDFRegistry(backends.pop(config.PASSWORD_KDF))
+    for backend in backends.values():
+        registry.register(backend)
 
-Argon2Dep = Annotated[Argon2Hasher, Depends(__get_argon2_hasher)]
+    return registry
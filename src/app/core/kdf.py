@@ -0,0 +1,250 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+from abc import ABC, abstractmethod
+
+from argon2 import Type, PasswordHasher, extract_parameters
+from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHash
+
+from .enums import KDFType
+
+try:
+    import bcrypt
+except ImportError:  # optional, only needed for bcrypt imports
+    bcrypt = None
+
+
+# Backends run inside the hashing executor, so they must stay picklable and
+# side-effect free.
+class KDFBackend(ABC):
+    kdf_type: KDFType
+    prefixes: tuple[str, ...]
+
+    @abstractmethod
+    def hash(self, password: str) -> str: ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed: str) -> bool: ...
+
+    @abstractmethod
+    def needs_rehash(self, hashed: str) -> bool: ...
+
+    @abstractmethod
+    def memory_cost_bytes(self, hashed: str | None = None) -> int: ...
+
+
+class Argon2Backend(KDFBackend):
+    kdf_type = KDFType.ARGON2ID
+    prefixes = ("$argon2id$", "$argon2i$", "$argon2d$")
+
+    def __init__(
+        self,
+        time_cost: int = 3,
+        memory_cost: int = 64 * 1024,
+        parallelism: int = 2,
+        hash_len: int = 32,
+        salt_len: int = 16,
+        type_: Type = Type.ID,
+    ) -> None:
+        self._hasher = PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            hash_len=hash_len,
+            salt_len=salt_len,
+            type=type_,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    # The parameters are read from the hash itself, so any argon2 parameter
+    # set verifies, not just the one we currently hash with.
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._hasher.verify(hashed, password)
+        except (VerifyMismatchError, VerificationError, InvalidHash):
+            return False
+
+    # Upgrade weaker hashes but never downgrade stronger ones
+    def needs_rehash(self, hashed: str) -> bool:
+        try:
+            stored = extract_parameters(hashed)
+        except InvalidHash:
+            return False
+
+        return (
+            stored.type != self._hasher.type
+            or stored.time_cost < self._hasher.time_cost
+            or stored.memory_cost < self._hasher.memory_cost
+        )
+
+    def memory_cost_bytes(self, hashed: str | None = None) -> int:
+        if hashed:
+            try:
+                return extract_parameters(hashed).memory_cost * 1024
+            except InvalidHash:
+                pass
+
+        return self._hasher.memory_cost * 1024
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+# PHC format: $scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<hash>
+_SCRYPT_PATTERN = re.compile(
+    r"^\$scrypt\$ln=(?P<ln>\d+),r=(?P<r>\d+),p=(?P<p>\d+)"
+    r"\$(?P<salt>[A-Za-z0-9+/]+)\$(?P<hash>[A-Za-z0-9+/]+)$"
+)
+
+
+class ScryptBackend(KDFBackend):
+    kdf_type = KDFType.SCRYPT
+    prefixes = ("$scrypt$",)
+
+    def __init__(
+        self,
+        log_n: int = 17,
+        r: int = 8,
+        p: int = 1,
+        hash_len: int = 32,
+        salt_len: int = 16,
+    ) -> None:
+        self.log_n = log_n
+        self.r = r
+        self.p = p
+        self.hash_len = hash_len
+        self.salt_len = salt_len
+
+    @staticmethod
+    def _derive(
+        password: str, salt: bytes, log_n: int, r: int, p: int, dklen: int
+    ) -> bytes:
+        n = 1 << log_n
+        return hashlib.scrypt(
+            password.encode(),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=128 * r * (n + p + 2) + 1024 * 1024,
+            dklen=dklen,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_len)
+        derived = self._derive(
+            password, salt, self.log_n, self.r, self.p, self.hash_len
+        )
+        return (
+            f"$scrypt$ln={self.log_n},r={self.r},p={self.p}"
+            f"${_b64encode(salt)}${_b64encode(derived)}"
+        )
+
+    def verify(self, password: str, hashed: str) -> bool:
+        match = _SCRYPT_PATTERN.match(hashed)
+        if not match:
+            return False
+
+        expected = _b64decode(match["hash"])
+        derived = self._derive(
+            password,
+            _b64decode(match["salt"]),
+            int(match["ln"]),
+            int(match["r"]),
+            int(match["p"]),
+            len(expected),
+        )
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        match = _SCRYPT_PATTERN.match(hashed)
+        if not match:
+            return False
+
+        return int(match["ln"]) < self.log_n or int(match["r"]) < self.r
+
+    def memory_cost_bytes(self, hashed: str | None = None) -> int:
+        log_n, r = self.log_n, self.r
+
+        if hashed and (match := _SCRYPT_PATTERN.match(hashed)):
+            log_n, r = int(match["ln"]), int(match["r"])
+
+        return 128 * r * (1 << log_n)
+
+
+class BcryptBackend(KDFBackend):
+    kdf_type = KDFType.BCRYPT
+    prefixes = ("$2a$", "$2b$", "$2y$")
+
+    # bcrypt only looks at the first 72 bytes of the password
+    _MAX_PASSWORD_BYTES = 72
+
+    def __init__(self, rounds: int = 12) -> None:
+        if bcrypt is None:
+            raise RuntimeError("bcrypt support requires the optional 'bcrypt' package.")
+
+        self.rounds = rounds
+
+    def _encode(self, password: str) -> bytes:
+        return password.encode()[: self._MAX_PASSWORD_BYTES]
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(
+            self._encode(password), bcrypt.gensalt(rounds=self.rounds)
+        ).decode()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(self._encode(password), hashed.encode())
+        except ValueError:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        try:
+            return int(hashed.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def memory_cost_bytes(self, hashed: str | None = None) -> int:
+        # Blowfish state: four S-boxes plus the P-array
+        return 4 * 1024 + 72
+
+
+class KDFRegistry:
+    def __init__(self, default: KDFBackend) -> None:
+        self.__backends: dict[KDFType, KDFBackend] = {}
+        self.__prefixes: dict[str, KDFBackend] = {}
+        self.register(default)
+        self.__default = default
+
+    @property
+    def default(self) -> KDFBackend:
+        return self.__default
+
+    def register(self, backend: KDFBackend) -> None:
+        self.__backends[backend.kdf_type] = backend
+        for prefix in backend.prefixes:
+            self.__prefixes[prefix] = backend
+
+    def get(self, kdf_type: KDFType) -> KDFBackend | None:
+        return self.__backends.get(kdf_type)
+
+    # PHC strings are "$<id>$...", so the id segment is an O(1) dict lookup
+    def backend_for(self, hashed: str) -> KDFBackend | None:
+        if not hashed or not hashed.startswith("$"):
+            return None
+
+        end = hashed.find("$", 1)
+        if end == -1:
+            return None
+
+        return self.__prefixes.get(hashed[: end + 1])
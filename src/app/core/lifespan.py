@@ -3,12 +3,69 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.db.init import init_db
+from .calibration import calibrate_argon2_parameters
+from .configs import config
+from .executors import hashing_executor
+from .hashing import set_password_parameters
 from .logging_conf import configure_logging
 
 
+async def calibrate_password_hashing() -> None:
+    parameters = await hashing_executor.run(
+        calibrate_argon2_parameters,
+        config.ARGON2_TARGET_LATENCY_MS,
+        config.ARGON2_MIN_TIME_COST,
+        config.ARGON2_MAX_TIME_COST,
+        config.ARGON2_MIN_MEMORY_COST,
+        config.ARGON2_MAX_MEMORY_COST,
+        config.ARGON2_PARALLELISM,
+    )
+    set_password_parameters(parameters)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await configure_logging()
     # await init_db()
+    hashing_executor.start()
+
+    if config.ARGON2_CALIBRATE:
+        await calibrate_password_hashing()
+
+    # Imported here: the container pulls in the domain modules, which
+    # themselves depend on app.core
+    from app.container import build_container
+
+    # Built after calibration so the hasher picks up the tuned parameters
+    app.state.container = container = build_container()
+
+    if container.keyring_watcher:
+        container.keyring_watcher.start()
+
+    # Subscribed before the first rebuild, so revocations published while the
+    # filter loads still reach it
+    if container.revocation_bus:
+        await container.revocation_bus.start()
+
+    if container.revocation_cache_syncer:
+        await container.revocation_cache_syncer.start()
+
+    if container.token_purger:
+        container.token_purger.start()
+
     yield
     print("Server is shutting down...")
+
+    if container.token_purger:
+        await container.token_purger.stop()
+
+    if container.revocation_cache_syncer:
+        await container.revocation_cache_syncer.stop()
+
+    if container.revocation_bus:
+        await container.revocation_bus.stop()
+
+    if container.keyring_watcher:
+        await container.keyring_watcher.stop()
+
+    hashing_executor.shutdown()
@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class StageTimingStatsDTO:
+    stage: str
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+
+
+# Cumulative wall-clock time spent in each named stage of a flow, so changes
+# to one stage can be measured in production. Failed runs are counted too.
+class StageTimings:
+    def __init__(self) -> None:
+        # stage -> [count, total seconds, max seconds]
+        self.__stages: dict[str, list] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage: str, seconds: float) -> None:
+        entry = self.__stages.setdefault(stage, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def stats(self) -> list[StageTimingStatsDTO]:
+        return [
+            StageTimingStatsDTO(
+                stage=stage,
+                count=count,
+                total_ms=total * 1000,
+                avg_ms=total / count * 1000,
+                max_ms=longest * 1000,
+            )
+            for stage, (count, total, longest) in self.__stages.items()
+        ]
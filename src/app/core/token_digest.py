@@ -0,0 +1,64 @@
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+
+from .hashing import Argon2Hasher
+
+_ARGON2_PREFIX = "$argon2"
+_HMAC_SHA256_PREFIX = "$hmac-sha256$"
+
+
+class TokenDigest(ABC):
+    @abstractmethod
+    async def digest(self, token: str) -> str: ...
+
+    @abstractmethod
+    async def verify(self, token: str, digest: str) -> bool: ...
+
+    def needs_update(self, digest: str) -> bool:
+        return False
+
+
+class Argon2TokenDigest(TokenDigest):
+    def __init__(self, hasher: Argon2Hasher) -> None:
+        self.__hasher = hasher
+
+    async def digest(self, token: str) -> str:
+        return await self.__hasher.hash(token)
+
+    async def verify(self, token: str, digest: str) -> bool:
+        return await self.__hasher.verify(token, digest)
+
+
+# Refresh tokens are signed, high-entropy JWTs, so a keyed hash is enough to
+# make a leaked table useless; a slow KDF only burns CPU and memory here.
+class HMACTokenDigest(TokenDigest):
+    def __init__(self, pepper: str, legacy: TokenDigest | None = None) -> None:
+        if not pepper:
+            raise ValueError("Token digest pepper must be a non-empty string.")
+
+        self.__key = hmac.new(pepper.encode(), digestmod=hashlib.sha256)
+        self.__legacy = legacy
+
+    def __hexdigest(self, token: str) -> str:
+        mac = self.__key.copy()
+        mac.update(token.encode())
+        return mac.hexdigest()
+
+    async def digest(self, token: str) -> str:
+        return f"{_HMAC_SHA256_PREFIX}{self.__hexdigest(token)}"
+
+    async def verify(self, token: str, digest: str) -> bool:
+        if digest.startswith(_HMAC_SHA256_PREFIX):
+            return hmac.compare_digest(
+                digest[len(_HMAC_SHA256_PREFIX) :], self.__hexdigest(token)
+            )
+
+        # Rows written before the switch still hold Argon2 hashes
+        if self.__legacy and digest.startswith(_ARGON2_PREFIX):
+            return await self.__legacy.verify(token, digest)
+
+        return False
+
+    def needs_update(self, digest: str) -> bool:
+        return not digest.startswith(_HMAC_SHA256_PREFIX)
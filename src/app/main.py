@@ -2,14 +2,20 @@ from fastapi import FastAPI
 
 from app.api import router
 from app.auth.exception_handlers import auth_exception_handlers
+from app.auth.middleware import AuthenticationMiddleware
 from app.core import config
 from app.core.exception_handlers import add_exception_handlers
 from app.core.lifespan import lifespan
 from app.users.exception_handlers import add_user_exception_handlers
+from app.well_known.routes import router as well_known_router
 
 app = FastAPI(lifespan=lifespan, debug=config.APP_DEBUG)
+app.add_middleware(
+    AuthenticationMiddleware, exempt_paths=config.AUTH_MIDDLEWARE_EXEMPT_PATHS
+)
 
 app.include_router(router)
+app.include_router(well_known_router, prefix="/.well-known", tags=["Well-known"])
 
 add_exception_handlers(app)
 add_user_exception_handlers(app)
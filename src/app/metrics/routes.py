@@ -0,0 +1,36 @@
+from fastapi import APIRouter, status
+
+from app.auth.dependencies import AuthAdminDep
+from app.auth.dtos import TokenCacheStatsDTO, RevocationCacheStatsDTO
+from app.container import ContainerDep
+from app.core.admission import hashing_admission, HashingAdmissionStatsDTO
+from app.core.stage_timings import StageTimingStatsDTO
+
+router = APIRouter()
+
+
+@router.get("/hashing", status_code=status.HTTP_200_OK)
+async def hashing_metrics(admin: AuthAdminDep) -> HashingAdmissionStatsDTO:
+    return hashing_admission.stats()
+
+
+@router.get("/token-cache", status_code=status.HTTP_200_OK)
+async def token_cache_metrics(
+    admin: AuthAdminDep, container: ContainerDep
+) -> TokenCacheStatsDTO | None:
+    return container.jwt_service.cache_stats()
+
+
+@router.get("/revocation-cache", status_code=status.HTTP_200_OK)
+async def revocation_cache_metrics(
+    admin: AuthAdminDep, container: ContainerDep
+) -> RevocationCacheStatsDTO | None:
+    cache = container.revocation_cache
+    return cache.stats() if cache is not None else None
+
+
+@router.get("/refresh-timings", status_code=status.HTTP_200_OK)
+async def refresh_timing_metrics(
+    admin: AuthAdminDep, container: ContainerDep
+) -> list[StageTimingStatsDTO]:
+    return container.refresh_timings.stats()
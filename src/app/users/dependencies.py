@@ -2,7 +2,7 @@ from typing import Annotated
 
 from fastapi import Depends
 
-from app.core import Argon2Dep
+from app.container import ContainerDep
 from app.db import SessionDep
 from app.users.repository import UserRepository
 from app.users.service import UserService
@@ -15,8 +15,10 @@ async def __get_user_repo(db: SessionDep) -> UserRepository:
 __UserRepoDep = Annotated[UserRepository, Depends(__get_user_repo)]
 
 
-async def __get_user_service(repo: __UserRepoDep, hasher: Argon2Dep) -> UserService:
-    return UserService(repo, hasher)
+async def __get_user_service(
+    repo: __UserRepoDep, container: ContainerDep
+) -> UserService:
+    return UserService(repo, container.password_hasher)
 
 
 UserServiceDep = Annotated[UserService, Depends(__get_user_service)]
@@ -17,6 +17,7 @@ class UserOutDTO:
     created_at: datetime
     updated_at: datetime | None = None
     last_login_at: datetime | None = None
+    tokens_valid_after: datetime | None = None
 
 
 @dataclass
@@ -39,6 +40,7 @@ class UserUpdateDTO:
     is_deleted: bool | None = None
     updated_at: datetime | None = None
     last_login_at: datetime | None = None
+    tokens_valid_after: datetime | None = None
 
 
 @dataclass
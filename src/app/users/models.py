@@ -33,3 +33,7 @@ class User(Base):
     last_login_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Tokens issued before this are revoked, however many there are
+    tokens_valid_after: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -1,4 +1,5 @@
 from dataclasses import asdict
+from datetime import datetime
 from typing import Sequence
 
 from sqlalchemy import select, insert, update, delete
@@ -22,6 +23,15 @@ class UserRepository:
         user = await self.__db.scalar(stmt)
         return user
 
+    @handle_db_exceptions
+    async def get_by_ids(self, user_ids: list[ULID]) -> Sequence[User]:
+        if not user_ids:
+            return []
+
+        stmt = select(User).where(User.id.in_(user_ids))
+        users = await self.__db.scalars(stmt)
+        return users.all()
+
     @handle_db_exceptions
     async def get_by_email(self, email: str) -> User | None:
         stmt = select(User).where(User.email == email)
@@ -52,6 +62,25 @@ class UserRepository:
         await self.__db.commit()
         return updated_user
 
+    # Compare-and-set: only replaces the hash that was read, so a password
+    # changed in the meantime is kept. Returns whether the row was updated
+    @handle_db_exceptions
+    async def replace_hashed_password(
+        self,
+        user_id: ULID,
+        old_hash: str,
+        new_hash: str,
+        updated_at: datetime,
+    ) -> bool:
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash, updated_at=updated_at)
+        )
+        result = await self.__db.execute(stmt)
+        await self.__db.commit()
+        return result.rowcount == 1
+
     @handle_db_exceptions
     async def delete_user(self, user_id: ULID) -> None:
         stmt = delete(User).where(User.id == user_id)
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 
 import ulid
 
-from app.core import ULID, Argon2Hasher
+from app.core import ULID, KDFHasher, HashPriority
 from app.utils.dto_utils import db_to_dto
 from .dtos import (
     UserCreateDTO,
@@ -23,7 +23,7 @@ from .repository import UserRepository
 
 
 class UserService:
-    def __init__(self, repo: UserRepository, hasher: Argon2Hasher) -> None:
+    def __init__(self, repo: UserRepository, hasher: KDFHasher) -> None:
         self.__repo = repo
         self.__hasher = hasher
 
@@ -40,7 +40,9 @@ class UserService:
             id=ulid.new(),
             fullname=create_request_dto.fullname,
             email=create_request_dto.email,
-            hashed_password=await self.__hasher.hash(create_request_dto.password),
+            hashed_password=await self.__hasher.hash(
+                create_request_dto.password, priority=HashPriority.SIGNUP
+            ),
             role=UserRole.USER,
             created_at=datetime.now(timezone.utc),
         )
@@ -54,15 +56,28 @@ class UserService:
         # Convert DB model to output DTO and return
         return await db_to_dto(created_user, UserOutDTO)
 
-    # SEARCH User by id
-    async def get_user_by_id(self, user_id: ULID) -> UserOutDTO:
+    # SEARCH User by id, None when there is no such User
+    async def find_user_by_id(self, user_id: ULID) -> UserOutDTO | None:
         user = await self.__repo.get_by_id(user_id)
 
         if not user:
-            raise UserIDNotFoundError(user_id)
+            return None
 
         return await db_to_dto(user, UserOutDTO)
 
+    async def get_user_by_id(self, user_id: ULID) -> UserOutDTO:
+        user = await self.find_user_by_id(user_id)
+
+        if user is None:
+            raise UserIDNotFoundError(user_id)
+
+        return user
+
+    # Users that do not exist are simply missing from the result
+    async def get_users_by_ids(self, user_ids: list[ULID]) -> dict[ULID, UserOutDTO]:
+        users = await self.__repo.get_by_ids(user_ids)
+        return {user.id: await db_to_dto(user, UserOutDTO) for user in users}
+
     async def get_user_by_email(self, email: str) -> UserOutDTO:
         user = await self.__repo.get_by_email(email)
 
@@ -97,9 +112,14 @@ class UserService:
         )
         return
 
-    # Deactivate User (is_active=False)
+    # Deactivate User (is_active=False), revoking the tokens already issued
     async def deactivate_user(self, user_id: ULID) -> None:
-        await self.update_user(user_id, UserUpdateDTO(is_active=True))
+        await self.update_user(
+            user_id,
+            UserUpdateDTO(
+                is_active=False, tokens_valid_after=datetime.now(timezone.utc)
+            ),
+        )
         return
 
     # DELETE User (Soft) (is_deleted=True)
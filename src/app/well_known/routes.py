@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.container import ContainerDep
+from app.core import config
+
+router = APIRouter()
+
+
+@router.get("/jwks.json", status_code=status.HTTP_200_OK)
+async def jwks(request: Request, container: ContainerDep) -> Response:
+    document = container.jwt_service.jwks_document()
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": f"public, max-age={config.JWKS_MAX_AGE_SECONDS}",
+    }
+
+    if request.headers.get("if-none-match") == document.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=document.body,
+        media_type="application/json",
+        headers=headers,
+    )
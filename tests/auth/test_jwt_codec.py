@@ -0,0 +1,308 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+# EdDSA / ES256 keys need the optional 'asymmetric' extra
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from jose import jwt
+
+from app.auth.exceptions.token_exceptions import (
+    JWTTokenCredentialsInvalidError,
+    JWTTokenExpiredError,
+)
+from app.auth.services.jwt_codec import (
+    JWTCodec,
+    HMACJWTCodec,
+    JoseJWTCodec,
+    build_jwt_codec,
+    load_asymmetric_codec,
+)
+from app.core.enums import JWTCodecType
+
+pytestmark = pytest.mark.anyio
+
+KEY = "conformance-secret"
+ALGORITHMS = ["HS256", "HS384", "HS512"]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+# Hand-rolled token, so tests do not depend on either codec's encoder
+def _sign(header: dict, payload, key: str = KEY) -> str:
+    signing_input = (
+        f"{_b64(json.dumps(header).encode())}.{_b64(json.dumps(payload).encode())}"
+    )
+    signature = hmac.new(key.encode(), signing_input.encode(), hashlib.sha256)
+    return f"{signing_input}.{_b64(signature.digest())}"
+
+
+def _claims(**overrides) -> dict:
+    now = int(time.time())
+    claims = {
+        "sub": "01JXUSER",
+        "jti": "01JXJTI",
+        "iat": now,
+        "exp": now + 60,
+        "type": "access_token",
+    }
+    claims.update(overrides)
+    return claims
+
+
+@pytest.fixture(params=["hmac", "jose"])
+def codec_type(request) -> str:
+    return request.param
+
+
+def _codec(codec_type: str, algorithm: str = "HS256", key=KEY) -> JWTCodec:
+    if codec_type == "hmac":
+        return HMACJWTCodec(key, algorithm)
+    return JoseJWTCodec(key, algorithm)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_round_trip(codec_type, algorithm):
+    codec = _codec(codec_type, algorithm)
+    claims = _claims(ip="127.0.0.1")
+
+    assert codec.decode(codec.encode(claims)) == claims
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_interoperates_with_jose(algorithm):
+    fast, jose = HMACJWTCodec(KEY, algorithm), JoseJWTCodec(KEY, algorithm)
+    claims = _claims()
+
+    assert jose.decode(fast.encode(claims)) == claims
+    assert fast.decode(jose.encode(claims)) == claims
+
+
+# RFC 7515, appendix A.1
+async def test_rfc7515_hs256_example(codec_type):
+    key = base64.urlsafe_b64decode(
+        "AyM1SysPpbyDfgZld3umj1qzKObwVMkoqQ-EstJQLr_T-1qS0gZH75aKtMN3Yj0iPS4hcgUuTwjAzZr1Z9CAow=="
+    )
+    token = (
+        "eyJ0eXAiOiJKV1QiLA0KICJhbGciOiJIUzI1NiJ9"
+        ".eyJpc3MiOiJqb2UiLA0KICJleHAiOjEzMDA4MTkzODAsDQogImh0dHA6Ly9leGFt"
+        "cGxlLmNvbS9pc19yb290Ijp0cnVlfQ"
+        ".dBjftJeZ4CVP-mB92K27uhbUJU1p1r_wW1gFWFOEjXk"
+    )
+
+    claims = _codec(codec_type, key=key).decode(token, verify_exp=False)
+
+    assert claims == {
+        "iss": "joe",
+        "exp": 1300819380,
+        "http://example.com/is_root": True,
+    }
+    with pytest.raises(JWTTokenExpiredError):
+        _codec(codec_type, key=key).decode(token)
+
+
+async def test_expired_token(codec_type):
+    codec = _codec(codec_type)
+    token = codec.encode(_claims(exp=int(time.time()) - 10))
+
+    with pytest.raises(JWTTokenExpiredError):
+        codec.decode(token)
+
+    assert codec.decode(token, verify_exp=False)["sub"] == "01JXUSER"
+
+
+async def test_wrong_key(codec_type):
+    token = _codec(codec_type, key="other-secret").encode(_claims())
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        _codec(codec_type).decode(token)
+
+
+async def test_tampered_payload(codec_type):
+    codec = _codec(codec_type)
+    header, _, signature = codec.encode(_claims()).split(".")
+    payload = _b64(json.dumps(_claims(sub="01JXADMIN")).encode())
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        codec.decode(f"{header}.{payload}.{signature}")
+
+
+async def test_algorithm_mismatch(codec_type):
+    token = _codec(codec_type, "HS512").encode(_claims())
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        _codec(codec_type, "HS256").decode(token)
+
+
+async def test_alg_none_rejected(codec_type):
+    header = _b64(json.dumps({"alg": "none", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(_claims()).encode())
+    signed = _sign({"alg": "none", "typ": "JWT"}, _claims())
+
+    for token in (f"{header}.{payload}.", f"{header}.{payload}", signed):
+        with pytest.raises(JWTTokenCredentialsInvalidError):
+            _codec(codec_type).decode(token)
+
+
+async def test_header_with_extra_fields(codec_type):
+    token = _sign({"typ": "JWT", "alg": "HS256", "kid": "k1"}, _claims())
+
+    assert _codec(codec_type).decode(token) == _claims()
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "abc",
+        "a.b",
+        "a.b.c.d",
+        "!!!.???.***",
+        "ééé.ééé.ééé",
+    ],
+)
+async def test_malformed_tokens(codec_type, token):
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        _codec(codec_type).decode(token)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"nbf": int(time.time()) + 3600},
+        {"aud": "someone-else"},
+        {"iat": "yesterday"},
+        {"exp": "tomorrow"},
+        {"sub": 42},
+    ],
+)
+async def test_invalid_claims(codec_type, overrides):
+    codec = _codec(codec_type)
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        codec.decode(codec.encode(_claims(**overrides)))
+
+
+async def test_non_object_payload(codec_type):
+    token = _sign({"alg": "HS256", "typ": "JWT"}, [1, 2, 3])
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        _codec(codec_type).decode(token)
+
+
+async def test_build_jwt_codec_falls_back_to_jose():
+    assert isinstance(build_jwt_codec(KEY, "HS256"), HMACJWTCodec)
+    assert isinstance(build_jwt_codec(KEY, "HS256", JWTCodecType.JOSE), JoseJWTCodec)
+    assert isinstance(build_jwt_codec(KEY, "RS256"), JoseJWTCodec)
+
+
+def _pem(private_key) -> bytes:
+    return private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+
+
+def _public_pem(private_key) -> bytes:
+    return private_key.public_key().public_bytes(
+        Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+@pytest.fixture(params=["EdDSA", "ES256"])
+def private_key(request):
+    if request.param == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+async def test_asymmetric_round_trip(private_key):
+    codec = load_asymmetric_codec(_pem(private_key))
+    claims = _claims()
+
+    assert codec.decode(codec.encode(claims)) == claims
+    assert codec.algorithm in ("EdDSA", "ES256")
+
+
+async def test_asymmetric_header_carries_kid(private_key):
+    codec = load_asymmetric_codec(_pem(private_key))
+    header = json.loads(
+        base64.urlsafe_b64decode(codec.encode(_claims()).split(".")[0] + "==")
+    )
+
+    assert header == {"alg": codec.algorithm, "typ": "JWT", "kid": codec.kid}
+    assert codec.public_jwk()["kid"] == codec.kid
+
+
+async def test_public_key_codec_is_verify_only(private_key):
+    signer = load_asymmetric_codec(_pem(private_key))
+    verifier = load_asymmetric_codec(_public_pem(private_key))
+    token = signer.encode(_claims())
+
+    assert verifier.decode(token) == _claims()
+    assert verifier.kid == signer.kid
+    with pytest.raises(RuntimeError):
+        verifier.encode(_claims())
+
+
+async def test_asymmetric_wrong_key(private_key):
+    token = load_asymmetric_codec(_pem(private_key)).encode(_claims())
+    other = (
+        ed25519.Ed25519PrivateKey.generate()
+        if isinstance(private_key, ed25519.Ed25519PrivateKey)
+        else ec.generate_private_key(ec.SECP256R1())
+    )
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        load_asymmetric_codec(_pem(other)).decode(token)
+
+
+# Classic key confusion: an HS256 token "signed" with the public key
+async def test_hmac_token_signed_with_public_key_is_rejected(private_key):
+    codec = load_asymmetric_codec(_pem(private_key))
+    forged = HMACJWTCodec(_public_pem(private_key), "HS256").encode(_claims())
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        codec.decode(forged)
+
+
+async def test_es256_interoperates_with_jose():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    codec = load_asymmetric_codec(_pem(private_key))
+    claims = _claims()
+
+    assert (
+        jwt.decode(codec.encode(claims), _public_pem(private_key).decode(), "ES256")
+        == claims
+    )
+    assert (
+        codec.decode(jwt.encode(claims, _pem(private_key).decode(), "ES256")) == claims
+    )
+
+
+# RFC 8037, appendices A.1-A.3
+async def test_ed25519_jwk_and_thumbprint():
+    private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
+        base64.urlsafe_b64decode("nWGxne_9WmC6hEr0kuwsxERJxWl7MmkZcDusAxyuf2A=")
+    )
+    codec = load_asymmetric_codec(_pem(private_key))
+
+    assert codec.public_jwk()["x"] == "11qYAYKxCrfVS_7TyWQHOg7hcvPapiMlrwIaaPcHURo"
+    assert codec.kid == "kPrK_qmxVWaYVA9wwBF6Iuo3vVzz7TxHCTwXBygrS4k"
+
+
+async def test_unsupported_key_type():
+    private_key = ec.generate_private_key(ec.SECP384R1())
+
+    with pytest.raises(ValueError):
+        load_asymmetric_codec(_pem(private_key))
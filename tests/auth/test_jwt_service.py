@@ -0,0 +1,40 @@
+import pytest
+
+from app.auth.dtos import JWTRefreshTokenDTO
+from app.auth.enums import TokenType
+from app.auth.services.jwt_service import JWTService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def jwt_service() -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access="access-secret",
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+    )
+
+
+async def test_mint_token_claims_match_decoded_token(jwt_service):
+    minted = await jwt_service.mint_token(
+        "01JXUSER", TokenType.REFRESH_TOKEN, ip="127.0.0.1"
+    )
+
+    decoded = await jwt_service.decode_token(minted.token, TokenType.REFRESH_TOKEN)
+
+    assert isinstance(minted.claims, JWTRefreshTokenDTO)
+    assert minted.claims == decoded
+    assert minted.claims.exp.tzinfo is not None
+
+
+async def test_encode_token_uses_minted_token(jwt_service):
+    token = await jwt_service.encode_token("01JXUSER", TokenType.ACCESS_TOKEN)
+    decoded = await jwt_service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+    assert decoded.sub == "01JXUSER"
+    assert decoded.type == TokenType.ACCESS_TOKEN
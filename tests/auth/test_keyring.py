@@ -0,0 +1,182 @@
+import json
+import os
+
+import pytest
+
+# EdDSA / ES256 keys need the optional 'asymmetric' extra
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+)
+from jose import jwt
+
+from app.auth.enums import TokenType
+from app.auth.exceptions.token_exceptions import JWTTokenCredentialsInvalidError
+from app.auth.services.jwt_codec import HMACJWTCodec, hmac_key_id
+from app.auth.services.jwt_service import JWTService
+from app.auth.services.keyring import KeyRingFileWatcher, read_keyring_file
+from app.auth.services.token_cache import VerifiedTokenCache
+from app.core.enums import JWTCodecType
+
+pytestmark = pytest.mark.anyio
+
+ACCESS_SECRET = "access-secret"
+
+
+@pytest.fixture
+def jwt_service() -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access=ACCESS_SECRET,
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+        cache=VerifiedTokenCache(
+            max_entries=100,
+            max_bytes=1024 * 1024,
+            negative_max_entries=10,
+            negative_ttl_seconds=60,
+        ),
+    )
+
+
+async def _access_token(jwt_service: JWTService) -> str:
+    return await jwt_service.encode_token("01JXUSER", TokenType.ACCESS_TOKEN)
+
+
+async def test_tokens_carry_the_active_kid(jwt_service):
+    token = await _access_token(jwt_service)
+
+    assert jwt.get_unverified_header(token)["kid"] == hmac_key_id(ACCESS_SECRET)
+
+
+# Tokens issued before kid headers existed must not force a re-login
+async def test_tokens_without_kid_verify_against_the_configured_secret(jwt_service):
+    minted = await jwt_service.mint_token("01JXUSER", TokenType.ACCESS_TOKEN)
+    claims = jwt.get_unverified_claims(minted.token)
+    legacy_token = jwt.encode(claims, ACCESS_SECRET, "HS256")
+
+    decoded = await jwt_service.decode_token(legacy_token, TokenType.ACCESS_TOKEN)
+
+    assert decoded.jti == minted.claims.jti
+
+
+async def test_rotation_keeps_existing_sessions_valid(jwt_service):
+    keyring = jwt_service.keyring(TokenType.ACCESS_TOKEN)
+    old_kid = keyring.kid
+    old_token = await _access_token(jwt_service)
+
+    keyring.load(HMACJWTCodec("next-secret", "HS256", kid="next"), activate=True)
+    new_token = await _access_token(jwt_service)
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "next"
+    assert await jwt_service.decode_token(old_token, TokenType.ACCESS_TOKEN)
+    assert await jwt_service.decode_token(new_token, TokenType.ACCESS_TOKEN)
+    assert sorted(keyring.kids) == sorted([old_kid, "next"])
+
+
+async def test_retired_key_no_longer_verifies_even_when_cached(jwt_service):
+    keyring = jwt_service.keyring(TokenType.ACCESS_TOKEN)
+    old_kid = keyring.kid
+    old_token = await _access_token(jwt_service)
+    await jwt_service.decode_token(old_token, TokenType.ACCESS_TOKEN)
+
+    keyring.load(HMACJWTCodec("next-secret", "HS256", kid="next"), activate=True)
+    keyring.retire(old_kid)
+
+    assert jwt_service.cache_stats().entries == 0
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        await jwt_service.decode_token(old_token, TokenType.ACCESS_TOKEN)
+
+
+async def test_active_key_cannot_be_retired(jwt_service):
+    keyring = jwt_service.keyring(TokenType.ACCESS_TOKEN)
+
+    with pytest.raises(ValueError):
+        keyring.retire(keyring.kid)
+
+
+async def test_unknown_kid_is_rejected(jwt_service):
+    minted = await jwt_service.mint_token("01JXUSER", TokenType.ACCESS_TOKEN)
+    claims = jwt.get_unverified_claims(minted.token)
+    token = jwt.encode(claims, ACCESS_SECRET, "HS256", headers={"kid": "unknown"})
+
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        await jwt_service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+
+async def test_jwks_document_follows_key_changes(jwt_service, tmp_path):
+    assert json.loads(jwt_service.jwks_document().body) == {"keys": []}
+
+    pem_file = tmp_path / "ed25519.pem"
+    pem_file.write_bytes(
+        ed25519.Ed25519PrivateKey.generate().private_bytes(
+            Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+        )
+    )
+    keyring_file = tmp_path / "keyring.json"
+    keyring_file.write_text(
+        json.dumps(
+            {
+                "access_token": {
+                    "active": "ed-1",
+                    "keys": [
+                        {"kid": "ed-1", "private_key_file": str(pem_file)},
+                        {"kid": "hs-0", "secret": ACCESS_SECRET},
+                    ],
+                }
+            }
+        )
+    )
+    jwt_service.reload_keyrings(
+        read_keyring_file(str(keyring_file), "HS256", JWTCodecType.HMAC)
+    )
+
+    keys = json.loads(jwt_service.jwks_document().body)["keys"]
+    assert [key["kid"] for key in keys] == ["ed-1"]
+    token = await _access_token(jwt_service)
+    assert jwt.get_unverified_header(token) == {
+        "alg": "EdDSA",
+        "typ": "JWT",
+        "kid": "ed-1",
+    }
+
+
+async def test_file_watcher_reloads_changed_keyring(jwt_service, tmp_path):
+    keyring_file = tmp_path / "keyring.json"
+
+    def write(active: str, keys: list[dict]) -> None:
+        keyring_file.write_text(
+            json.dumps({"access_token": {"active": active, "keys": keys}})
+        )
+        stat = keyring_file.stat()
+        os.utime(keyring_file, (stat.st_atime, stat.st_mtime + 1))
+
+    write("k1", [{"kid": "k1", "secret": "secret-1"}])
+    watcher = KeyRingFileWatcher(
+        str(keyring_file),
+        interval_seconds=3600,
+        load=lambda: read_keyring_file(str(keyring_file), "HS256", JWTCodecType.HMAC),
+        on_reload=jwt_service.reload_keyrings,
+    )
+    keyring = jwt_service.keyring(TokenType.ACCESS_TOKEN)
+
+    assert watcher.check()
+    assert keyring.kids == ["k1"]
+    assert not watcher.check()
+
+    write("k2", [{"kid": "k1", "secret": "secret-1"}, {"kid": "k2", "secret": "s2"}])
+    assert watcher.check()
+    assert keyring.kid == "k2"
+
+    # A broken file leaves the current keys in place
+    keyring_file.write_text("{not json")
+    os.utime(keyring_file, (0, keyring_file.stat().st_mtime + 2))
+    assert not watcher.check()
+    assert keyring.kid == "k2"
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.auth.dtos import AuthTokensOutDTO
+from app.auth.dtos.auth_dtos import RefreshAccessTokenInDTO
+from app.auth.services.refresh_coalescer import RefreshCoalescer
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(refresh_token: str = "refresh", device: str | None = "ua"):
+    return RefreshAccessTokenInDTO(
+        access_token="access",
+        refresh_token=refresh_token,
+        ip_address="127.0.0.1",
+        device_info=device,
+    )
+
+
+class _Refresh:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.__error = error
+
+    async def __call__(self) -> AuthTokensOutDTO:
+        self.calls += 1
+        await self.release.wait()
+
+        if self.__error is not None:
+            raise self.__error
+
+        return AuthTokensOutDTO(
+            access_token=f"access-{self.calls}", refresh_token=None, token_type="bearer"
+        )
+
+
+async def test_key_depends_on_token_ip_and_device():
+    key = RefreshCoalescer.key(_request())
+
+    assert key == RefreshCoalescer.key(_request())
+    assert key != RefreshCoalescer.key(_request(refresh_token="other"))
+    assert key != RefreshCoalescer.key(_request(device=None))
+
+
+async def test_concurrent_calls_run_once():
+    coalescer = RefreshCoalescer(grace_seconds=10, max_entries=10)
+    refresh = _Refresh()
+    key = RefreshCoalescer.key(_request())
+
+    tasks = [asyncio.create_task(coalescer.run(key, refresh)) for _ in range(3)]
+    await asyncio.sleep(0)
+    refresh.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert refresh.calls == 1
+    assert {result.access_token for result in results} == {"access-1"}
+    assert coalescer.coalesced == 2
+
+    assert (await coalescer.run(key, refresh)).access_token == "access-1"
+    assert coalescer.replayed == 1
+
+
+async def test_errors_are_shared_but_not_remembered():
+    coalescer = RefreshCoalescer(grace_seconds=10, max_entries=10)
+    refresh = _Refresh(ValueError("revoked"))
+    key = RefreshCoalescer.key(_request())
+
+    tasks = [asyncio.create_task(coalescer.run(key, refresh)) for _ in range(2)]
+    await asyncio.sleep(0)
+    refresh.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        await coalescer.run(key, refresh)
+    assert refresh.calls == 2
+
+
+async def test_waiter_takes_over_when_the_leader_is_cancelled():
+    coalescer = RefreshCoalescer(grace_seconds=10, max_entries=10)
+    refresh = _Refresh()
+    key = RefreshCoalescer.key(_request())
+
+    leader = asyncio.create_task(coalescer.run(key, refresh))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(coalescer.run(key, refresh))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    refresh.release.set()
+
+    assert (await waiter).access_token == "access-2"
+    assert leader.cancelled()
+
+
+async def test_without_grace_nothing_is_remembered():
+    coalescer = RefreshCoalescer(grace_seconds=0, max_entries=10, cross_worker=True)
+    refresh = _Refresh()
+    refresh.release.set()
+    key = RefreshCoalescer.key(_request())
+
+    await coalescer.run(key, refresh)
+    await coalescer.run(key, refresh)
+
+    assert refresh.calls == 2
+    assert coalescer.rotation_grace is None
+
+
+async def test_remembered_results_are_bounded():
+    coalescer = RefreshCoalescer(grace_seconds=10, max_entries=1, cross_worker=True)
+    refresh = _Refresh()
+    refresh.release.set()
+    first, second = (RefreshCoalescer.key(_request(token)) for token in "ab")
+
+    await coalescer.run(first, refresh)
+    await coalescer.run(second, refresh)
+    await coalescer.run(first, refresh)
+
+    assert refresh.calls == 3
+    assert coalescer.rotation_grace == timedelta(seconds=10)
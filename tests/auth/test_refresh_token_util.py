@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+
+from app.auth.dtos import RefreshContextDTO
+from app.auth.enums import BlacklistReason
+from app.auth.helpers.refresh_token_util import within_rotation_grace
+from app.core import ULID
+from app.users.dtos import UserOutDTO
+from app.users.enums import UserRole
+
+pytestmark = pytest.mark.anyio
+
+GRACE = timedelta(seconds=10)
+
+
+def _context(revoked_at: datetime) -> RefreshContextDTO:
+    return RefreshContextDTO(
+        user=UserOutDTO(
+            id=ULID(str(ulid.new())),
+            fullname="User",
+            email="user@example.com",
+            role=UserRole.USER,
+            hashed_password="x",
+            is_active=True,
+            is_deleted=False,
+            created_at=datetime.now(timezone.utc),
+        ),
+        refresh_token=None,
+        access_revoked=None,
+        refresh_revoked=BlacklistReason.TOKEN_ROTATION,
+        refresh_revoked_at=revoked_at,
+    )
+
+
+async def test_naive_revocation_time_is_read_as_utc():
+    # Rows read back from SQLite are naive
+    revoked_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    assert within_rotation_grace(_context(revoked_at), GRACE)
+    assert not within_rotation_grace(_context(revoked_at - 2 * GRACE), GRACE)
+
+
+async def test_aware_revocation_time_keeps_its_offset():
+    # Five hours ahead of UTC: relabelling it as UTC would put it in the future
+    revoked_at = datetime.now(timezone(timedelta(hours=5)))
+
+    assert within_rotation_grace(_context(revoked_at), GRACE)
+    assert not within_rotation_grace(_context(revoked_at - 2 * GRACE), GRACE)
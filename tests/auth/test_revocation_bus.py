@@ -0,0 +1,370 @@
+import asyncio
+import contextlib
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dtos import BlacklistedTokenDTO
+from app.auth.enums import BlacklistReason
+from app.auth.repositories import BlacklistedTokenRepository
+from app.auth.services.blacklisted_token_service import BlacklistedTokenService
+from app.auth.dtos import RevocationEventDTO
+from app.auth.enums import RevocationEventKind
+from app.auth.services import revocation_bus
+from app.auth.services.revocation_bus import (
+    InMemoryRevocationHub,
+    InMemoryRevocationTransport,
+    RevocationBus,
+    RevocationEventDroppedError,
+    encode_event,
+)
+from app.auth.services.revocation_transports import (
+    RedisRevocationTransport,
+    UnixSocketRevocationTransport,
+    encode_command,
+    read_reply,
+)
+from app.core import ULID
+
+pytestmark = pytest.mark.anyio
+
+# Upper bound for publish-to-applied on one host
+MAX_PROPAGATION_SECONDS = 0.25
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.items: list[ULID] = []
+        self.received = asyncio.Event()
+
+    def __call__(self, item: ULID) -> None:
+        self.items.append(item)
+        self.received.set()
+
+    async def wait(self) -> float:
+        started = time.perf_counter()
+        await asyncio.wait_for(self.received.wait(), MAX_PROPAGATION_SECONDS)
+        return time.perf_counter() - started
+
+
+# Just enough of a Redis server for PUBLISH / SUBSCRIBE
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.__subscribers: set[asyncio.StreamWriter] = set()
+        self.__server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def start(self) -> None:
+        self.__server = await asyncio.start_server(self.__serve, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        for writer in self.__subscribers:
+            writer.close()
+        self.__server.close()
+
+    async def __serve(self, reader, writer) -> None:
+        try:
+            while True:
+                command, *args = await read_reply(reader)
+
+                if command == b"SUBSCRIBE":
+                    self.__subscribers.add(writer)
+                    writer.write(b"*3\r\n$9\r\nsubscribe\r\n")
+                    writer.write(b"$%d\r\n%s\r\n:1\r\n" % (len(args[0]), args[0]))
+                elif command == b"PUBLISH":
+                    channel, message = args
+                    for subscriber in self.__subscribers:
+                        subscriber.write(encode_command("message", channel, message))
+                    writer.write(b":%d\r\n" % len(self.__subscribers))
+                else:
+                    writer.write(b"+OK\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.__subscribers.discard(writer)
+
+
+async def _bus_pair(
+    transport_a, transport_b
+) -> tuple[RevocationBus, RevocationBus, _Recorder, _Recorder]:
+    own, other = _Recorder(), _Recorder()
+    bus_a = RevocationBus(transport_a, revocation_listeners=(own,))
+    bus_b = RevocationBus(transport_b, revocation_listeners=(other,))
+    await bus_a.start()
+    await bus_b.start()
+    return bus_a, bus_b, own, other
+
+
+async def _assert_propagates(bus_a, bus_b, own, other) -> None:
+    jti = str(ulid.new())
+
+    try:
+        bus_a.publish_token(jti, datetime.now(timezone.utc) + timedelta(minutes=5))
+        delay = await other.wait()
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+    assert other.items == [ULID(jti)]
+    assert own.items == []
+    assert delay < MAX_PROPAGATION_SECONDS
+    assert bus_b.received == 1 and bus_b.max_delay < MAX_PROPAGATION_SECONDS
+
+
+async def test_in_memory_bus_propagates_to_other_workers():
+    hub = InMemoryRevocationHub()
+
+    await _assert_propagates(
+        *await _bus_pair(
+            InMemoryRevocationTransport(hub), InMemoryRevocationTransport(hub)
+        )
+    )
+
+
+async def test_unix_socket_bus_propagates_to_other_workers(tmp_path):
+    await _assert_propagates(
+        *await _bus_pair(
+            UnixSocketRevocationTransport(str(tmp_path)),
+            UnixSocketRevocationTransport(str(tmp_path)),
+        )
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_unix_socket_bus_removes_stale_sockets(tmp_path):
+    stale = UnixSocketRevocationTransport(str(tmp_path))
+    await stale.start(lambda message: None)
+    # A worker that died without cleaning up
+    stale_path = next(tmp_path.iterdir())
+    await stale.stop()
+    stale_path.touch()
+
+    transport = UnixSocketRevocationTransport(str(tmp_path))
+    await transport.start(lambda message: None)
+    await transport.send(b"{}")
+    remaining = list(tmp_path.iterdir())
+    await transport.stop()
+
+    assert stale_path not in remaining and len(remaining) == 1
+
+
+async def test_redis_bus_propagates_through_a_redis_protocol_server():
+    server = _FakeRedis()
+    await server.start()
+
+    try:
+        await _assert_propagates(
+            *await _bus_pair(
+                RedisRevocationTransport(server.url, "revocations"),
+                RedisRevocationTransport(server.url, "revocations"),
+            )
+        )
+    finally:
+        await server.stop()
+
+
+# Accepts connections and answers every command with `reply`, or never
+async def _scripted_server(reply: bytes | None, connections: list) -> asyncio.Server:
+    async def serve(reader, writer) -> None:
+        connections.append(writer)
+        with contextlib.suppress(asyncio.IncompleteReadError, ConnectionError):
+            while True:
+                await read_reply(reader)
+                if reply is not None:
+                    writer.write(reply)
+
+    return await asyncio.start_server(serve, "127.0.0.1", 0)
+
+
+def _url(server: asyncio.Server) -> str:
+    host, port = server.sockets[0].getsockname()[:2]
+    return f"redis://{host}:{port}/0"
+
+
+async def test_redis_publish_to_a_stalled_server_times_out_and_reconnects():
+    connections = []
+    server = await _scripted_server(None, connections)
+    transport = RedisRevocationTransport(
+        _url(server), "revocations", connect_timeout_seconds=0.05
+    )
+
+    try:
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.send(b"event")
+    finally:
+        await transport.stop()
+        server.close()
+
+    # The stalled connection is dropped rather than reused
+    assert len(connections) == 2
+
+
+async def test_redis_subscription_survives_malformed_replies():
+    connections = []
+    server = await _scripted_server(b":not-a-number\r\n", connections)
+    transport = RedisRevocationTransport(
+        _url(server),
+        "revocations",
+        reconnect_seconds=0.01,
+        connect_timeout_seconds=0.05,
+    )
+
+    try:
+        await transport.start(lambda message: None)
+        for _ in range(100):
+            if len(connections) >= 3:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await transport.stop()
+        server.close()
+
+    assert len(connections) >= 3
+
+
+async def test_bus_user_events_and_malformed_messages():
+    hub = InMemoryRevocationHub()
+    tokens, users = _Recorder(), _Recorder()
+    sender = RevocationBus(InMemoryRevocationTransport(hub))
+    receiver = RevocationBus(
+        InMemoryRevocationTransport(hub),
+        revocation_listeners=(tokens,),
+        user_revocation_listeners=(users,),
+    )
+    await sender.start()
+    await receiver.start()
+
+    user_id = str(ulid.new())
+    try:
+        hub.broadcast(b"not json")
+        sender.publish_user(user_id)
+        await users.wait()
+    finally:
+        await sender.stop()
+        await receiver.stop()
+
+    assert users.items == [ULID(user_id)]
+    assert tokens.items == []
+    assert sender.published == 1 and receiver.received == 1
+
+
+async def test_bus_reports_gaps_in_a_senders_sequence():
+    hub = InMemoryRevocationHub()
+    tokens, losses = _Recorder(), []
+    receiver = RevocationBus(
+        InMemoryRevocationTransport(hub),
+        revocation_listeners=(tokens,),
+        loss_listeners=(lambda: losses.append(1),),
+    )
+    await receiver.start()
+
+    def event(sequence: int) -> bytes:
+        return encode_event(
+            RevocationEventDTO(
+                kind=RevocationEventKind.TOKEN,
+                subject=str(ulid.new()),
+                origin="other",
+                sent_at=time.time(),
+                sequence=sequence,
+            )
+        )
+
+    try:
+        for sequence in (1, 2, 5):
+            tokens.received.clear()
+            hub.broadcast(event(sequence))
+            await tokens.wait()
+    finally:
+        await receiver.stop()
+
+    assert len(tokens.items) == 3
+    assert receiver.missed == 2 and losses == [1]
+
+
+async def test_bus_dropped_event_reaches_other_workers_as_a_loss(monkeypatch):
+    monkeypatch.setattr(revocation_bus, "_SYNC_DELAY_SECONDS", 0.01)
+    hub = InMemoryRevocationHub()
+    tokens, lost = _Recorder(), asyncio.Event()
+    sender = RevocationBus(InMemoryRevocationTransport(hub), queue_size=1)
+    receiver = RevocationBus(
+        InMemoryRevocationTransport(hub),
+        revocation_listeners=(tokens,),
+        loss_listeners=(lost.set,),
+    )
+    await sender.start()
+    await receiver.start()
+
+    try:
+        # The second one does not fit in the queue, and nothing follows it
+        sender.publish_token(str(ulid.new()), None)
+        sender.publish_token(str(ulid.new()), None)
+        await tokens.wait()
+        await asyncio.wait_for(lost.wait(), MAX_PROPAGATION_SECONDS)
+    finally:
+        await sender.stop()
+        await receiver.stop()
+
+    assert sender.published == 1 and sender.dropped == 1
+    assert receiver.received == 1 and receiver.missed == 1
+
+
+async def test_unix_socket_send_reports_peers_not_reading(tmp_path):
+    sender = UnixSocketRevocationTransport(str(tmp_path))
+    await sender.start(lambda message: None)
+    # A worker that stopped reading its socket
+    stuck = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stuck.bind(str(tmp_path / "stuck.sock"))
+
+    try:
+        with pytest.raises(RevocationEventDroppedError):
+            for _ in range(10_000):
+                await sender.send(b"x" * 1024)
+    finally:
+        await sender.stop()
+        stuck.close()
+
+
+async def test_bus_publish_before_start_is_a_no_op():
+    bus = RevocationBus(InMemoryRevocationTransport(InMemoryRevocationHub()))
+
+    bus.publish_token(str(ulid.new()), None)
+
+    assert bus.published == 0 and bus.dropped == 0
+
+
+async def test_blacklisting_publishes_to_other_workers(db_session: AsyncSession):
+    hub = InMemoryRevocationHub()
+    other = _Recorder()
+    publisher = RevocationBus(InMemoryRevocationTransport(hub))
+    subscriber = RevocationBus(
+        InMemoryRevocationTransport(hub), revocation_listeners=(other,)
+    )
+    await publisher.start()
+    await subscriber.start()
+
+    jti = ULID(str(ulid.new()))
+    service = BlacklistedTokenService(
+        BlacklistedTokenRepository(db_session), revocation_bus=publisher
+    )
+    try:
+        await service.add_token(
+            BlacklistedTokenDTO(
+                jti=jti,
+                reason=BlacklistReason.LOGOUT,
+                blacklisted_at=datetime.now(timezone.utc),
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
+            )
+        )
+        await other.wait()
+    finally:
+        await publisher.stop()
+        await subscriber.stop()
+
+    assert other.items == [jti]
@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+
+import pytest
+import ulid
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.enums import BlacklistReason
+from app.auth.exceptions.token_exceptions import BlacklistedTokenNotFoundError
+from app.auth.models import BlacklistedToken
+from app.auth.repositories import BlacklistedTokenRepository
+from app.auth.services.blacklisted_token_service import BlacklistedTokenService
+from app.auth.services.revocation_cache import (
+    BloomFilter,
+    RevocationCache,
+    RevocationCacheSyncer,
+)
+from app.container import build_container
+from app.core import ULID, config
+from app.core.enums import RevocationBusTransportType
+from app.db.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+def _cache(**overrides) -> RevocationCache:
+    options = {"fp_rate": 0.01, "min_capacity": 1000, "headroom": 1.5}
+    options.update(overrides)
+    return RevocationCache(**options)
+
+
+async def test_bloom_filter_has_no_false_negatives_and_bounded_fp_rate():
+    bloom = BloomFilter(capacity=10_000, fp_rate=0.01)
+    members = [str(ulid.new()) for _ in range(10_000)]
+
+    for member in members:
+        bloom.add(member)
+
+    false_positives = sum(str(ulid.new()) in bloom for _ in range(10_000))
+
+    assert all(member in bloom for member in members)
+    assert false_positives / 10_000 < 0.02
+    assert bloom.estimated_fp_rate() == pytest.approx(0.01, rel=0.2)
+
+
+async def test_bloom_filter_memory_cap():
+    capped = BloomFilter(capacity=100_000, fp_rate=0.001, max_bytes=1024)
+
+    for _ in range(1000):
+        capped.add(str(ulid.new()))
+
+    assert capped.memory_bytes == 1024
+    assert capped.estimated_fp_rate() > 0.001
+
+
+async def test_revocation_filter_needs_a_revocation_bus(monkeypatch):
+    monkeypatch.setattr(
+        config, "REVOCATION_BUS_TRANSPORT", RevocationBusTransportType.NONE
+    )
+    assert build_container().revocation_cache is None
+
+    monkeypatch.setattr(
+        config, "REVOCATION_BUS_TRANSPORT", RevocationBusTransportType.MEMORY
+    )
+    assert build_container().revocation_cache is not None
+
+
+async def test_revocation_cache_says_maybe_until_built():
+    cache = _cache()
+
+    assert not cache.ready
+    assert cache.might_be_revoked(str(ulid.new()))
+
+
+async def test_revocation_cache_tracks_recent_revocations():
+    cache = _cache()
+    revoked, during_rebuild = str(ulid.new()), str(ulid.new())
+
+    bloom = cache.begin_rebuild(0)
+    cache.add(during_rebuild)
+    cache.finish_rebuild(bloom)
+    cache.add(revoked)
+
+    assert cache.might_be_revoked(revoked)
+    assert cache.might_be_revoked(during_rebuild)
+    assert not cache.might_be_revoked(str(ulid.new()))
+
+    stats = cache.stats()
+    assert stats.ready and stats.recent_entries == 2
+    assert stats.capacity == 1000 and stats.db_lookups_skipped == 1
+
+
+async def test_stale_revocation_cache_says_maybe_until_rebuilt():
+    cache = _cache()
+    cache.finish_rebuild(cache.begin_rebuild(0))
+    jti = str(ulid.new())
+
+    cache.mark_stale()
+    assert cache.stats().stale and cache.needs_rebuild
+    assert cache.might_be_revoked(jti)
+
+    # Marked again while the rebuild was reading: still stale afterwards
+    bloom = cache.begin_rebuild(0)
+    cache.mark_stale()
+    cache.finish_rebuild(bloom)
+    assert cache.might_be_revoked(jti)
+
+    cache.finish_rebuild(cache.begin_rebuild(0))
+    assert not cache.stats().stale and not cache.needs_rebuild
+    assert not cache.might_be_revoked(jti)
+
+
+async def test_revocation_cache_needs_rebuild_when_recent_set_overflows():
+    cache = _cache(recent_max_entries=1)
+    cache.finish_rebuild(cache.begin_rebuild(0))
+
+    cache.add(str(ulid.new()))
+    assert not cache.needs_rebuild
+
+    cache.add(str(ulid.new()))
+    assert cache.needs_rebuild
+
+
+async def test_rebuild_from_table_skips_queries_for_unrevoked_jtis(
+    db_session: AsyncSession, count_statements
+):
+    revoked = ulid.new()
+    await db_session.execute(
+        insert(BlacklistedToken).values(
+            jti=revoked,
+            reason=BlacklistReason.LOGOUT,
+            blacklisted_at=datetime.now(timezone.utc),
+        )
+    )
+    await db_session.commit()
+
+    cache = _cache()
+    await RevocationCacheSyncer(cache, AsyncSessionLocal, 60).rebuild()
+    service = BlacklistedTokenService(
+        BlacklistedTokenRepository(db_session), revocation_cache=cache
+    )
+
+    with count_statements() as recorded:
+        with pytest.raises(BlacklistedTokenNotFoundError):
+            await service.get_by_jti(ULID(str(ulid.new())))
+        unrevoked_queries = len(recorded.statements)
+
+        found = await service.get_by_jti(ULID(str(revoked)))
+
+    assert unrevoked_queries == 0
+    assert len(recorded.statements) == 1
+    assert found.reason == BlacklistReason.LOGOUT
+    assert cache.stats().loaded_entries >= 1
@@ -0,0 +1,111 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+
+from app.auth.dtos import RefreshTokenDTO
+from app.auth.services.rotation_policy import (
+    AlwaysRotation,
+    IdleRotation,
+    ProbabilisticRotation,
+    WindowRotation,
+    build_rotation_policy,
+)
+from app.core import ULID
+from app.core.enums import RefreshRotationPolicyType
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+WINDOW = timedelta(days=2)
+
+
+def _token(
+    expires_in: timedelta,
+    created_ago: timedelta = timedelta(hours=1),
+    last_used_ago: timedelta | None = None,
+) -> RefreshTokenDTO:
+    jti = ULID(str(ulid.new()))
+    # Rows read back from SQLite are naive
+    return RefreshTokenDTO(
+        jti=jti,
+        user_id=ULID(str(ulid.new())),
+        hashed_token="x",
+        ip_address="127.0.0.1",
+        created_at=(NOW - created_ago).replace(tzinfo=None),
+        expires_at=(NOW + expires_in).replace(tzinfo=None),
+        family_id=jti,
+        last_used_at=(
+            (NOW - last_used_ago).replace(tzinfo=None)
+            if last_used_ago is not None
+            else None
+        ),
+    )
+
+
+async def test_always_rotates():
+    assert AlwaysRotation().should_rotate(_token(timedelta(days=7)), NOW)
+
+
+async def test_window_rotates_only_near_expiry():
+    policy = WindowRotation(WINDOW)
+
+    assert not policy.should_rotate(_token(timedelta(days=3)), NOW)
+    assert policy.should_rotate(_token(timedelta(days=1)), NOW)
+
+
+async def test_window_converts_aware_expiry_to_utc():
+    policy = WindowRotation(WINDOW)
+    token = _token(timedelta(days=3))
+    # Outside the window, but read as UTC its wall time would fall inside it
+    expires_at = (NOW + WINDOW + timedelta(hours=3)).astimezone(
+        timezone(timedelta(hours=-5))
+    )
+
+    assert not policy.should_rotate(replace(token, expires_at=expires_at), NOW)
+    assert policy.should_rotate(
+        replace(token, expires_at=expires_at - timedelta(hours=6)), NOW
+    )
+
+
+async def test_probabilistic_rotates_by_chance_or_near_expiry():
+    lucky = ProbabilisticRotation(WINDOW, 0.1, rng=lambda: 0.05)
+    unlucky = ProbabilisticRotation(WINDOW, 0.1, rng=lambda: 0.5)
+
+    assert lucky.should_rotate(_token(timedelta(days=7)), NOW)
+    assert not unlucky.should_rotate(_token(timedelta(days=7)), NOW)
+    assert unlucky.should_rotate(_token(timedelta(days=1)), NOW)
+
+
+async def test_idle_rotates_after_a_long_gap_since_last_use():
+    policy = IdleRotation(WINDOW, idle=timedelta(hours=12))
+
+    assert policy.tracks_last_use
+    assert not policy.should_rotate(_token(timedelta(days=7)), NOW)
+    assert policy.should_rotate(
+        _token(timedelta(days=7), created_ago=timedelta(days=1)), NOW
+    )
+    assert not policy.should_rotate(
+        _token(
+            timedelta(days=7),
+            created_ago=timedelta(days=1),
+            last_used_ago=timedelta(hours=1),
+        ),
+        NOW,
+    )
+    assert policy.should_rotate(_token(timedelta(days=1)), NOW)
+
+
+async def test_build_rotation_policy_from_config_values():
+    def build(policy_type):
+        return build_rotation_policy(
+            policy_type, window_seconds=60, probability=0.1, idle_seconds=60
+        )
+
+    assert isinstance(build(RefreshRotationPolicyType.ALWAYS), AlwaysRotation)
+    assert type(build(RefreshRotationPolicyType.WINDOW)) is WindowRotation
+    assert isinstance(
+        build(RefreshRotationPolicyType.PROBABILISTIC), ProbabilisticRotation
+    )
+    assert isinstance(build(RefreshRotationPolicyType.IDLE), IdleRotation)
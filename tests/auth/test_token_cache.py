@@ -0,0 +1,132 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from app.auth.dtos import JWTAccessTokenDTO
+from app.auth.enums import TokenType
+from app.auth.exceptions.token_exceptions import (
+    JWTTokenCredentialsInvalidError,
+    JWTTokenInvalidError,
+)
+from app.auth.services.jwt_service import JWTService
+from app.auth.services.token_cache import VerifiedTokenCache
+
+pytestmark = pytest.mark.anyio
+
+
+def _cache(**overrides) -> VerifiedTokenCache:
+    options = dict(
+        max_entries=100,
+        max_bytes=1024 * 1024,
+        negative_max_entries=10,
+        negative_ttl_seconds=60,
+    )
+    options.update(overrides)
+    return VerifiedTokenCache(**options)
+
+
+def _service(cache: VerifiedTokenCache | None) -> JWTService:
+    return JWTService(
+        secret_key="email-secret",
+        secret_key_access="access-secret",
+        secret_key_refresh="refresh-secret",
+        algorithm="HS256",
+        access_expire=15,
+        refresh_expire=7,
+        email_verification_expire=30,
+        cache=cache,
+    )
+
+
+def _dto(jti: str, expires_in: timedelta = timedelta(minutes=5)) -> JWTAccessTokenDTO:
+    now = datetime.now(timezone.utc)
+    return JWTAccessTokenDTO(
+        sub="01JXUSER",
+        jti=jti,
+        exp=now + expires_in,
+        iat=now,
+        type=TokenType.ACCESS_TOKEN,
+    )
+
+
+async def test_decode_is_served_from_cache():
+    cache = _cache()
+    service = _service(cache)
+    token = await service.encode_token("01JXUSER", TokenType.ACCESS_TOKEN)
+
+    first = await service.decode_token(token, TokenType.ACCESS_TOKEN)
+    second = await service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+    assert first == second
+    assert first is not second
+    stats = service.cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+async def test_cache_is_keyed_by_token_type():
+    service = _service(_cache())
+    token = await service.encode_token("01JXUSER", TokenType.ACCESS_TOKEN)
+    await service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+    # Different key per type, so the cached access token does not leak over
+    with pytest.raises(JWTTokenCredentialsInvalidError):
+        await service.decode_token(token, TokenType.EMAIL_TOKEN)
+
+
+async def test_caller_checks_apply_to_cached_tokens():
+    service = _service(_cache())
+    token = await service.encode_token("", TokenType.ACCESS_TOKEN)
+    await service.decode_token(token, TokenType.ACCESS_TOKEN, verify_sub=False)
+
+    with pytest.raises(JWTTokenInvalidError):
+        await service.decode_token(token, TokenType.ACCESS_TOKEN)
+
+
+async def test_garbage_tokens_are_negatively_cached():
+    service = _service(_cache())
+
+    for _ in range(3):
+        with pytest.raises(JWTTokenCredentialsInvalidError):
+            await service.decode_token("not.a.token", TokenType.ACCESS_TOKEN)
+
+    stats = service.cache_stats()
+    assert stats.negative_entries == 1
+    assert stats.negative_hits == 2
+
+
+async def test_entries_never_outlive_exp():
+    cache = _cache()
+    key = cache.key("token", TokenType.ACCESS_TOKEN)
+
+    cache.put(key, _dto("expired", expires_in=timedelta(seconds=-1)))
+    assert cache.get(key) is None
+    assert cache.stats().entries == 0
+
+
+async def test_entry_count_bound_evicts_least_recently_used():
+    cache = _cache(max_entries=2)
+    keys = [cache.key(f"token-{i}", TokenType.ACCESS_TOKEN) for i in range(3)]
+
+    cache.put(keys[0], _dto("a"))
+    cache.put(keys[1], _dto("b"))
+    cache.get(keys[0])
+    cache.put(keys[2], _dto("c"))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).jti == "a"
+    assert cache.stats().evictions == 1
+
+
+async def test_byte_bound():
+    cache = _cache(max_bytes=2000)
+
+    for i in range(50):
+        cache.put(cache.key(f"token-{i}", TokenType.ACCESS_TOKEN), _dto(str(i)))
+
+    stats = cache.stats()
+    assert stats.bytes <= 2000
+    assert 0 < stats.entries < 50
+
+
+async def test_disabled_cache_reports_no_stats():
+    assert _service(None).cache_stats() is None
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.enums import BlacklistReason
+from app.auth.models import BlacklistedToken, RefreshToken
+from app.auth.services.token_purger import ExpiredTokenPurger
+from app.db.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+def _purger(**overrides) -> ExpiredTokenPurger:
+    options = {
+        "session_factory": AsyncSessionLocal,
+        "interval_seconds": 60,
+        "batch_size": 2,
+        "batch_pause_seconds": 0,
+        "grace": timedelta(0),
+        "legacy_max_age": timedelta(days=365),
+    }
+    options.update(overrides)
+    return ExpiredTokenPurger(**options)
+
+
+async def _blacklist(
+    db: AsyncSession, expires_at: datetime | None, blacklisted_at: datetime
+) -> str:
+    jti = str(ulid.new())
+    await db.execute(
+        insert(BlacklistedToken).values(
+            jti=jti,
+            reason=BlacklistReason.LOGOUT,
+            blacklisted_at=blacklisted_at,
+            expires_at=expires_at,
+        )
+    )
+    return jti
+
+
+async def _refresh_token(db: AsyncSession, expires_at: datetime) -> str:
+    jti = str(ulid.new())
+    await db.execute(
+        insert(RefreshToken).values(
+            jti=jti,
+            user_id=str(ulid.new()),
+            family_id=jti,
+            hashed_token="x",
+            ip_address="127.0.0.1",
+            expires_at=expires_at,
+        )
+    )
+    return jti
+
+
+async def _remaining(db: AsyncSession, model, jtis: list[str]) -> set[str]:
+    result = await db.execute(select(model.jti).where(model.jti.in_(jtis)))
+    return {str(jti) for jti in result.scalars()}
+
+
+async def test_purge_deletes_only_expired_blacklist_rows(db_session: AsyncSession):
+    now = datetime.now(timezone.utc)
+    expired = [
+        await _blacklist(db_session, now - timedelta(minutes=i + 1), now)
+        for i in range(5)
+    ]
+    live = await _blacklist(db_session, now + timedelta(minutes=15), now)
+    legacy_old = await _blacklist(db_session, None, now - timedelta(days=400))
+    legacy_recent = await _blacklist(db_session, None, now)
+    await db_session.commit()
+
+    blacklisted, _ = await _purger().purge()
+
+    remaining = await _remaining(
+        db_session, BlacklistedToken, [*expired, live, legacy_old, legacy_recent]
+    )
+    assert blacklisted >= 6
+    assert remaining == {live, legacy_recent}
+
+
+async def test_purge_deletes_expired_refresh_tokens(db_session: AsyncSession):
+    now = datetime.now(timezone.utc)
+    expired = [
+        await _refresh_token(db_session, now - timedelta(days=1)) for _ in range(3)
+    ]
+    live = await _refresh_token(db_session, now + timedelta(days=7))
+    await db_session.commit()
+
+    _, refresh = await _purger().purge()
+
+    assert refresh >= 3
+    assert await _remaining(db_session, RefreshToken, [*expired, live]) == {live}
+
+
+async def test_purge_grace_keeps_recently_expired_rows(db_session: AsyncSession):
+    now = datetime.now(timezone.utc)
+    just_expired = await _blacklist(db_session, now - timedelta(seconds=10), now)
+    await db_session.commit()
+
+    await _purger(grace=timedelta(minutes=5)).purge()
+
+    remaining = await _remaining(db_session, BlacklistedToken, [just_expired])
+    assert remaining == {just_expired}
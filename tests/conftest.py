@@ -1,20 +1,24 @@
+import base64
+import contextlib
 import os
-from dataclasses import asdict
+from dataclasses import asdict, dataclass, field
 
 import pytest
 from faker.proxy import Faker
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import select
+from sqlalchemy import event, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .dtos import AuthLoginOutDTO, UserRegisterDTO
 
 os.environ["APP_ENV"] = "test"
 
+from app.core import config
 from app.core.configs.factory import get_config, ConfigTest
 from app.db.database import async_engine, AsyncSessionLocal, Base
 from app.db.dependencies import get_db
 from app.main import app
+from app.users.enums import UserRole
 from app.users.models import User
 
 faker = Faker()
@@ -63,6 +67,40 @@ async def db_session():
         yield session
 
 
+@dataclass
+class RecordedStatements:
+    statements: list[str] = field(default_factory=list)
+    commits: int = 0
+
+
+# Records the SQL statements and commits issued inside the block:
+#     with count_statements() as recorded:
+#         ...
+#     assert len(recorded.statements) == 1
+@pytest.fixture
+def count_statements():
+    @contextlib.contextmanager
+    def record():
+        recorded = RecordedStatements()
+        engine = async_engine.sync_engine
+
+        def on_execute(conn, cursor, statement, *args):
+            recorded.statements.append(statement)
+
+        def on_commit(conn):
+            recorded.commits += 1
+
+        event.listen(engine, "before_cursor_execute", on_execute)
+        event.listen(engine, "commit", on_commit)
+        try:
+            yield recorded
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+            event.remove(engine, "commit", on_commit)
+
+    return record
+
+
 @pytest.fixture
 async def get_refresh_token_from_headers():
     async def _get_refresh_token(headers) -> str | None:
@@ -163,6 +201,33 @@ async def token_header(login_token: AuthLoginOutDTO) -> dict[str, str]:
     return {"Authorization": f"Bearer {login_token.access_token}"}
 
 
+# Bearer header of a freshly registered admin, for operator-only routes
+@pytest.fixture
+async def admin_header(
+    async_client: AsyncClient, new_random_user: UserRegisterDTO, db_session
+) -> dict[str, str]:
+    await register_user(async_client, new_random_user)
+    await db_session.execute(
+        update(User)
+        .where(User.email == new_random_user.email.lower())
+        .values(role=UserRole.ADMIN)
+    )
+    await db_session.commit()
+
+    response = await login_user(async_client, new_random_user)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+# HTTP Basic credentials of a client allowed to call /auth/introspect
+@pytest.fixture
+async def client_auth_header(monkeypatch) -> dict[str, str]:
+    monkeypatch.setattr(
+        config, "AUTH_INTROSPECTION_CLIENTS", {"gateway": "gateway-secret"}
+    )
+    credentials = base64.b64encode(b"gateway:gateway-secret").decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
 @pytest.fixture
 async def settings() -> ConfigTest:
     return get_config()
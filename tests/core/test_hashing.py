@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import Argon2Hasher, HashPriority
+from app.core import hashing
+from app.core.admission import HashingAdmissionController
+from app.core.calibration import Argon2Parameters, calibrate_argon2_parameters
+from app.core.enums import HashingExecutorType
+from app.core.exceptions import HashingOverloadedError
+from app.core.executors import HashingExecutor
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=[HashingExecutorType.THREAD, HashingExecutorType.PROCESS])
+def executor(request):
+    executor = HashingExecutor(request.param, max_workers=2)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+async def test_hash_and_verify_on_executor(executor: HashingExecutor):
+    hasher = Argon2Hasher(time_cost=1, memory_cost=8 * 1024, executor=executor)
+    hashed = await hasher.hash("Test1234!")
+
+    assert await hasher.verify("Test1234!", hashed)
+    assert not await hasher.verify("wrong-password", hashed)
+    assert not await hasher.verify("Test1234!", "not-a-hash")
+
+
+async def test_hashing_runs_off_the_event_loop(mocker):
+    executor = HashingExecutor(HashingExecutorType.THREAD, max_workers=1)
+    executor.start()
+    hasher = Argon2Hasher(time_cost=1, memory_cost=8 * 1024, executor=executor)
+    loop_thread = threading.get_ident()
+    threads = []
+    original_hash = hashing._hash
+
+    def spy(*args):
+        threads.append(threading.get_ident())
+        return original_hash(*args)
+
+    mocker.patch.object(hashing, "_hash", spy)
+
+    try:
+        await hasher.hash("Test1234!")
+    finally:
+        executor.shutdown()
+
+    assert threads and loop_thread not in threads
+
+
+async def test_admission_prioritises_login_and_sheds_load():
+    controller = HashingAdmissionController(
+        memory_budget_bytes=100,
+        max_queue=2,
+        max_wait_seconds=1,
+        retry_after_seconds=3,
+    )
+    order = []
+    release = asyncio.Event()
+
+    async def job(name: str, priority: HashPriority):
+        async with controller.admit(100, priority):
+            order.append(name)
+            await release.wait()
+
+    running = asyncio.create_task(job("running", HashPriority.SIGNUP))
+    await asyncio.sleep(0)
+    signup = asyncio.create_task(job("signup", HashPriority.SIGNUP))
+    await asyncio.sleep(0)
+    login = asyncio.create_task(job("login", HashPriority.LOGIN))
+    await asyncio.sleep(0)
+
+    assert controller.stats().queue_depth == 2
+
+    with pytest.raises(HashingOverloadedError) as exc_info:
+        async with controller.admit(100, HashPriority.LOGIN):
+            pass
+
+    assert exc_info.value.retry_after == 3
+
+    release.set()
+    await asyncio.gather(running, signup, login)
+
+    assert order == ["running", "login", "signup"]
+    assert controller.stats().rejected == 1
+    assert controller.stats().in_flight_bytes == 0
+
+
+async def test_admission_rejects_after_max_wait():
+    controller = HashingAdmissionController(
+        memory_budget_bytes=100,
+        max_queue=10,
+        max_wait_seconds=0.05,
+        retry_after_seconds=1,
+    )
+
+    async with controller.admit(100, HashPriority.SIGNUP):
+        with pytest.raises(HashingOverloadedError):
+            async with controller.admit(100, HashPriority.LOGIN):
+                pass
+
+    assert controller.stats().queue_depth == 0
+    assert controller.stats().in_flight_bytes == 0
+
+
+def test_calibration_respects_floor_and_target():
+    floor = calibrate_argon2_parameters(
+        target_latency_ms=0,
+        min_time_cost=1,
+        max_time_cost=10,
+        min_memory_cost=8 * 1024,
+        max_memory_cost=64 * 1024,
+        parallelism=1,
+    )
+    assert floor == Argon2Parameters(1, 8 * 1024, 1)
+
+    calibrated = calibrate_argon2_parameters(
+        target_latency_ms=10_000,
+        min_time_cost=1,
+        max_time_cost=2,
+        min_memory_cost=8 * 1024,
+        max_memory_cost=16 * 1024,
+        parallelism=1,
+    )
+    assert calibrated == Argon2Parameters(2, 16 * 1024, 1)
+
+
+async def test_needs_rehash_only_upgrades():
+    weak = Argon2Hasher(time_cost=1, memory_cost=8 * 1024)
+    strong = Argon2Hasher(time_cost=2, memory_cost=16 * 1024)
+
+    assert await strong.needs_rehash(await weak.hash("Test1234!"))
+    assert not await weak.needs_rehash(await strong.hash("Test1234!"))
+    assert not await strong.needs_rehash("not-a-hash")
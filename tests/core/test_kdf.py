@@ -0,0 +1,87 @@
+import pytest
+
+from app.core import KDFHasher, kdf
+from app.core.kdf import KDFRegistry, Argon2Backend, ScryptBackend, BcryptBackend
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "Test1234!"
+
+# bcrypt is an optional extra
+requires_bcrypt = pytest.mark.skipif(
+    kdf.bcrypt is None, reason="the optional 'bcrypt' package is not installed"
+)
+
+
+@pytest.fixture
+def registry() -> KDFRegistry:
+    registry = KDFRegistry(Argon2Backend(time_cost=2, memory_cost=16 * 1024))
+    registry.register(ScryptBackend(log_n=10, r=8, p=1))
+    if kdf.bcrypt is not None:
+        registry.register(BcryptBackend(rounds=4))
+    return registry
+
+
+# Backends are built inside the test, so a missing extra only skips its case
+@pytest.mark.parametrize(
+    "make_backend",
+    [
+        pytest.param(
+            lambda: Argon2Backend(time_cost=1, memory_cost=8 * 1024, parallelism=1),
+            id="argon2id",
+        ),
+        pytest.param(lambda: ScryptBackend(log_n=10, r=8, p=1), id="scrypt"),
+        pytest.param(
+            lambda: BcryptBackend(rounds=4), id="bcrypt", marks=requires_bcrypt
+        ),
+    ],
+)
+async def test_verify_dispatches_on_phc_prefix(registry, make_backend):
+    hasher = KDFHasher(registry)
+    backend = make_backend()
+    hashed = backend.hash(PASSWORD)
+
+    assert registry.backend_for(hashed).kdf_type == backend.kdf_type
+    assert await hasher.verify(PASSWORD, hashed)
+    assert not await hasher.verify("wrong-password", hashed)
+
+
+async def test_hash_uses_default_backend(registry):
+    hashed = await KDFHasher(registry).hash(PASSWORD)
+
+    assert hashed.startswith("$argon2id$")
+
+
+async def test_non_default_and_weaker_hashes_need_rehash(registry):
+    hasher = KDFHasher(registry)
+
+    assert await hasher.needs_rehash(ScryptBackend(log_n=10).hash(PASSWORD))
+    assert await hasher.needs_rehash(
+        Argon2Backend(time_cost=1, memory_cost=8 * 1024).hash(PASSWORD)
+    )
+    assert not await hasher.needs_rehash(await hasher.hash(PASSWORD))
+
+
+@requires_bcrypt
+async def test_bcrypt_hashes_need_rehash(registry):
+    hasher = KDFHasher(registry)
+
+    assert await hasher.needs_rehash(BcryptBackend(rounds=4).hash(PASSWORD))
+
+
+async def test_unknown_hash_format_is_rejected(registry):
+    hasher = KDFHasher(registry)
+
+    assert registry.backend_for("$pbkdf2-sha256$29000$abc$def") is None
+    assert not await hasher.verify(PASSWORD, "$pbkdf2-sha256$29000$abc$def")
+    assert not await hasher.verify(PASSWORD, "plain-text")
+    assert not await hasher.needs_rehash("plain-text")
+
+
+def test_memory_cost_is_read_from_the_hash():
+    argon2 = Argon2Backend(time_cost=1, memory_cost=8 * 1024)
+    scrypt = ScryptBackend(log_n=10, r=8)
+
+    assert argon2.memory_cost_bytes() == 8 * 1024 * 1024
+    assert Argon2Backend().memory_cost_bytes(argon2.hash(PASSWORD)) == 8 * 1024**2
+    assert ScryptBackend().memory_cost_bytes(scrypt.hash(PASSWORD)) == 128 * 8 * 1024
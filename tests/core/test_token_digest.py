@@ -0,0 +1,38 @@
+import pytest
+
+from app.core import Argon2Hasher
+from app.core.token_digest import HMACTokenDigest, Argon2TokenDigest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def legacy_digest() -> Argon2TokenDigest:
+    return Argon2TokenDigest(Argon2Hasher(time_cost=1, memory_cost=8 * 1024))
+
+
+async def test_hmac_digest_round_trip():
+    digest = HMACTokenDigest("pepper")
+    stored = await digest.digest("header.payload.signature")
+
+    assert stored.startswith("$hmac-sha256$")
+    assert len(stored) <= 110
+    assert await digest.verify("header.payload.signature", stored)
+    assert not await digest.verify("header.payload.other", stored)
+    assert not digest.needs_update(stored)
+
+
+async def test_hmac_digest_depends_on_pepper():
+    stored = await HMACTokenDigest("pepper").digest("token")
+
+    assert not await HMACTokenDigest("other-pepper").verify("token", stored)
+
+
+async def test_hmac_digest_verifies_legacy_argon2_rows(legacy_digest):
+    stored = await legacy_digest.digest("token")
+    digest = HMACTokenDigest("pepper", legacy=legacy_digest)
+
+    assert await digest.verify("token", stored)
+    assert not await digest.verify("other", stored)
+    assert digest.needs_update(stored)
+    assert not await HMACTokenDigest("pepper").verify("token", stored)
@@ -0,0 +1,187 @@
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+
+from app.auth.constants import auth_constants
+from app.auth.services.introspection_cache import IntrospectionCache
+from app.auth.dtos import TokenIntrospectionDTO
+from app.core import config
+from app.main import app
+from tests.dtos import AuthLoginOutDTO
+from tests.routers.auth import auth_base_url
+
+pytestmark = pytest.mark.anyio
+base_url = f"{auth_base_url}/introspect"
+
+
+async def test_introspect_active_access_token(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, client_auth_header: dict
+):
+    claims = jwt.get_unverified_claims(login_token.access_token)
+
+    response = await async_client.post(
+        base_url, data={"token": login_token.access_token}, headers=client_auth_header
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "active": True,
+        "sub": claims["sub"],
+        "jti": claims["jti"],
+        "exp": claims["exp"],
+        "iat": claims["iat"],
+        "token_type": "access_token",
+        "role": "user",
+    }
+
+
+async def test_introspect_refresh_token_without_hint(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, client_auth_header: dict
+):
+    response = await async_client.post(
+        base_url, data={"token": login_token.refresh_token}, headers=client_auth_header
+    )
+    data = response.json()
+
+    assert data["active"] is True
+    assert data["token_type"] == "refresh_token"
+
+
+async def test_introspect_inactive_token(
+    async_client: AsyncClient, client_auth_header: dict
+):
+    response = await async_client.post(
+        base_url,
+        data={"token": "test.fake.token", "token_type_hint": "unknown"},
+        headers=client_auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"active": False}
+
+
+async def test_introspect_requires_token(
+    async_client: AsyncClient, client_auth_header: dict
+):
+    response = await async_client.post(base_url, data={}, headers=client_auth_header)
+
+    assert response.status_code == 422
+
+
+async def test_introspect_requires_client_authentication(
+    async_client: AsyncClient,
+    login_token: AuthLoginOutDTO,
+    token_header: dict,
+    client_auth_header: dict,
+):
+    data = {"token": login_token.access_token}
+
+    anonymous = await async_client.post(base_url, data=data)
+    wrong_secret = await async_client.post(
+        base_url, data=data, auth=("gateway", "not-the-secret")
+    )
+    # A user's access token is not a client credential
+    user_token = await async_client.post(base_url, data=data, headers=token_header)
+
+    for response in (anonymous, wrong_secret, user_token):
+        assert response.status_code == 401
+        assert response.json()["detail"] == auth_constants.ERR_CLIENT_UNAUTHORIZED
+        assert response.headers["www-authenticate"] == "Basic"
+
+
+async def test_introspect_accepts_client_bearer_token(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, monkeypatch
+):
+    monkeypatch.setattr(config, "AUTH_INTROSPECTION_BEARER_TOKENS", ["client-token"])
+
+    response = await async_client.post(
+        base_url,
+        data={"token": login_token.access_token},
+        headers={"Authorization": "Bearer client-token"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["active"] is True
+
+
+async def test_introspect_reflects_logout_immediately(
+    async_client: AsyncClient,
+    login_token: AuthLoginOutDTO,
+    token_header: dict,
+    client_auth_header: dict,
+):
+    data = {"token": login_token.access_token}
+
+    before = await async_client.post(base_url, data=data, headers=client_auth_header)
+    await async_client.post(f"{auth_base_url}/logout", headers=token_header)
+    after = await async_client.post(base_url, data=data, headers=client_auth_header)
+
+    assert before.json()["active"] is True
+    assert after.json() == {"active": False}
+
+
+async def test_introspect_is_cached(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, client_auth_header: dict
+):
+    await async_client.post(
+        base_url, data={"token": login_token.access_token}, headers=client_auth_header
+    )
+    cache = app.state.container.introspection_cache
+
+    assert cache.get(IntrospectionCache.key(login_token.access_token)).active
+
+
+async def test_introspection_cache_invalidate_and_ttl():
+    cache = IntrospectionCache(ttl_seconds=60, max_entries=2)
+    active = TokenIntrospectionDTO(active=True, jti="a", exp=2**40)
+
+    cache.put(b"k1", active, cache.generation)
+    cache.put(b"k2", TokenIntrospectionDTO(active=False), cache.generation)
+    cache.invalidate("a")
+
+    assert cache.get(b"k1") is None
+    assert cache.get(b"k2") == TokenIntrospectionDTO(active=False)
+
+    # Entries never outlive the token itself
+    cache.put(b"k3", TokenIntrospectionDTO(active=True, jti="b", exp=1), 1)
+    assert cache.get(b"k3") is None
+
+    disabled = IntrospectionCache(ttl_seconds=0, max_entries=2)
+    disabled.put(b"k1", active, disabled.generation)
+    assert len(disabled) == 0
+
+
+async def test_introspection_cache_skips_results_revoked_during_lookup():
+    cache = IntrospectionCache(ttl_seconds=60, max_entries=2)
+    revoked = TokenIntrospectionDTO(active=True, jti="a", sub="u1", exp=2**40)
+    logged_out = TokenIntrospectionDTO(active=True, jti="b", sub="u2", exp=2**40)
+    unrelated = TokenIntrospectionDTO(active=True, jti="c", sub="u3", exp=2**40)
+
+    # Lookups start, then the revocations land before their results are stored
+    started = cache.generation
+    cache.invalidate("a")
+    cache.invalidate_user("u2")
+
+    cache.put(b"k1", revoked, started)
+    cache.put(b"k2", logged_out, started)
+    cache.put(b"k3", unrelated, started)
+
+    assert cache.get(b"k1") is None
+    assert cache.get(b"k2") is None
+    assert cache.get(b"k3") == unrelated
+
+
+async def test_introspection_cache_skips_puts_once_tombstones_are_dropped():
+    cache = IntrospectionCache(ttl_seconds=60, max_entries=1)
+    result = TokenIntrospectionDTO(active=True, jti="a", exp=2**40)
+
+    started = cache.generation
+    cache.invalidate("x")
+    cache.invalidate("y")
+
+    # x's tombstone is gone, so nothing said it was not this token's
+    cache.put(b"k1", result, started)
+    assert cache.get(b"k1") is None
+
+    cache.put(b"k1", result, cache.generation)
+    assert cache.get(b"k1") == result
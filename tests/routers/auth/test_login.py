@@ -1,9 +1,18 @@
+import asyncio
+
 import pytest
+from argon2 import PasswordHasher, extract_parameters
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.constants import auth_constants
+from app.auth.helpers.login_utils import rehash_user_password
+from app.container import container_for
+from app.core import HashPriority
+from app.core.hashing import get_password_parameters
+from app.core.kdf import ScryptBackend
+from app.main import app
 from app.users.models import User
 from tests.conftest import get_refresh_token_from_headers
 from tests.dtos import UserRegisterDTO
@@ -145,3 +154,105 @@ async def test_login_deleted_user(
 
     assert response.status_code == 403
     assert data["detail"] == auth_constants.ERR_ACCOUNT_DELETED
+
+
+async def test_login_upgrades_weak_password_hash(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    db_session: AsyncSession,
+):
+    weak_hasher = PasswordHasher(time_cost=1, memory_cost=8 * 1024, parallelism=1)
+    user: User = await db_session.scalar(
+        select(User).where(User.email == registered_user.email)
+    )
+    user.hashed_password = weak_hasher.hash(registered_user.password)
+    db_session.add(user)
+    await db_session.commit()
+
+    response = await async_client.post(
+        base_url,
+        json={
+            "email": registered_user.email,
+            "password": registered_user.password,
+        },
+    )
+    assert response.status_code == 200
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        await db_session.refresh(user)
+        if extract_parameters(user.hashed_password).memory_cost != 8 * 1024:
+            break
+
+    # Rehashed with the configured (or calibrated) parameters
+    expected = get_password_parameters()
+    parameters = extract_parameters(user.hashed_password)
+    assert parameters.memory_cost == expected.memory_cost
+    assert parameters.time_cost == expected.time_cost
+    assert parameters.parallelism == expected.parallelism
+
+
+async def test_rehash_keeps_a_password_changed_meanwhile(
+    registered_user: UserRegisterDTO,
+    db_session: AsyncSession,
+):
+    weak_hasher = PasswordHasher(time_cost=1, memory_cost=8 * 1024, parallelism=1)
+    verified_hash = weak_hasher.hash(registered_user.password)
+    changed_hash = weak_hasher.hash("a-new-password")
+    user: User = await db_session.scalar(
+        select(User).where(User.email == registered_user.email)
+    )
+    user.hashed_password = verified_hash
+    await db_session.commit()
+    hasher = container_for(app).password_hasher
+
+    class _PasswordChangedDuringHash:
+        async def hash(self, password: str, priority: HashPriority) -> str:
+            await db_session.execute(
+                update(User)
+                .where(User.id == user.id)
+                .values(hashed_password=changed_hash)
+            )
+            await db_session.commit()
+            return await hasher.hash(password, priority=priority)
+
+    await rehash_user_password(
+        user.id,
+        registered_user.password,
+        verified_hash,
+        _PasswordChangedDuringHash(),
+    )
+
+    await db_session.refresh(user)
+    assert user.hashed_password == changed_hash
+
+
+async def test_login_with_imported_scrypt_hash(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    db_session: AsyncSession,
+):
+    user: User = await db_session.scalar(
+        select(User).where(User.email == registered_user.email)
+    )
+    user.hashed_password = ScryptBackend(log_n=10).hash(registered_user.password)
+    db_session.add(user)
+    await db_session.commit()
+
+    response = await async_client.post(
+        base_url,
+        json={
+            "email": registered_user.email,
+            "password": registered_user.password,
+        },
+    )
+
+    assert response.status_code == 200
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        await db_session.refresh(user)
+        if user.hashed_password.startswith("$argon2id$"):
+            break
+
+    assert user.hashed_password.startswith("$argon2id$")
@@ -4,7 +4,7 @@ import pytest
 import ulid
 from httpx import AsyncClient
 from jose import jwt
-from sqlalchemy import insert
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.constants import auth_constants, token_constants
@@ -26,6 +26,26 @@ async def test_logout_success(async_client: AsyncClient, token_header: dict):
     assert response.json()["message"] == auth_constants.SUC_LOGOUT
 
 
+async def test_logout_records_token_expiry(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token,
+    token_header: dict,
+):
+    payload = jwt.get_unverified_claims(login_token.access_token)
+
+    response = await async_client.post(base_url, headers=token_header)
+    row = await db_session.scalar(
+        select(BlacklistedToken).where(BlacklistedToken.jti == payload["jti"])
+    )
+
+    assert response.status_code == 200
+    assert row.expires_at is not None
+    assert (
+        int(row.expires_at.replace(tzinfo=timezone.utc).timestamp()) == payload["exp"]
+    )
+
+
 async def test_logout_without_auth(async_client: AsyncClient):
     response = await async_client.post(
         base_url,
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+from httpx import AsyncClient
+from jose import jwt
+
+from app.auth.constants import auth_constants
+from app.auth.dtos import JWTAccessTokenDTO
+from app.auth.enums import TokenType
+from app.auth.helpers.authenticate_user_utils import issued_before
+from tests.dtos import AuthLoginOutDTO
+from tests.routers.auth import auth_base_url
+
+pytestmark = pytest.mark.anyio
+base_url = f"{auth_base_url}/logout-all"
+
+_REVOKED = auth_constants.ERR_TOKEN_REVOKED.format(
+    reason=auth_constants.REVOKED_ALL_SESSIONS
+)
+
+
+def _token_dto(issued_at: datetime, jti_at: datetime) -> JWTAccessTokenDTO:
+    return JWTAccessTokenDTO(
+        sub=str(ulid.new()),
+        jti=str(ulid.from_timestamp(jti_at)),
+        exp=issued_at + timedelta(minutes=15),
+        iat=issued_at,
+        type=TokenType.ACCESS_TOKEN,
+    )
+
+
+async def test_issued_before_uses_jti_within_the_same_second():
+    moment = datetime(2026, 1, 1, 12, 0, 0, 500_000, tzinfo=timezone.utc)
+    second = moment.replace(microsecond=0)
+
+    assert issued_before(_token_dto(second - timedelta(seconds=1), second), moment)
+    assert issued_before(_token_dto(second, second), moment)
+    assert not issued_before(
+        _token_dto(second, moment + timedelta(milliseconds=100)), moment
+    )
+    assert not issued_before(_token_dto(second + timedelta(seconds=1), moment), moment)
+    assert issued_before(_token_dto(second, second), moment.replace(tzinfo=None))
+
+
+async def test_logout_all_revokes_every_session(
+    async_client: AsyncClient, registered_user, token_header: dict
+):
+    other = await async_client.post(
+        f"{auth_base_url}/login",
+        json={"email": registered_user.email, "password": registered_user.password},
+    )
+    other_header = {"Authorization": f"Bearer {other.json()['access_token']}"}
+
+    response = await async_client.post(base_url, headers=token_header)
+
+    assert response.status_code == 200
+    assert response.json()["message"] == auth_constants.SUC_LOGOUT_ALL
+
+    for headers in (token_header, other_header):
+        again = await async_client.post(f"{auth_base_url}/logout", headers=headers)
+        assert again.status_code == 401
+        assert again.json()["detail"] == _REVOKED
+
+
+async def test_logout_all_is_one_transaction(
+    async_client: AsyncClient, token_header: dict, count_statements
+):
+    # Warm the principal cache so only the revocation itself hits the database
+    await async_client.get(f"{auth_base_url}/forward", headers=token_header)
+
+    with count_statements() as recorded:
+        response = await async_client.post(base_url, headers=token_header)
+
+    assert response.status_code == 200
+    assert [statement.split()[0] for statement in recorded.statements] == [
+        "UPDATE",
+        "DELETE",
+    ]
+    assert recorded.commits == 1
+
+
+async def test_logout_all_rejects_refresh_and_keeps_new_logins(
+    async_client: AsyncClient,
+    registered_user,
+    login_token: AuthLoginOutDTO,
+    token_header: dict,
+    client_auth_header: dict,
+):
+    await async_client.post(base_url, headers=token_header)
+
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    refreshed = await async_client.post(
+        f"{auth_base_url}/refresh-token", headers=token_header
+    )
+    introspected = await async_client.post(
+        f"{auth_base_url}/introspect",
+        data={"token": login_token.access_token},
+        headers=client_auth_header,
+    )
+    login = await async_client.post(
+        f"{auth_base_url}/login",
+        json={"email": registered_user.email, "password": registered_user.password},
+    )
+    new_header = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    forward = await async_client.get(f"{auth_base_url}/forward", headers=new_header)
+
+    assert refreshed.status_code == 401
+    assert refreshed.json()["detail"] == _REVOKED
+    assert introspected.json() == {"active": False}
+    assert forward.status_code == 200
+    assert forward.headers["x-user-id"] == (
+        jwt.get_unverified_claims(login_token.access_token)["sub"]
+    )
+
+
+async def test_verify_batch_reports_bulk_revocation(
+    async_client: AsyncClient,
+    login_token: AuthLoginOutDTO,
+    token_header: dict,
+    client_auth_header: dict,
+):
+    await async_client.post(base_url, headers=token_header)
+
+    response = await async_client.post(
+        f"{auth_base_url}/verify/batch",
+        json={"tokens": [login_token.access_token]},
+        headers=client_auth_header,
+    )
+    result = response.json()["results"][0]
+
+    assert result["valid"] is False
+    assert result["revoked"] is True
+    assert result["error"] == _REVOKED
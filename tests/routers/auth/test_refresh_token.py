@@ -1,18 +1,24 @@
-from dataclasses import asdict
+import asyncio
+from dataclasses import asdict, replace
 from datetime import timezone, datetime, timedelta
 
 import pytest
 import ulid
+from argon2 import PasswordHasher
 from faker.proxy import Faker
 from httpx import AsyncClient
 from jose import jwt
-from sqlalchemy import insert, delete
+from sqlalchemy import func, insert, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.constants import auth_constants, token_constants
 from app.auth.dtos import BlacklistedTokenDTO, JWTRefreshTokenDTO
 from app.auth.enums import BlacklistReason, TokenType
-from app.auth.models import BlacklistedToken
+from app.auth.models import BlacklistedToken, RefreshToken
+from app.auth.services.refresh_coalescer import RefreshCoalescer
+from app.auth.services.rotation_policy import AlwaysRotation, IdleRotation
+from app.container import container_for
+from app.main import app
 from app.users.models import User
 from tests.conftest import login_user, get_user_by_email
 from tests.dtos import UserRegisterDTO, AuthLoginOutDTO
@@ -40,6 +46,156 @@ async def test_refresh_token_success(
     assert data["access_token"] is not None, "Access Token is None"
 
 
+async def test_refresh_token_one_read_and_one_commit(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, count_statements
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+
+    with count_statements() as recorded:
+        response = await async_client.post(
+            base_url,
+            headers=await get_token_header(login_token.access_token),
+        )
+
+    selects = [
+        statement for statement in recorded.statements if statement.startswith("SELECT")
+    ]
+    assert response.status_code == 200
+    assert len(selects) == 1
+    assert "FROM blacklisted_tokens" in selects[0]
+    assert "JOIN refresh_tokens" in selects[0]
+    assert recorded.commits == 1
+
+
+async def test_refresh_token_records_stage_timings(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, admin_header: dict
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    await async_client.post(
+        base_url, headers=await get_token_header(login_token.access_token)
+    )
+
+    response = await async_client.get("/metrics/refresh-timings", headers=admin_header)
+    stages = {entry["stage"]: entry for entry in response.json()}
+
+    assert response.status_code == 200
+    assert {"decode", "read", "verify", "mint", "write"} <= set(stages)
+    assert all(entry["count"] >= 1 for entry in stages.values())
+
+
+async def test_concurrent_refreshes_share_one_refresh(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, count_statements
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    headers = await get_token_header(login_token.access_token)
+
+    with count_statements() as recorded:
+        responses = await asyncio.gather(
+            *(async_client.post(base_url, headers=headers) for _ in range(5))
+        )
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len({response.json()["access_token"] for response in responses}) == 1
+    assert recorded.commits == 1
+
+
+async def test_refresh_retry_within_grace_returns_same_pair(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    headers = await get_token_header(login_token.access_token)
+
+    first = await async_client.post(base_url, headers=headers)
+    retry = await async_client.post(base_url, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["access_token"] == first.json()["access_token"]
+
+
+async def test_refresh_retry_from_other_device_is_not_replayed(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    headers = await get_token_header(login_token.access_token)
+
+    first = await async_client.post(base_url, headers=headers)
+    retry = await async_client.post(
+        base_url, headers={**headers, "User-Agent": "other-device"}
+    )
+
+    assert first.status_code == 200
+    assert retry.status_code == 401
+
+
+async def test_rotated_refresh_token_accepted_by_other_worker_within_grace(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, count_statements
+):
+    container = container_for(app)
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    headers = await get_token_header(login_token.access_token)
+
+    app.state.container = replace(container, rotation_policy=AlwaysRotation())
+    try:
+        first = await async_client.post(base_url, headers=headers)
+
+        # A worker that never saw the first refresh
+        app.state.container = replace(
+            app.state.container,
+            refresh_coalescer=RefreshCoalescer(
+                grace_seconds=10, max_entries=100, cross_worker=True
+            ),
+        )
+        with count_statements() as recorded:
+            retry = await async_client.post(base_url, headers=headers)
+    finally:
+        app.state.container = container
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["access_token"] != first.json()["access_token"]
+    assert "set-cookie" not in retry.headers
+    assert recorded.commits == 0
+
+
+async def test_rotated_refresh_token_rejected_by_other_worker_without_grace(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO
+):
+    container = container_for(app)
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    headers = await get_token_header(login_token.access_token)
+
+    app.state.container = replace(container, rotation_policy=AlwaysRotation())
+    try:
+        await async_client.post(base_url, headers=headers)
+
+        app.state.container = replace(
+            app.state.container,
+            refresh_coalescer=RefreshCoalescer(grace_seconds=10, max_entries=100),
+        )
+        retry = await async_client.post(base_url, headers=headers)
+    finally:
+        app.state.container = container
+
+    assert retry.status_code == 401
+    assert retry.json()["detail"] == auth_constants.ERR_TOKEN_REVOKED.format(
+        reason=BlacklistReason.TOKEN_ROTATION
+    )
+
+
+async def test_refresh_token_access_token_is_issued_to_user(
+    async_client: AsyncClient,
+    login_token: AuthLoginOutDTO,
+    test_user: User,
+):
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    response = await async_client.post(
+        base_url,
+        headers=await get_token_header(login_token.access_token),
+    )
+
+    claims = jwt.get_unverified_claims(response.json()["access_token"])
+    assert claims["sub"] == str(test_user.id)
+
+
 async def test_refresh_token_missing_cookie(
     async_client: AsyncClient,
     registered_user: UserRegisterDTO,
@@ -260,3 +416,226 @@ async def test_refresh_token_missing_claims(
 
     assert response.status_code == 401
     assert response.json()["detail"] == "Token invalid."
+
+
+async def test_refresh_token_upgrades_legacy_argon2_digest(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+    settings,
+):
+    payload = jwt.decode(
+        login_token.refresh_token,
+        key=settings.SECRET_REFRESH_TOKEN,
+        algorithms=[settings.ALGORITHM],
+    )
+    legacy_hash = PasswordHasher(time_cost=1, memory_cost=32 * 1024).hash(
+        login_token.refresh_token
+    )
+    await db_session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == payload["jti"])
+        .values(hashed_token=legacy_hash)
+    )
+    await db_session.commit()
+
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    response = await async_client.post(
+        base_url, headers=await get_token_header(login_token.access_token)
+    )
+    stored = await db_session.scalar(
+        select(RefreshToken.hashed_token).where(RefreshToken.jti == payload["jti"])
+    )
+
+    assert response.status_code == 200
+    assert stored.startswith("$hmac-sha256$")
+
+
+async def test_refresh_token_rotates_refresh_token_near_expiry(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+    await db_session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == claims["jti"])
+        .values(expires_at=datetime.now(timezone.utc) + timedelta(days=1))
+    )
+    await db_session.commit()
+
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    response = await async_client.post(
+        base_url, headers=await get_token_header(login_token.access_token)
+    )
+    new_refresh_token = response.cookies.get("refresh_token")
+    new_claims = jwt.get_unverified_claims(new_refresh_token)
+    saved = await db_session.scalar(
+        select(RefreshToken).where(RefreshToken.jti == new_claims["jti"])
+    )
+
+    assert response.status_code == 200
+    assert new_claims["jti"] != claims["jti"]
+    assert saved is not None and saved.hashed_token.startswith("$hmac-sha256$")
+    assert str(saved.family_id) == claims["jti"]
+
+
+async def _family_size(db_session: AsyncSession, family_id: str) -> int:
+    return await db_session.scalar(
+        select(func.count())
+        .select_from(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+    )
+
+
+async def test_reused_refresh_token_revokes_its_family(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+    await db_session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == claims["jti"])
+        .values(expires_at=datetime.now(timezone.utc) + timedelta(days=1))
+    )
+    await db_session.commit()
+
+    headers = await get_token_header(login_token.access_token)
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    rotated = await async_client.post(base_url, headers=headers)
+    new_refresh_token = rotated.cookies.get("refresh_token")
+    family_size = await _family_size(db_session, claims["jti"])
+
+    container = container_for(app)
+    # Well past the grace window
+    app.state.container = replace(
+        container, refresh_coalescer=RefreshCoalescer(grace_seconds=0, max_entries=1)
+    )
+    try:
+        async_client.cookies.clear()
+        async_client.cookies.set("refresh_token", login_token.refresh_token)
+        reused = await async_client.post(base_url, headers=headers)
+
+        async_client.cookies.clear()
+        async_client.cookies.set("refresh_token", new_refresh_token)
+        descendant = await async_client.post(
+            base_url,
+            headers=await get_token_header(rotated.json()["access_token"]),
+        )
+    finally:
+        app.state.container = container
+
+    assert rotated.status_code == 200 and family_size == 2
+    assert reused.status_code == 401
+    assert reused.json()["detail"] == auth_constants.ERR_TOKEN_REVOKED.format(
+        reason=BlacklistReason.TOKEN_ROTATION
+    )
+    assert descendant.status_code == 401
+    assert await _family_size(db_session, claims["jti"]) == 0
+
+
+async def test_refresh_from_other_device_revokes_the_family(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+    response = await async_client.post(
+        base_url,
+        headers={
+            **await get_token_header(login_token.access_token),
+            "User-Agent": "other-device",
+        },
+    )
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == auth_constants.ERR_TOKEN_REVOKED.format(
+        reason=BlacklistReason.COMPROMISED_TOKEN
+    )
+    assert await _family_size(db_session, claims["jti"]) == 0
+
+
+async def test_refresh_token_outside_rotation_window_stays_valid(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+    async_client.cookies.set("refresh_token", login_token.refresh_token)
+
+    container = container_for(app)
+    # Every refresh reaches the database instead of replaying the first
+    app.state.container = replace(container, refresh_coalescer=None)
+    try:
+        first = await async_client.post(
+            base_url, headers=await get_token_header(login_token.access_token)
+        )
+        second = await async_client.post(
+            base_url, headers=await get_token_header(first.json()["access_token"])
+        )
+        # An access token an earlier refresh already revoked is not written twice
+        third = await async_client.post(
+            base_url, headers=await get_token_header(login_token.access_token)
+        )
+    finally:
+        app.state.container = container
+    refresh_revoked = await db_session.scalar(
+        select(BlacklistedToken.reason).where(BlacklistedToken.jti == claims["jti"])
+    )
+
+    assert first.status_code == second.status_code == third.status_code == 200
+    assert "set-cookie" not in first.headers
+    assert refresh_revoked is None
+
+
+async def _refresh_with_policy(async_client: AsyncClient, login_token, policy):
+    container = container_for(app)
+    app.state.container = replace(container, rotation_policy=policy)
+    try:
+        async_client.cookies.set("refresh_token", login_token.refresh_token)
+        return await async_client.post(
+            base_url, headers=await get_token_header(login_token.access_token)
+        )
+    finally:
+        app.state.container = container
+
+
+async def test_always_rotation_replaces_the_refresh_token(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+
+    response = await _refresh_with_policy(async_client, login_token, AlwaysRotation())
+    new_claims = jwt.get_unverified_claims(response.cookies.get("refresh_token"))
+    refresh_revoked = await db_session.scalar(
+        select(BlacklistedToken.reason).where(BlacklistedToken.jti == claims["jti"])
+    )
+
+    assert response.status_code == 200
+    assert new_claims["jti"] != claims["jti"]
+    assert refresh_revoked == BlacklistReason.TOKEN_ROTATION
+
+
+async def test_idle_rotation_records_last_use_when_not_rotating(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+):
+    claims = jwt.get_unverified_claims(login_token.refresh_token)
+
+    response = await _refresh_with_policy(
+        async_client,
+        login_token,
+        IdleRotation(timedelta(days=2), idle=timedelta(days=1)),
+    )
+    last_used_at = await db_session.scalar(
+        select(RefreshToken.last_used_at).where(RefreshToken.jti == claims["jti"])
+    )
+
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+    assert last_used_at is not None
@@ -0,0 +1,129 @@
+import pytest
+from httpx import AsyncClient, Response
+from jose import jwt
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.constants import auth_constants
+from app.auth.models import RefreshToken
+from app.core import config
+from tests.conftest import login_user, register_user
+from tests.dtos import AuthLoginOutDTO, UserRegisterDTO
+from tests.routers.auth import auth_base_url
+
+pytestmark = pytest.mark.anyio
+base_url = f"{auth_base_url}/sessions"
+
+
+def _refresh_jti(response: Response) -> str:
+    return jwt.get_unverified_claims(response.cookies.get("refresh_token"))["jti"]
+
+
+async def test_list_sessions_newest_first(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    login_token: AuthLoginOutDTO,
+    token_header: dict,
+):
+    second = await login_user(async_client, registered_user)
+
+    response = await async_client.get(base_url, headers=token_header)
+    sessions = response.json()
+
+    assert response.status_code == 200
+    assert [session["jti"] for session in sessions] == [
+        _refresh_jti(second),
+        jwt.get_unverified_claims(login_token.refresh_token)["jti"],
+    ]
+    assert sessions[0]["ip_address"] == "127.0.0.1"
+
+
+async def test_revoke_session_ends_it(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    token_header: dict,
+):
+    other = await login_user(async_client, registered_user)
+    other_jti = _refresh_jti(other)
+
+    response = await async_client.delete(
+        f"{base_url}/{other_jti}", headers=token_header
+    )
+    sessions = (await async_client.get(base_url, headers=token_header)).json()
+
+    async_client.cookies.set("refresh_token", other.cookies.get("refresh_token"))
+    refresh = await async_client.post(
+        f"{auth_base_url}/refresh-token",
+        headers={"Authorization": f"Bearer {other.json()['access_token']}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["message"] == auth_constants.SUC_SESSION_REVOKED
+    assert other_jti not in [session["jti"] for session in sessions]
+    assert refresh.status_code == 401
+
+
+async def test_logout_all_ends_every_session(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    token_header: dict,
+):
+    other = await login_user(async_client, registered_user)
+
+    await async_client.post(f"{auth_base_url}/logout-all", headers=token_header)
+    relogin = await login_user(async_client, registered_user)
+    relogin_header = {"Authorization": f"Bearer {relogin.json()['access_token']}"}
+
+    sessions = (await async_client.get(base_url, headers=relogin_header)).json()
+    revoke = await async_client.delete(
+        f"{base_url}/{_refresh_jti(other)}", headers=relogin_header
+    )
+
+    assert [session["jti"] for session in sessions] == [_refresh_jti(relogin)]
+    assert revoke.status_code == 404
+
+
+async def test_revoke_session_of_another_user_is_not_found(
+    async_client: AsyncClient,
+    new_random_user: UserRegisterDTO,
+    token_header: dict,
+):
+    await register_user(async_client, new_random_user)
+    stranger = await login_user(async_client, new_random_user)
+
+    response = await async_client.delete(
+        f"{base_url}/{_refresh_jti(stranger)}", headers=token_header
+    )
+    malformed = await async_client.delete(
+        f"{base_url}/not-a-ulid", headers=token_header
+    )
+
+    assert response.status_code == malformed.status_code == 404
+    assert response.json()["detail"] == auth_constants.ERR_SESSION_NOT_FOUND
+
+
+async def test_login_evicts_oldest_sessions_over_the_cap(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+    monkeypatch,
+):
+    monkeypatch.setattr(config, "AUTH_MAX_SESSIONS_PER_USER", 2)
+    first_jti = jwt.get_unverified_claims(login_token.refresh_token)["jti"]
+    user_id = jwt.get_unverified_claims(login_token.refresh_token)["sub"]
+
+    logins = [await login_user(async_client, registered_user) for _ in range(3)]
+    stored = await db_session.scalars(
+        select(RefreshToken.jti).where(RefreshToken.user_id == user_id)
+    )
+
+    assert {str(jti) for jti in stored} == {_refresh_jti(login) for login in logins[1:]}
+    assert (
+        await db_session.scalar(
+            select(func.count())
+            .select_from(RefreshToken)
+            .where(RefreshToken.jti == first_jti)
+        )
+        == 0
+    )
@@ -0,0 +1,179 @@
+from datetime import timezone, datetime
+
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.constants import auth_constants, token_constants
+from app.auth.enums import BlacklistReason
+from app.auth.models import BlacklistedToken
+from app.core import config
+from app.users.models import User
+from tests.conftest import login_user, register_user, faker
+from tests.dtos import UserRegisterDTO, AuthLoginOutDTO
+from tests.routers.auth import auth_base_url
+
+pytestmark = pytest.mark.anyio
+base_url = f"{auth_base_url}/verify/batch"
+
+
+async def _access_tokens(async_client: AsyncClient, count: int) -> list[str]:
+    tokens = []
+
+    for _ in range(count):
+        user = UserRegisterDTO(
+            fullname=f"{faker.first_name()} {faker.last_name()}",
+            email=faker.unique.email(),
+            password="Test1234!!22",
+        )
+        await register_user(async_client, user)
+        response = await login_user(async_client, user)
+        tokens.append(response.json()["access_token"])
+
+    return tokens
+
+
+async def test_verify_batch_success(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, client_auth_header: dict
+):
+    response = await async_client.post(
+        base_url,
+        json={"tokens": [login_token.access_token]},
+        headers=client_auth_header,
+    )
+    result = response.json()["results"][0]
+
+    assert response.status_code == 200
+    assert result["valid"] is True
+    assert result["revoked"] is False
+    assert result["role"] == "user"
+    assert (
+        result["claims"]["sub"]
+        == jwt.get_unverified_claims(login_token.access_token)["sub"]
+    )
+
+
+async def test_verify_batch_keeps_order_and_isolates_failures(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, client_auth_header: dict
+):
+    response = await async_client.post(
+        base_url,
+        json={
+            "tokens": [
+                "garbage",
+                login_token.access_token,
+                login_token.refresh_token,
+            ]
+        },
+        headers=client_auth_header,
+    )
+    garbage, valid, refresh = response.json()["results"]
+
+    assert garbage == {
+        "valid": False,
+        "revoked": False,
+        "revoked_reason": None,
+        "error": token_constants.JWT_CREDENTIALS_INVALID,
+        "claims": None,
+        "role": None,
+    }
+    assert valid["valid"] is True
+    assert refresh["valid"] is False
+
+
+async def test_verify_batch_reports_revocation(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+    client_auth_header: dict,
+):
+    jti = jwt.get_unverified_claims(login_token.access_token)["jti"]
+    await db_session.execute(
+        insert(BlacklistedToken).values(
+            jti=jti,
+            reason=BlacklistReason.LOGOUT,
+            blacklisted_at=datetime.now(timezone.utc),
+        )
+    )
+    await db_session.commit()
+
+    response = await async_client.post(
+        base_url,
+        json={"tokens": [login_token.access_token]},
+        headers=client_auth_header,
+    )
+    result = response.json()["results"][0]
+
+    assert result["valid"] is False
+    assert result["revoked"] is True
+    assert result["revoked_reason"] == BlacklistReason.LOGOUT.value
+    assert result["claims"]["jti"] == jti
+
+
+async def test_verify_batch_reports_deactivated_user(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    login_token: AuthLoginOutDTO,
+    registered_user: UserRegisterDTO,
+    client_auth_header: dict,
+):
+    await db_session.execute(
+        update(User)
+        .where(User.email == registered_user.email.lower())
+        .values(is_active=False)
+    )
+    await db_session.commit()
+
+    response = await async_client.post(
+        base_url,
+        json={"tokens": [login_token.access_token]},
+        headers=client_auth_header,
+    )
+    result = response.json()["results"][0]
+
+    assert result["valid"] is False
+    assert result["error"] == auth_constants.ERR_ACCOUNT_DEACTIVATED
+
+
+async def test_verify_batch_uses_set_based_queries(
+    async_client: AsyncClient, client_auth_header: dict, count_statements
+):
+    tokens = await _access_tokens(async_client, 5)
+
+    with count_statements() as recorded:
+        response = await async_client.post(
+            base_url, json={"tokens": tokens}, headers=client_auth_header
+        )
+
+    assert all(result["valid"] for result in response.json()["results"])
+    assert len(recorded.statements) == 2
+    assert all(" IN " in statement for statement in recorded.statements)
+
+
+async def test_verify_batch_limits(async_client: AsyncClient, client_auth_header: dict):
+    empty = await async_client.post(
+        base_url, json={"tokens": []}, headers=client_auth_header
+    )
+    too_many = await async_client.post(
+        base_url,
+        json={"tokens": ["x"] * (config.AUTH_VERIFY_BATCH_MAX_TOKENS + 1)},
+        headers=client_auth_header,
+    )
+
+    assert empty.status_code == 422
+    assert too_many.status_code == 422
+
+
+async def test_verify_batch_requires_client_authentication(
+    async_client: AsyncClient, login_token: AuthLoginOutDTO, token_header: dict
+):
+    body = {"tokens": [login_token.access_token]}
+
+    anonymous = await async_client.post(base_url, json=body)
+    user_token = await async_client.post(base_url, json=body, headers=token_header)
+
+    for response in (anonymous, user_token):
+        assert response.status_code == 401
+        assert response.json()["detail"] == auth_constants.ERR_CLIENT_UNAUTHORIZED
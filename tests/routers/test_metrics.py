@@ -0,0 +1,21 @@
+import pytest
+from httpx import AsyncClient
+
+from app.auth.constants import auth_constants
+
+pytestmark = pytest.mark.anyio
+base_url = "/metrics"
+
+
+async def test_metrics_require_an_admin(
+    async_client: AsyncClient, token_header: dict, admin_header: dict
+):
+    anonymous = await async_client.get(f"{base_url}/hashing")
+    user = await async_client.get(f"{base_url}/hashing", headers=token_header)
+    admin = await async_client.get(f"{base_url}/hashing", headers=admin_header)
+
+    assert anonymous.status_code == 403
+    assert user.status_code == 403
+    assert user.json()["detail"] == auth_constants.ERR_ADMIN_REQUIRED
+    assert admin.status_code == 200
+    assert "in_flight" in admin.json()
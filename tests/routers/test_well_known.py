@@ -0,0 +1,123 @@
+import pytest
+
+# EdDSA / ES256 keys need the optional 'asymmetric' extra
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+)
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+
+from app.core import config
+from app.main import app
+from tests.conftest import login_user
+from tests.dtos import UserRegisterDTO
+
+pytestmark = pytest.mark.anyio
+
+
+def _use_signing_key(monkeypatch) -> ed25519.Ed25519PrivateKey:
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    monkeypatch.setattr(config, "ACCESS_TOKEN_PRIVATE_KEY", pem.decode())
+
+    # Rebuilt on the next request with the key pair
+    app.state.container = None
+    return private_key
+
+
+@pytest.fixture
+def reset_container():
+    yield
+    app.state.container = None
+
+
+@pytest.fixture
+def signing_key(monkeypatch, reset_container) -> ed25519.Ed25519PrivateKey:
+    return _use_signing_key(monkeypatch)
+
+
+@pytest.fixture
+async def root_client():
+    async with AsyncClient(
+        transport=ASGITransport(app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def test_jwks_without_key_pair_is_empty(root_client: AsyncClient):
+    response = await root_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+
+
+async def test_jwks_serves_public_key_with_cache_headers(
+    root_client: AsyncClient, signing_key
+):
+    response = await root_client.get("/.well-known/jwks.json")
+    keys = response.json()["keys"]
+
+    assert response.status_code == 200
+    assert response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert len(keys) == 1
+    assert keys[0]["kty"] == "OKP" and keys[0]["alg"] == "EdDSA"
+    assert "d" not in keys[0]
+
+    cached = await root_client.get(
+        "/.well-known/jwks.json",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+async def test_access_token_is_signed_with_key_pair(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    root_client: AsyncClient,
+    signing_key,
+):
+    login = await login_user(async_client, registered_user)
+    access_token = login.json()["access_token"]
+    jwk = (await root_client.get("/.well-known/jwks.json")).json()["keys"][0]
+
+    assert jwt.get_unverified_header(access_token)["kid"] == jwk["kid"]
+
+    response = await async_client.post(
+        "/auth/logout",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    ("accept_secret_signed", "status_code"), [(False, 401), (True, 200)]
+)
+async def test_secret_signed_access_token_after_switching_to_key_pair(
+    async_client: AsyncClient,
+    registered_user: UserRegisterDTO,
+    monkeypatch,
+    reset_container,
+    accept_secret_signed: bool,
+    status_code: int,
+):
+    app.state.container = None
+    login = await login_user(async_client, registered_user)
+    access_token = login.json()["access_token"]
+
+    _use_signing_key(monkeypatch)
+    monkeypatch.setattr(
+        config, "ACCESS_TOKEN_ACCEPT_SECRET_SIGNED", accept_secret_signed
+    )
+    response = await async_client.post(
+        "/auth/logout",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == status_code